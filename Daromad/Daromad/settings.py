@@ -12,6 +12,7 @@ https://docs.djangoproject.com/en/5.2/ref/settings/
 
 from pathlib import Path
 import os
+import sys
 import dj_database_url
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
@@ -45,6 +46,8 @@ INSTALLED_APPS = [
 
 MIDDLEWARE = [
     "django.middleware.security.SecurityMiddleware",
+    # Eng tashqarida: qolgan middleware'lar so'rovlari ham o'lchanadi
+    "myapp.middleware.RequestTimingMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     'whitenoise.middleware.WhiteNoiseMiddleware',  
     "django.middleware.common.CommonMiddleware",
@@ -84,6 +87,66 @@ DATABASES = {
         conn_max_age=600 # Ulanishni uzoqroq saqlash (yaxshiroq ishlash uchun)
     )
 }
+if DATABASES['default'].get('ENGINE') == 'django.db.backends.sqlite3':
+    # Parallel yozuvchilar (process_recurring --workers): tranzaksiya boshidanoq yozish qulfini
+    # oladi va band bo'lsa kutadi — aks holda darhol "database is locked"
+    DATABASES['default'].setdefault('OPTIONS', {}).update({'transaction_mode': 'IMMEDIATE', 'timeout': 20})
+    # Test bazasi xotirada emas, faylda: `process_recurring --workers` testidagi
+    # alohida jarayonlar ham shu bazaga ulanadi
+    DATABASES['default']['TEST'] = {'NAME': str(BASE_DIR / 'test_db.sqlite3')}
+
+
+# Cache
+# Lokal ishlab chiqishda LocMem, CACHE_DIR berilsa — fayl asosidagi kesh.
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'daromad',
+    }
+}
+if os.environ.get('CACHE_DIR'):
+    CACHES['default'] = {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': os.environ['CACHE_DIR'],
+    }
+
+# Dashboard jami summalari keshda qancha saqlanadi (soniya)
+DASHBOARD_CACHE_TIMEOUT = 60 * 60 * 24
+
+# Tayyor HTML fragmentlar (tranzaksiyalar ro'yxati) keshi (soniya)
+FRAGMENT_CACHE_TIMEOUT = 60 * 60
+
+# Tranzaksiyalar ro'yxatida bitta sahifadagi qatorlar soni
+TRANSACTIONS_PAGE_SIZE = 50
+
+# Admin: shundan katta jadvallarda COUNT(*) o'rniga planner bahosi ishlatiladi (PostgreSQL)
+ADMIN_ESTIMATED_COUNT_THRESHOLD = 100_000
+# Admin: aniq COUNT(*) va sana chegaralari keshi (soniya)
+ADMIN_COUNT_CACHE_TIMEOUT = 60
+ADMIN_DATE_BOUNDS_CACHE_TIMEOUT = 60 * 60
+
+# So'rov o'lchovlari (myapp.middleware): Server-Timing sarlavhasi va `myapp.timing` logi
+REQUEST_TIMING_ENABLED = os.environ.get('REQUEST_TIMING_ENABLED', '1') == '1'
+SERVER_TIMING_HEADER = True
+# Shundan sekin so'rovlar SQL ro'yxati bilan WARNING darajasida yoziladi (ms)
+SLOW_REQUEST_THRESHOLD_MS = int(os.environ.get('SLOW_REQUEST_THRESHOLD_MS', 500))
+
+# Logging: `myapp.timing` qatorlari konsolga (Render loglari) chiqadi
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'handlers': {
+        'console': {'class': 'logging.StreamHandler'},
+    },
+    'loggers': {
+        'myapp.timing': {
+            'handlers': ['console'],
+            # `manage.py test` chiqishini har so'rov qatori bilan to'ldirmaslik uchun
+            'level': os.environ.get('REQUEST_TIMING_LOG_LEVEL', 'WARNING' if sys.argv[1:2] == ['test'] else 'INFO'),
+            'propagate': False,
+        },
+    },
+}
 
 
 # Password validation
@@ -1,13 +1,21 @@
 # myapp/admin.py
+from django.conf import settings
 from django.contrib import admin
 from django.contrib.auth.admin import UserAdmin
 from django.utils.translation import gettext_lazy as _
 from django.utils.html import format_html
 from django.urls import reverse
 from django.contrib import messages
+from django.contrib.admin.helpers import ActionForm
+from django import forms
+from django.core.exceptions import ValidationError
 from .models import (
     CustomUser, Category, RecurringSchedule,
-    Transaction, Budget
+    Transaction, Budget, BudgetAlert
+)
+from .merging import merge_categories
+from .admin_tools import (
+    ChangeListSummaryMixin, EstimatedCountPaginator, MonthListFilter, UserAutocompleteFilter
 )
 
 
@@ -42,11 +50,19 @@ class CustomUserAdmin(UserAdmin):
 
 
 # === 3. CATEGORY ADMIN ===
+class CategoryActionForm(ActionForm):
+    target = forms.IntegerField(required=False, label=_("Nishon kategoriya ID"))
+
+
 @admin.register(Category)
 class CategoryAdmin(admin.ModelAdmin):
-    list_display = ('name', 'type', 'user', 'parent', 'is_active', 'created_at')
+    action_form = CategoryActionForm
+    actions = ['merge_into_target']
+    list_display = ('full_path', 'type', 'user', 'is_active', 'created_at')
+    list_select_related = ('user',)
     list_filter = ('type', 'is_active', 'user', 'created_at')
-    search_fields = ('name', 'user__username')
+    search_fields = ('full_path', 'user__username')
+    ordering = ('type', 'full_path')
     list_editable = ('is_active',)
     inlines = [SubCategoryInline]
     readonly_fields = ('created_at', 'updated_at')
@@ -71,16 +87,34 @@ class CategoryAdmin(admin.ModelAdmin):
             kwargs["queryset"] = Category.objects.filter(user=request.user) if not request.user.is_superuser else Category.objects.all()
         return super().formfield_for_foreignkey(db_field, request, **kwargs)
 
+    def merge_into_target(self, request, queryset):
+        try:
+            target = self.get_queryset(request).get(pk=int(request.POST.get('target') or ''))
+        except (ValueError, Category.DoesNotExist):
+            self.message_user(request, _("Nishon kategoriya ID'sini kiriting."), messages.ERROR)
+            return
+        moved = 0
+        for source in queryset.exclude(pk=target.pk).order_by('-depth'):
+            try:
+                moved += merge_categories(source, target).transactions
+            except ValidationError as e:
+                self.message_user(request, f"{source.get_full_path()}: {' '.join(e.messages)}", messages.ERROR)
+        self.message_user(request, f"{moved} ta tranzaksiya «{target.get_full_path()}» ga ko‘chirildi.")
+    merge_into_target.short_description = _("Tanlanganlarni nishon kategoriyaga birlashtirish")
+
 
 # === 4. RECURRING SCHEDULE ADMIN ===
 @admin.register(RecurringSchedule)
-class RecurringScheduleAdmin(admin.ModelAdmin):
+class RecurringScheduleAdmin(ChangeListSummaryMixin, admin.ModelAdmin):
     list_display = ('category', 'amount', 'day_of_month', 'user', 'start_date', 'end_date', 'is_active', 'last_executed')
+    list_select_related = ('category', 'user')
     list_filter = ('is_active', 'day_of_month', 'category__type', 'user', 'start_date')
     search_fields = ('category__name', 'note', 'user__username')
     list_editable = ('is_active',)
     readonly_fields = ('last_executed',)
     date_hierarchy = 'start_date'
+    # Jadval summasi oylik — oy bo'yicha bo'lish shart emas
+    summary_fields = {'amount': (_("Oylik summa"), 'amount')}
     fieldsets = (
         (_('Asosiy'), {
             'fields': ('user', 'category', 'amount', 'day_of_month')
@@ -115,13 +149,19 @@ class RecurringScheduleAdmin(admin.ModelAdmin):
 
 # === 5. TRANSACTION ADMIN ===
 @admin.register(Transaction)
-class TransactionAdmin(admin.ModelAdmin):
+class TransactionAdmin(ChangeListSummaryMixin, admin.ModelAdmin):
     list_display = ('date', 'amount', 'category', 'user', 'is_automated', 'created_at')
-    list_filter = ('is_automated', 'category__type', 'date', 'user')
+    list_filter = ('is_automated', 'category__type', MonthListFilter, UserAutocompleteFilter)
     search_fields = ('description', 'category__name', 'user__username')
     readonly_fields = ('created_at',)
-    date_hierarchy = 'date'
     list_select_related = ('category', 'user', 'recurring_schedule')
+    autocomplete_fields = ('user', 'category', 'recurring_schedule')
+    # Katta jadval: taxminiy count, yengil sahifalash, facet'siz filtrlar
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+    show_facets = admin.ShowFacets.NEVER
+    summary_month_field = 'date'
+    summary_cache_timeout = settings.ADMIN_COUNT_CACHE_TIMEOUT
     fieldsets = (
         (_('Asosiy'), {
             'fields': ('user', 'amount', 'category', 'date', 'description')
@@ -145,13 +185,19 @@ class TransactionAdmin(admin.ModelAdmin):
 
 # === 6. BUDGET ADMIN ===
 @admin.register(Budget)
-class BudgetAdmin(admin.ModelAdmin):
+class BudgetAdmin(ChangeListSummaryMixin, admin.ModelAdmin):
     list_display = ('month', 'category', 'amount', 'spent_amount', 'spent_percentage', 'warning_threshold', 'is_active')
     list_filter = ('is_active', 'month', 'category__type', 'user')
     search_fields = ('category__name', 'user__username')
     list_editable = ('is_active',)
     readonly_fields = ('spent_amount', 'spent_percentage')
     date_hierarchy = 'month'
+    # Sarf jamisi hisoblagich ustunidan — subquery'siz
+    summary_fields = {
+        'amount': (_("Reja"), 'amount'),
+        'spent': (_("Sarflangan"), 'spent_total'),
+    }
+    summary_month_field = 'month'
     fieldsets = (
         (_('Asosiy'), {
             'fields': ('user', 'category', 'amount', 'month', 'warning_threshold')
@@ -162,7 +208,8 @@ class BudgetAdmin(admin.ModelAdmin):
     )
 
     def get_queryset(self, request):
-        qs = super().get_queryset(request)
+        # Sarf va foiz bitta subquery bilan — har bir qator uchun alohida so'rov yo'q
+        qs = super().get_queryset(request).with_spending().select_related('category', 'user')
         if request.user.is_superuser:
             return qs
         return qs.filter(user=request.user)
@@ -170,16 +217,20 @@ class BudgetAdmin(admin.ModelAdmin):
     def spent_amount(self, obj):
         return f"{obj.spent_amount():,.0f} so‘m"
     spent_amount.short_description = _("Sarflangan")
+    spent_amount.admin_order_field = 'spent'
 
     def spent_percentage(self, obj):
         percent = obj.spent_percentage()
         color = "green" if percent < obj.warning_threshold else "red"
-        return format_html(f'<span style="color: {color}; font-weight: bold;">{percent}%</span>')
+        return format_html('<span style="color: {}; font-weight: bold;">{}%</span>', color, percent)
     spent_percentage.short_description = _("Foiz")
+    spent_percentage.admin_order_field = 'spent_percent'
+
 
-    def changelist_view(self, request, extra_context=None):
-        # Har bir budget uchun spent_amount hisoblash
-        response = super().changelist_view(request, extra_context)
-        if hasattr(response, 'context_data'):
-            response.context_data['summary'] = []
-        return response
\ No newline at end of file
+# === 7. BUDGET ALERT ADMIN ===
+@admin.register(BudgetAlert)
+class BudgetAlertAdmin(admin.ModelAdmin):
+    list_display = ('created_at', 'user', 'budget', 'level', 'percent', 'is_read')
+    list_filter = ('level', 'is_read')
+    list_select_related = ('user', 'budget__category')
+    readonly_fields = ('user', 'budget', 'level', 'spent', 'percent', 'created_at')
@@ -0,0 +1,231 @@
+# myapp/admin_tools.py
+"""
+Katta jadvallar (millionlab tranzaksiya) uchun admin yordamchilari.
+
+- `EstimatedCountPaginator`: PostgreSQL'da katta natijalar uchun COUNT(*)
+  o'rniga planner bahosi (EXPLAIN), boshqa bazalarda aniq COUNT qisqa muddat
+  keshlanadi. Sahifa "kechiktirilgan join" bilan olinadi: OFFSET faqat tor
+  indeks (pk) bo'ylab yuradi, keng qatorlar esa `pk__in` bilan o'qiladi.
+- `UserAutocompleteFilter`: foydalanuvchilarning to'liq ro'yxati o'rniga
+  admin autocomplete'dan foydalanadigan matn maydoni.
+- `MonthListFilter`: `date_hierarchy` o'rniga oy bo'yicha filtr; sana
+  chegaralari (MIN/MAX) keshlanadi.
+- `ChangeListSummaryMixin`: changelist ostida tur, kategoriya va oy bo'yicha
+  jamilar — filtrlangan QuerySet ustida bitta GROUP BY so'rovi.
+"""
+import datetime
+import hashlib
+import json
+
+from dateutil.relativedelta import relativedelta
+from django.conf import settings
+from django.contrib import admin
+from django.core.cache import cache
+from django.core.paginator import Paginator
+from django.db import connections
+from django.db.models import Count, F, Max, Min, Sum
+from django.db.models.functions import TruncMonth
+from django.utils.functional import cached_property
+from django.utils.translation import gettext_lazy as _
+
+from .models import TYPE_CHOICES
+
+
+def _query_cache_key(prefix, queryset):
+    sql, params = queryset.query.sql_with_params()
+    digest = hashlib.md5(f"{sql}|{params!r}".encode()).hexdigest()
+    return f"daromad:admin-{prefix}:{digest}"
+
+
+# === 1. PAGINATOR ===
+class EstimatedCountPaginator(Paginator):
+    """ Taxminiy `count` va tor indeks bo'yicha sahifalash. """
+
+    @cached_property
+    def count(self):
+        queryset = self.object_list
+        connection = connections[queryset.db]
+        if connection.vendor == 'postgresql':
+            estimate = self._planner_estimate(queryset, connection)
+            if estimate >= getattr(settings, 'ADMIN_ESTIMATED_COUNT_THRESHOLD', 100_000):
+                return estimate
+        key = _query_cache_key('count', queryset)
+        total = cache.get(key)
+        if total is None:
+            total = queryset.count()
+            cache.set(key, total, getattr(settings, 'ADMIN_COUNT_CACHE_TIMEOUT', 60))
+        return total
+
+    @staticmethod
+    def _planner_estimate(queryset, connection):
+        """ EXPLAIN bo'yicha taxminiy qatorlar soni (jadvalni o'qimaydi). """
+        sql, params = queryset.order_by().values('pk').query.sql_with_params()
+        with connection.cursor() as cursor:
+            cursor.execute(f"EXPLAIN (FORMAT JSON) {sql}", params)
+            plan = cursor.fetchone()[0]
+        if isinstance(plan, str):
+            plan = json.loads(plan)
+        return int(plan[0]['Plan']['Plan Rows'])
+
+    def page(self, number):
+        number = self.validate_number(number)
+        bottom = (number - 1) * self.per_page
+        top = bottom + self.per_page
+        if top + self.orphans >= self.count:
+            top = self.count
+        pks = list(self.object_list.values_list('pk', flat=True)[bottom:top])
+        # Tartib asl QuerySet'dan saqlanadi; faqat shu sahifa qatorlari o'qiladi
+        return self._get_page(self.object_list.filter(pk__in=pks), number, self)
+
+
+# === 2. FOYDALANUVCHI FILTRI ===
+class UserAutocompleteFilter(admin.SimpleListFilter):
+    """
+    Foydalanuvchi bo'yicha filtr: ro'yxat emas, matn maydoni. Variantlar admin
+    autocomplete endpoint'idan olinadi (modelda `autocomplete_fields` da `user` bo'lishi kerak).
+    Qiymat — foydalanuvchi ID'si yoki username.
+    """
+    title = _("foydalanuvchi")
+    parameter_name = 'user'
+    template = 'admin/myapp/autocomplete_filter.html'
+
+    def lookups(self, request, model_admin):
+        return ()
+
+    def has_output(self):
+        return True
+
+    def queryset(self, request, queryset):
+        value = (self.value() or '').strip()
+        if not value:
+            return queryset
+        if value.isdigit():
+            return queryset.filter(user_id=int(value))
+        return queryset.filter(user__username=value)
+
+    def choices(self, changelist):
+        yield {
+            'value': self.value() or '',
+            'clear_url': changelist.get_query_string(remove=[self.parameter_name]),
+            'hidden_params': [
+                (key, value) for key, value in changelist.get_filters_params().items()
+                if key != self.parameter_name
+                for value in (value if isinstance(value, list) else [value])
+            ],
+            'app_label': changelist.opts.app_label,
+            'model_name': changelist.opts.model_name,
+        }
+
+
+# === 3. OY FILTRI (keshlangan chegaralar) ===
+class MonthListFilter(admin.SimpleListFilter):
+    """ Oy bo'yicha filtr. MIN/MAX sana keshda saqlanadi, filtr esa indeksli oraliq. """
+    title = _("oy")
+    parameter_name = 'month'
+    date_field = 'date'
+    max_months = 36
+
+    def lookups(self, request, model_admin):
+        queryset = model_admin.get_queryset(request)
+        key = _query_cache_key('date-bounds', queryset.order_by())
+        bounds = cache.get(key)
+        if bounds is None:
+            bounds = queryset.order_by().aggregate(first=Min(self.date_field), last=Max(self.date_field))
+            cache.set(key, bounds, getattr(settings, 'ADMIN_DATE_BOUNDS_CACHE_TIMEOUT', 60 * 60))
+        if not bounds['first']:
+            return ()
+
+        months = []
+        month = bounds['last'].replace(day=1)
+        first = bounds['first'].replace(day=1)
+        while month >= first and len(months) < self.max_months:
+            months.append((month.strftime('%Y-%m'), month.strftime('%Y-%m')))
+            month -= relativedelta(months=1)
+        return months
+
+    def queryset(self, request, queryset):
+        if not self.value():
+            return queryset
+        try:
+            start = datetime.datetime.strptime(self.value(), '%Y-%m').date()
+        except ValueError:
+            return queryset
+        end = start + relativedelta(months=1) - datetime.timedelta(days=1)
+        return queryset.filter(**{f"{self.date_field}__gte": start, f"{self.date_field}__lte": end})
+
+
+# === 4. CHANGELIST JAMILARI ===
+class ChangeListSummaryMixin:
+    """
+    Changelist ostida jamilar. Changelist ishlatgan filtrlangan QuerySet
+    (`cl.queryset`) bir marta (tur, kategoriya, oy) bo'yicha guruhlanadi;
+    tur, kategoriya, oy va umumiy jamilar shu qatorlardan Python'da yig'iladi.
+    Sahifadagi qatorlar aylanib chiqilmaydi. Katta jadvallarda
+    `summary_cache_timeout` berilsa, natija filtrlar bo'yicha keshlanadi.
+    """
+    change_list_template = 'admin/myapp/change_list_summary.html'
+    # {ustun_nomi: (sarlavha, maydon)}
+    summary_fields = {'amount': (_("Summa"), 'amount')}
+    summary_type_field = 'category__type'
+    summary_category_field = 'category__full_path'
+    summary_month_field = None
+    summary_cache_timeout = None
+
+    def get_summary_rows(self, queryset):
+        group = {
+            # Model maydonlari bilan to'qnashmasligi uchun prefiksli nomlar
+            'summary_type': F(self.summary_type_field),
+            'summary_category': F(self.summary_category_field),
+        }
+        if self.summary_month_field:
+            group['summary_month'] = TruncMonth(self.summary_month_field)
+        totals = {name: Sum(field) for name, (_label, field) in self.summary_fields.items()}
+        rows = queryset.order_by().values(**group).annotate(count=Count('pk'), **totals)
+        if not self.summary_cache_timeout:
+            return list(rows)
+        key = _query_cache_key('summary', rows)
+        result = cache.get(key)
+        if result is None:
+            result = list(rows)
+            cache.set(key, result, self.summary_cache_timeout)
+        return result
+
+    def get_summary(self, queryset):
+        """ [(sarlavha, [{'label', 'count', 'values': [...]}, ...]), ...] """
+        columns = list(self.summary_fields)
+        sections = {'type': {}, 'category': {}, 'month': {}}
+        total = dict.fromkeys(columns + ['count'], 0)
+        for row in self.get_summary_rows(queryset):
+            keys = {
+                'type': dict(TYPE_CHOICES).get(row['summary_type'], row['summary_type'] or '—'),
+                'category': row['summary_category'] or _("Kategoriyasiz"),
+                'month': row['summary_month'].strftime('%Y-%m') if row.get('summary_month') else None,
+            }
+            for section, key in keys.items():
+                if key is None:
+                    continue
+                bucket = sections[section].setdefault(key, dict.fromkeys(columns + ['count'], 0))
+                for column in columns + ['count']:
+                    bucket[column] += row[column] or 0
+            for column in columns + ['count']:
+                total[column] += row[column] or 0
+
+        def as_row(label, bucket):
+            return {'label': label, 'count': bucket['count'], 'values': [bucket[c] for c in columns]}
+
+        titles = {'type': _("Tur bo'yicha"), 'category': _("Kategoriya bo'yicha"), 'month': _("Oy bo'yicha")}
+        summary = []
+        for section, buckets in sections.items():
+            if buckets:
+                order = sorted(buckets, reverse=section == 'month')
+                summary.append((titles[section], [as_row(key, buckets[key]) for key in order]))
+        summary.append((_("Jami"), [as_row(_("Jami"), total)]))
+        return summary
+
+    def changelist_view(self, request, extra_context=None):
+        response = super().changelist_view(request, extra_context)
+        context = getattr(response, 'context_data', None)
+        if context and 'cl' in context:
+            context['summary'] = self.get_summary(context['cl'].queryset)
+            context['summary_columns'] = [label for label, _field in self.summary_fields.values()]
+        return response
@@ -0,0 +1,277 @@
+# myapp/benchmarks.py
+"""
+Mikro-benchmarklar: `python manage.py benchmark [nom ...]`.
+
+Har bir to'plam `@benchmark('nom')` bilan ro'yxatdan o'tadi va natijalar
+lug'atini qaytaradi (vaqtlar soniyada). To'plamlar bazaga murojaat qilmaydi —
+sintetik ma'lumotlar xotirada yasaladi.
+
+View'lar uchun alohida yuguruvchi — `run_view_benchmarks` (`python manage.py
+run_benchmarks`): har bir hajmda `fakedata` bilan ma'lumot yaratadi, asosiy
+sahifalarni o'lchaydi va oxirida hammasini orqaga qaytaradi (rollback).
+"""
+import datetime
+import random
+import time
+from decimal import Decimal
+
+import numpy as np
+from dateutil.relativedelta import relativedelta
+
+BENCHMARKS = {}
+
+
+def benchmark(name):
+    def register(func):
+        BENCHMARKS[name] = func
+        return func
+    return register
+
+
+def best_of(func, repeat=3):
+    """ `repeat` marta ishga tushirib, eng yaxshi vaqtni (soniya) qaytaradi. """
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - started)
+    return min(timings)
+
+
+# === 1. PUL OQIMI PROGNOZI ===
+def _naive_expand(rows, horizon_end):
+    """ Taqqoslash uchun: jadvallarni oyma-oy Python siklida yoyish. """
+    from .recurring import occurrences_between
+
+    result = []
+    for dom, start, end, after, amount in rows:
+        first = max(start, after + datetime.timedelta(days=1))
+        last = min(end, horizon_end) if end else horizon_end
+        result.extend((day, amount) for day in occurrences_between(dom, first, last))
+    return result
+
+
+@benchmark('projection')
+def projection_suite(schedules=10_000, months=24, seed=1):
+    """ 10k jadval x 24 oy: NumPy yoyish va oddiy Python sikli. """
+    from .projections import expand_schedules, _NO_END
+
+    rng = random.Random(seed)
+    today = datetime.date(2025, 1, 15)
+    horizon_end = today.replace(day=1) + relativedelta(months=months) - datetime.timedelta(days=1)
+    rows = []
+    for _ in range(schedules):
+        start = today - datetime.timedelta(days=rng.randint(0, 400))
+        end = today + datetime.timedelta(days=rng.randint(30, 900)) if rng.random() < 0.3 else None
+        rows.append((rng.randint(1, 30), start, end, today, rng.randint(1, 10_000_000) * (rng.choice((1, -1)))))
+
+    arrays = (
+        np.array([row[0] for row in rows], dtype=np.int64),
+        np.array([row[1] for row in rows], dtype='datetime64[D]'),
+        np.array([row[2] or _NO_END for row in rows], dtype='datetime64[D]'),
+        np.array([row[4] for row in rows], dtype=np.int64),
+        np.array([row[3] for row in rows], dtype='datetime64[D]'),
+    )
+    vectorized = best_of(lambda: expand_schedules(*arrays, horizon_end=horizon_end))
+    naive = best_of(lambda: _naive_expand(rows, horizon_end), repeat=1)
+
+    dates, _ = expand_schedules(*arrays, horizon_end=horizon_end)
+    assert len(dates) == len(_naive_expand(rows, horizon_end))
+    return {
+        'schedules': schedules,
+        'months': months,
+        'occurrences': int(len(dates)),
+        'numpy_s': vectorized,
+        'python_s': naive,
+        'speedup': naive / vectorized if vectorized else None,
+    }
+
+
+# === 2. VALYUTA FORMATI ===
+def _legacy_currency(value, currency_symbol=' so\'m'):
+    """ Taqqoslash uchun: `currency` filtrining avvalgi (belgima-belgi) varianti. """
+    if value is None or value == '':
+        return f'0{currency_symbol}'
+    try:
+        value = Decimal(str(value))
+        s = str(int(value))
+        is_negative = s.startswith('-')
+        if is_negative:
+            s = s[1:]
+        new_integer_part = ''
+        for i, digit in enumerate(reversed(s)):
+            if i > 0 and i % 3 == 0:
+                new_integer_part += ' '
+            new_integer_part += digit
+        result = f"{''.join(reversed(new_integer_part))}{currency_symbol}"
+        return f"-{result}" if is_negative else result
+    except Exception:
+        return f"{str(value)}{currency_symbol}"
+
+
+CURRENCY_EDGE_CASES = (
+    None, '', 0, 7, -7, 999, 1000, -1000, 1234567, Decimal('1234567.89'), Decimal('-0.50'),
+    Decimal('-1234.99'), Decimal('NaN'), Decimal('Infinity'), 12.75, -0.4, 1e20, 1e23, 2.0 ** 70,
+    1.2345678901234567e25, float('nan'), float('-inf'), '1500.5', '  42 ', 'abc', True, 10 ** 30,
+)
+
+
+@benchmark('currency')
+def currency_suite(rows=20_000, distinct=2_000, seed=1):
+    """ Oylik ro'yxatdagidek: 20k summa (takrorlar bilan) — avvalgi, yangi, kesh va ro'yxat. """
+    from .templatetags.custom_filters import (
+        _format_currency, _format_currency_cached, currency, currency_many,
+    )
+
+    rng = random.Random(seed)
+    pool = [Decimal(rng.randint(1, 50_000_000)) / 100 for _ in range(distinct)]
+    values = [rng.choice(pool) for _ in range(rows)]
+
+    for value in CURRENCY_EDGE_CASES + tuple(pool[:100]):
+        assert currency(value) == _legacy_currency(value), value
+    assert currency_many(values) == [_legacy_currency(value) for value in values]
+
+    legacy = best_of(lambda: [_legacy_currency(value) for value in values])
+    plain = best_of(lambda: [_format_currency(value, ' so\'m') for value in values])
+
+    def cached():
+        _format_currency_cached.cache_clear()
+        return [currency(value) for value in values]
+
+    return {
+        'rows': rows,
+        'distinct': distinct,
+        'legacy_s': legacy,
+        'new_s': plain,
+        'cached_s': best_of(cached),
+        'many_s': best_of(lambda: currency_many(values)),
+        'speedup': legacy / plain if plain else None,
+    }
+
+
+# === 3. VIEW'LAR (baza bilan) ===
+VIEW_BENCHMARKS = (
+    # (nom, url nomi, GET parametrlari — {year}/{month} bugungi oy bilan to'ldiriladi)
+    ('dashboard_view', 'dashboard', {}),
+    ('get_transactions_list_partial', 'transactions_list_partial', {'year': '{year}', 'month': '{month}'}),
+    ('add_transaction_view', 'add_transaction', {}),
+)
+# Har bir hajmda foydalanuvchilar hajm guruhlariga bo'linadi: (nom, --density ko'paytiruvchisi).
+# Har guruhdan bitta foydalanuvchi o'lchanadi — view vaqti foydalanuvchi ma'lumoti hajmiga qanday bog'liq.
+VOLUME_TIERS = (('light', 0.25), ('medium', 1.0), ('heavy', 4.0))
+
+
+def time_view(client, user_id, url, params, repeat=3):
+    """
+    Bitta sahifa: `cold` — foydalanuvchi kesh versiyasi oshirilgandan keyin, `warm` —
+    darhol qayta so'rov. Boshqa foydalanuvchilar keshiga tegilmaydi (`cache.clear()` yo'q).
+    Vaqtlar millisekundda, `queries` — sovuq so'rovdagi SQL soni.
+    """
+    from django.db import connection
+    from django.test.utils import CaptureQueriesContext
+    from .caching import CATEGORIES, bump_data_version
+
+    cold, warm, queries, status = [], [], 0, None
+    for _ in range(repeat):
+        bump_data_version(user_id)
+        bump_data_version(user_id, CATEGORIES)
+        with CaptureQueriesContext(connection) as captured:
+            started = time.perf_counter()
+            status = client.get(url, params).status_code
+            cold.append(time.perf_counter() - started)
+        queries = len(captured)
+        started = time.perf_counter()
+        client.get(url, params)
+        warm.append(time.perf_counter() - started)
+    return {
+        'status': status,
+        'queries': queries,
+        'cold_ms': round(min(cold) * 1000, 2),
+        'warm_ms': round(min(warm) * 1000, 2),
+    }
+
+
+def time_process_recurring(today, repeat=3):
+    """ Hamma jadvallar muddati kelgan kunda `RecurringEngine` (har safar rollback). """
+    from django.db import transaction
+    from .recurring import RecurringEngine
+
+    timings, report = [], None
+    for _ in range(repeat):
+        with transaction.atomic():
+            started = time.perf_counter()
+            report = RecurringEngine(today=today, catch_up=True).run()
+            timings.append(time.perf_counter() - started)
+            transaction.set_rollback(True)
+    return {
+        'schedules': report.selected,
+        'created': report.created,
+        'ms': round(min(timings) * 1000, 2),
+    }
+
+
+def run_view_benchmarks(sizes=(1, 5, 20), years=2, density=1.0, repeat=3, seed=1, progress=None):
+    """
+    Har bir hajm (foydalanuvchilar soni) uchun ma'lumot yaratib, view'larni har bir
+    hajm guruhidan (`VOLUME_TIERS`) bitta foydalanuvchi uchun va `process_recurring` ni
+    o'lchaydi. Baza oxirida avvalgi holatiga qaytadi.
+    """
+    from django.db import transaction
+    from django.test import Client
+    from django.urls import reverse
+    from django.utils import timezone
+    from .fakedata import generate_fake_data
+    from .models import CustomUser, Transaction
+
+    today = timezone.localdate()
+    results = []
+    for size in sizes:
+        with transaction.atomic():
+            generated = [
+                (label, generate_fake_data(users=max(1, size // len(VOLUME_TIERS)), years=years,
+                                           density=density * factor, seed=seed + index,
+                                           prefix=f"bench{size}{label}", today=today))
+                for index, (label, factor) in enumerate(VOLUME_TIERS)
+            ]
+            row = {
+                'users': size,
+                'transactions': Transaction.objects.count(),
+                'generate_s': round(sum(report.elapsed for _, report in generated), 2),
+                'tiers': {},
+            }
+            for label, report in generated:
+                user = CustomUser.objects.get(pk=report.user_ids[0])
+                client = Client(SERVER_NAME='localhost')
+                client.force_login(user)
+                tier = row['tiers'][label] = {
+                    'user_transactions': Transaction.objects.filter(user=user).count(),
+                    'views': {},
+                }
+                for name, url_name, params in VIEW_BENCHMARKS:
+                    params = {key: value.format(year=today.year, month=today.month) for key, value in params.items()}
+                    tier['views'][name] = time_view(client, user.pk, reverse(url_name), params, repeat)
+            row['process_recurring'] = time_process_recurring(today + relativedelta(months=1), repeat)
+            transaction.set_rollback(True)
+        results.append(row)
+        if progress:
+            progress(row)
+    return results
+
+
+def compare_results(old, new):
+    """ Ikki natija faylidan (hajm, guruh, view) bo'yicha vaqt nisbatlari: yangi / eski. """
+    def timings(results):
+        values = {}
+        for row in results['sizes']:
+            for label, tier in row.get('tiers', {}).items():
+                for name, timing in tier['views'].items():
+                    values[(row['users'], label, name)] = timing['cold_ms']
+            if 'process_recurring' in row:
+                values[(row['users'], '-', 'process_recurring')] = row['process_recurring']['ms']
+        return values
+
+    before, after = timings(old), timings(new)
+    return {
+        key: round(after[key] / before[key], 2)
+        for key in sorted(after) if before.get(key)
+    }
@@ -0,0 +1,89 @@
+# myapp/budgets.py
+"""
+Budjet sarf hisoblagichlari va chegara ogohlantirishlari.
+
+Rollup deltalari (`rollups.apply_deltas`) shu yerga ham uzatiladi: har bir
+xarajat deltasi mos budjetlarning (kategoriya va uning ota-bobolari, o'sha oy)
+`spent_total` maydoniga F() bilan qo'shiladi. Keyin faqat shu budjetlar
+darajasi tekshiriladi — oyni qayta yig'ish yo'q, har bir yozuvga O(1) so'rov.
+Chegara (`warning_threshold` yoki 100%) kesib o'tilsa `BudgetAlert` yoziladi.
+"""
+from decimal import Decimal
+
+from django.db.models import F
+
+from .models import BUDGET_ALERT_MAX_PERCENT, Budget, BudgetAlert, Category
+
+
+def ancestor_ids(path):
+    """ "/1/5/12/" -> [1, 5, 12] (kategoriyaning o'zi ham). """
+    return [int(pk) for pk in path.strip('/').split('/') if pk]
+
+
+def apply_budget_deltas(deltas):
+    """ Rollup deltalaridan budjet hisoblagichlarini yangilaydi. Yangi ogohlantirishlarni qaytaradi. """
+    changes = {}
+    for (user_id, month, category_id, category_type), (amount, count) in deltas.items():
+        if category_type == 'EXPENSE' and category_id and amount:
+            key = (user_id, month, category_id)
+            changes[key] = changes.get(key, Decimal('0')) + amount
+    if not changes:
+        return []
+
+    paths = dict(Category.objects.filter(
+        pk__in={category_id for _, _, category_id in changes}
+    ).values_list('pk', 'path'))
+
+    alerts = []
+    for (user_id, month, category_id), amount in changes.items():
+        if not amount or category_id not in paths:
+            continue
+        budgets = Budget.objects.filter(
+            user_id=user_id, month=month, category_id__in=ancestor_ids(paths[category_id])
+        )
+        if budgets.update(spent_total=F('spent_total') + amount):
+            alerts.extend(check_budget_alerts(budgets))
+    return alerts
+
+
+def check_budget_alerts(budgets):
+    """
+    Budjetlar darajasini hisoblagich bo'yicha tekshiradi. Daraja oshsa — `BudgetAlert`,
+    tushsa (tranzaksiya o'chirilgan) — jimgina pasaytiriladi, keyin qayta ogohlantirish mumkin.
+    Daraja shartli UPDATE bilan almashtiriladi, shuning uchun parallel yozuvlar
+    bitta chegara uchun ikki marta ogohlantirmaydi.
+    """
+    alerts = []
+    for budget in budgets.filter(is_active=True).only(
+        'pk', 'user_id', 'amount', 'spent_total', 'warning_threshold', 'alert_level'
+    ):
+        level = budget.compute_alert_level(budget.spent_total)
+        if level == budget.alert_level:
+            continue
+        if not Budget.objects.filter(pk=budget.pk, alert_level=budget.alert_level).update(alert_level=level):
+            continue
+        if level > budget.alert_level:
+            alerts.append(BudgetAlert.objects.create(
+                user_id=budget.user_id,
+                budget_id=budget.pk,
+                level=level,
+                spent=budget.spent_total,
+                percent=min(round(budget.spent_total * 100 / budget.amount, 2), BUDGET_ALERT_MAX_PERCENT),
+            ))
+    return alerts
+
+
+def refresh_budget_counters(budgets=None):
+    """
+    Hisoblagichlarni rollup jadvalidan qayta hisoblaydi (kategoriya ko'chirilganda,
+    o'chirilganda yoki rollup qayta qurilganda). Ogohlantirish chiqarmaydi.
+    """
+    budgets = Budget.objects.all() if budgets is None else budgets
+    rows = list(budgets.with_spending().select_related(None).only(
+        'pk', 'amount', 'warning_threshold', 'spent_total', 'alert_level'
+    ))
+    for budget in rows:
+        budget.spent_total = budget.spent
+        budget.alert_level = budget.compute_alert_level(budget.spent)
+    Budget.objects.bulk_update(rows, ['spent_total', 'alert_level'], batch_size=1000)
+    return len(rows)
@@ -0,0 +1,108 @@
+# myapp/caching.py
+"""
+Foydalanuvchi ma'lumotlari uchun versiyalangan kesh.
+
+Har bir foydalanuvchining "ma'lumot versiyasi" bor. `Transaction` yoki
+`Category` yozilganda versiya oshiriladi (signals.py), shuning uchun eski
+kalitlar o'z-o'zidan eskiradi — keshni qo'lda tozalash shart emas.
+Global kategoriyalar (user=None) uchun alohida umumiy versiya yuritiladi.
+"""
+import hashlib
+import json
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Max, Sum
+
+from .models import MonthlyCategoryTotal
+from .services import get_dashboard_totals, build_category_catalogue
+
+GLOBAL_SCOPE = 'global'
+
+
+# Versiya nomlari: 'data' — har qanday yozuv, 'categories' — faqat kategoriyalar
+DATA = 'data'
+CATEGORIES = 'categories'
+
+
+def _version_key(scope, namespace=DATA):
+    return f"daromad:{namespace}-version:{scope}"
+
+
+def get_data_version(user_id, namespace=DATA):
+    """
+    Foydalanuvchi va global versiyalarni birlashtirib qaytaradi (bitta kesh murojaati).
+    Versiya hali yo'q bo'lsa — vaqt asosida boshlanadi, shunda kesh tozalangandan
+    keyin ham eski kalitlar bilan to'qnashuv bo'lmaydi.
+    """
+    keys = [_version_key(user_id, namespace), _version_key(GLOBAL_SCOPE, namespace)]
+    versions = cache.get_many(keys)
+    for key in keys:
+        if key not in versions:
+            versions[key] = time.time_ns()
+            cache.add(key, versions[key], None)
+    return f"{versions[keys[0]]}.{versions[keys[1]]}"
+
+
+def bump_data_version(user_id=None, namespace=DATA):
+    """ Foydalanuvchi (yoki `user_id=None` bo'lsa — global) versiyasini oshiradi. """
+    key = _version_key(GLOBAL_SCOPE if user_id is None else user_id, namespace)
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.set(key, time.time_ns(), None)
+
+
+def dashboard_cache_key(user_id, start_of_month, end_date):
+    version = get_data_version(user_id)
+    return f"daromad:dashboard:{user_id}:{start_of_month:%Y-%m}:{end_date:%d}:{version}"
+
+
+def get_cached_dashboard_totals(user, start_of_month, end_date):
+    """
+    `services.get_dashboard_totals` natijasini (user, yil, oy, versiya) kaliti
+    bilan keshlaydi. Versiya o'zgarmaguncha jadvallarga murojaat qilinmaydi.
+    """
+    key = dashboard_cache_key(user.pk, start_of_month, end_date)
+    totals = cache.get(key)
+    if totals is None:
+        totals = get_dashboard_totals(user, start_of_month, end_date)
+        cache.set(key, totals, getattr(settings, 'DASHBOARD_CACHE_TIMEOUT', 60 * 60 * 24))
+    return totals
+
+
+# === OY BO'YICHA O'ZGARISH BELGISI (ETag / Last-Modified) ===
+def get_month_marker(user_id, month):
+    """
+    Foydalanuvchining bitta oyi uchun arzon o'zgarish belgisi:
+    (oxirgi o'zgarish vaqti, qatorlar soni, kategoriya versiyasi).
+    Faqat rollup jadvali (user, month) indeksi bo'yicha o'qiladi —
+    tranzaksiyalar jadvaliga murojaat yo'q.
+    """
+    marker = MonthlyCategoryTotal.objects.filter(user_id=user_id, month=month).aggregate(
+        last_modified=Max('updated_at'),
+        count=Sum('count'),
+    )
+    return marker['last_modified'], marker['count'] or 0, get_data_version(user_id, CATEGORIES)
+
+
+def fragment_cache_key(etag):
+    return f"daromad:fragment:{etag}"
+
+
+# === KATEGORIYALAR KATALOGI ===
+def category_catalogue_etag(user_id):
+    """ Katalog ETag'i faqat kesh versiyasidan olinadi — bazaga murojaat yo'q. """
+    version = get_data_version(user_id, CATEGORIES)
+    return hashlib.md5(f"{user_id}:{version}".encode()).hexdigest()
+
+
+def get_cached_category_catalogue(user):
+    """ Katalogning tayyor JSON matni; `Category` yozilganda versiya bilan eskiradi. """
+    key = f"daromad:catalogue:{user.pk}:{category_catalogue_etag(user.pk)}"
+    payload = cache.get(key)
+    if payload is None:
+        payload = json.dumps(build_category_catalogue(user), ensure_ascii=False)
+        cache.set(key, payload, getattr(settings, 'CATEGORY_CATALOGUE_CACHE_TIMEOUT', 60 * 60 * 24 * 7))
+    return payload
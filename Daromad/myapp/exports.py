@@ -0,0 +1,165 @@
+# myapp/exports.py
+"""
+Tranzaksiyalarni CSV va XLSX formatida oqim (stream) ko'rinishida eksport qilish.
+
+Qatorlar `.iterator(chunk_size=...)` bilan bo'laklab o'qiladi va darhol
+yoziladi — xotira sarfi eksport hajmiga bog'liq emas (millionlab qator
+uchun ham o'zgarmas). XLSX fayl standart `zipfile` yordamida qismlab
+yig'iladi, tashqi kutubxona kerak emas.
+"""
+import csv
+import re
+import zipfile
+from xml.sax.saxutils import escape as xml_escape
+
+from .models import Transaction
+
+EXPORT_CHUNK_SIZE = 2000
+
+EXPORT_HEADERS = ['Sana', 'Turi', 'Yuqori kategoriya', 'Kategoriya', 'Miqdor', 'Izoh', 'Avtomatik']
+
+TYPE_LABELS = {'INCOME': 'Daromad', 'EXPENSE': 'Xarajat'}
+
+# XML 1.0 da ruxsat etilmagan belgilar (escape ham yordam bermaydi) — varaq buzilmasligi uchun olib tashlanadi
+_XML_ILLEGAL = re.compile(r'[\x00-\x08\x0b\x0c\x0e-\x1f\ud800-\udfff\ufffe\uffff]')
+
+
+# === 1. MA'LUMOTLAR ===
+def export_queryset(user, start=None, end=None, type_=None):
+    """ Eksport uchun tranzaksiyalar (faqat kerakli ustunlar, sana bo'yicha tartiblangan). """
+    qs = Transaction.objects.filter(user=user)
+    if start:
+        qs = qs.filter(date__gte=start)
+    if end:
+        qs = qs.filter(date__lte=end)
+    if type_ in TYPE_LABELS:
+        qs = qs.filter(category__type=type_)
+    return qs.order_by('date', 'id').values_list(
+        'date', 'category__type', 'category__parent__name', 'category__name',
+        'amount', 'description', 'is_automated',
+    )
+
+
+def iter_export_rows(queryset):
+    """ Sarlavha va har bir qatorni (ro'yxat ko'rinishida) bo'laklab qaytaradi. """
+    yield EXPORT_HEADERS
+    for day, type_, parent_name, name, amount, description, is_automated in queryset.iterator(
+        chunk_size=EXPORT_CHUNK_SIZE
+    ):
+        yield [
+            day.isoformat(),
+            TYPE_LABELS.get(type_, ''),
+            parent_name or '',
+            name or 'Kategoriyasiz',
+            amount,
+            description,
+            'Ha' if is_automated else "Yo'q",
+        ]
+
+
+# === 2. CSV ===
+class _Echo:
+    """ csv.writer uchun "fayl": yozilgan satrni shunchaki qaytaradi. """
+    def write(self, value):
+        return value
+
+
+def stream_csv(queryset):
+    """ CSV satrlarini birma-bir qaytaradi (Excel o'zbekcha harflarni tanishi uchun BOM bilan). """
+    writer = csv.writer(_Echo())
+    yield '\ufeff'
+    for row in iter_export_rows(queryset):
+        yield writer.writerow(row)
+
+
+# === 3. XLSX ===
+_CONTENT_TYPES = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+    '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+    '<Default Extension="xml" ContentType="application/xml"/>'
+    '<Override PartName="/xl/workbook.xml" '
+    'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet.main+xml"/>'
+    '<Override PartName="/xl/worksheets/sheet1.xml" '
+    'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.worksheet+xml"/>'
+    '</Types>'
+)
+_ROOT_RELS = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+    '<Relationship Id="rId1" '
+    'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument" '
+    'Target="xl/workbook.xml"/>'
+    '</Relationships>'
+)
+_WORKBOOK = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<workbook xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main" '
+    'xmlns:r="http://schemas.openxmlformats.org/officeDocument/2006/relationships">'
+    '<sheets><sheet name="Tranzaksiyalar" sheetId="1" r:id="rId1"/></sheets>'
+    '</workbook>'
+)
+_WORKBOOK_RELS = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+    '<Relationship Id="rId1" '
+    'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/worksheet" '
+    'Target="worksheets/sheet1.xml"/>'
+    '</Relationships>'
+)
+_SHEET_HEAD = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<worksheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main"><sheetData>'
+)
+_SHEET_TAIL = '</sheetData></worksheet>'
+
+
+class _ZipStream:
+    """ Qayta o'qib bo'lmaydigan (unseekable) buffer: zipfile yozganini yig'ib, bo'lib beradi. """
+    def __init__(self):
+        self._chunks = []
+
+    def write(self, data):
+        self._chunks.append(bytes(data))
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def drain(self):
+        data = b''.join(self._chunks)
+        self._chunks = []
+        return data
+
+
+def _xlsx_cell(value):
+    if isinstance(value, (int, float)) or hasattr(value, 'as_tuple'):
+        return f'<c><v>{value}</v></c>'
+    text = xml_escape(_XML_ILLEGAL.sub('', str(value)))
+    return f'<c t="inlineStr"><is><t xml:space="preserve">{text}</t></is></c>'
+
+
+def stream_xlsx(queryset):
+    """ XLSX faylni bayt bo'laklari ko'rinishida qaytaradi. """
+    buffer = _ZipStream()
+    with zipfile.ZipFile(buffer, 'w', compression=zipfile.ZIP_DEFLATED) as archive:
+        archive.writestr('[Content_Types].xml', _CONTENT_TYPES)
+        archive.writestr('_rels/.rels', _ROOT_RELS)
+        archive.writestr('xl/workbook.xml', _WORKBOOK)
+        archive.writestr('xl/_rels/workbook.xml.rels', _WORKBOOK_RELS)
+        yield buffer.drain()
+
+        with archive.open('xl/worksheets/sheet1.xml', 'w', force_zip64=True) as sheet:
+            sheet.write(_SHEET_HEAD.encode())
+            for index, row in enumerate(iter_export_rows(queryset), start=1):
+                sheet.write(('<row>' + ''.join(_xlsx_cell(value) for value in row) + '</row>').encode())
+                if index % EXPORT_CHUNK_SIZE == 0:
+                    yield buffer.drain()
+            sheet.write(_SHEET_TAIL.encode())
+    yield buffer.drain()
+
+
+EXPORT_FORMATS = {
+    'csv': (stream_csv, 'text/csv; charset=utf-8'),
+    'xlsx': (stream_xlsx, 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'),
+}
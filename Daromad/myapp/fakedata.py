@@ -0,0 +1,213 @@
+# myapp/fakedata.py
+"""
+Ishlab chiqarish hajmidagi sintetik ma'lumotlar: foydalanuvchilar, kategoriya
+daraxtlari, bir necha yillik tranzaksiyalar, takrorlanuvchi jadvallar va budjetlar.
+
+Hammasi `bulk_create` bilan yoziladi (signal'lar ishlamaydi), shuning uchun
+daraxt maydonlari (`path`, `full_path`, ...) va `next_run_date` shu yerda
+to'ldiriladi, rollup va budjet hisoblagichlari esa oxirida qayta quriladi.
+Bir xil `seed` — bir xil ma'lumot.
+"""
+import datetime
+import random
+import time
+from dataclasses import dataclass, field
+from decimal import Decimal
+
+from dateutil.relativedelta import relativedelta
+from django.contrib.auth.hashers import make_password
+from django.db import transaction
+from django.utils import timezone
+
+from .models import Budget, Category, CustomUser, RecurringSchedule, Transaction
+from .rollups import rebuild_rollups
+
+BATCH_SIZE = 5000
+
+# (nom, bitta tranzaksiya summasi oralig'i (so'm), oyiga necha marta, pastki kategoriyalar)
+EXPENSE_TREE = (
+    ('Oziq-ovqat', (20_000, 400_000), 10, (
+        ('Bozor', (30_000, 500_000), 6, ()),
+        ('Kafe', (15_000, 150_000), 5, (
+            ('Qahva', (12_000, 40_000), 6, ()),
+        )),
+    )),
+    ('Transport', (5_000, 60_000), 6, (
+        ('Taksi', (12_000, 90_000), 8, ()),
+        ('Metro', (2_000, 2_000), 20, ()),
+        ('Yoqilg\'i', (100_000, 400_000), 3, ()),
+    )),
+    ('Kommunal', (50_000, 300_000), 1, (
+        ('Elektr', (60_000, 250_000), 1, ()),
+        ('Gaz', (40_000, 300_000), 1, ()),
+        ('Internet', (100_000, 200_000), 1, ()),
+    )),
+    ('Sog\'liq', (30_000, 700_000), 1, ()),
+    ('Ko\'ngilochar', (40_000, 600_000), 2, ()),
+    ('Kiyim', (100_000, 1_500_000), 1, ()),
+)
+INCOME_TREE = (
+    ('Maosh', (4_000_000, 15_000_000), 1, ()),
+    ('Frilans', (500_000, 5_000_000), 1, ()),
+    ('Sovg\'a', (100_000, 1_000_000), 0.2, ()),
+)
+FIRST_NAMES = ('Aziz', 'Dilnoza', 'Jasur', 'Kamola', 'Sardor', 'Nodira', 'Otabek', 'Malika', 'Bekzod', 'Lola')
+LAST_NAMES = ('Karimov', 'Saidova', 'Aliyev', 'Yusupova', 'Nazarov', 'Qodirova', 'Tursunov', 'Ergasheva')
+
+
+@dataclass
+class FakeDataReport:
+    users: int = 0
+    categories: int = 0
+    transactions: int = 0
+    schedules: int = 0
+    budgets: int = 0
+    elapsed: float = 0.0
+    user_ids: list = field(default_factory=list)
+
+
+class FakeDataGenerator:
+    """
+    `users` ta foydalanuvchi, har biriga `years` yillik ma'lumot.
+    `density` — tranzaksiyalar sonini ko'paytiruvchi (1.0 ≈ oyiga ~90 ta).
+    """
+
+    def __init__(self, users=10, years=2, density=1.0, seed=1, prefix='fake', today=None):
+        self.users = users
+        self.years = years
+        self.density = density
+        self.prefix = prefix
+        self.today = today or timezone.localdate()
+        self.rng = random.Random(seed)
+        self.report = FakeDataReport()
+
+    def run(self):
+        started = time.perf_counter()
+        with transaction.atomic():
+            users = self.create_users()
+            # (foydalanuvchi, kategoriya, summa oralig'i, chastota)
+            nodes = self.create_categories(users)
+            self.create_transactions(nodes)
+            self.create_schedules(nodes)
+            self.create_budgets(nodes)
+            # bulk_create signal'siz — rollup va budjet hisoblagichlari qayta quriladi
+            for user in users:
+                rebuild_rollups(user=user)
+        self.report.elapsed = time.perf_counter() - started
+        return self.report
+
+    # --- Foydalanuvchilar ---
+    def create_users(self):
+        start = CustomUser.objects.filter(username__startswith=f"{self.prefix}_").count()
+        password = make_password('parol12345')  # hash bir marta hisoblanadi
+        users = CustomUser.objects.bulk_create([
+            CustomUser(
+                username=f"{self.prefix}_{start + index}",
+                password=password,
+                first_name=self.rng.choice(FIRST_NAMES),
+                last_name=self.rng.choice(LAST_NAMES),
+                date_joined=timezone.now() - datetime.timedelta(days=365 * self.years),
+            )
+            for index in range(self.users)
+        ], batch_size=BATCH_SIZE)
+        if users and users[0].pk is None:  # pk qaytarmaydigan bazalar uchun
+            users = list(CustomUser.objects.filter(username__in=[user.username for user in users]))
+        self.report.users = len(users)
+        self.report.user_ids = [user.pk for user in users]
+        return users
+
+    # --- Kategoriya daraxtlari (qavatma-qavat) ---
+    def create_categories(self, users):
+        level = [
+            (user, None, type_, node)
+            for user in users
+            for type_, tree in (('EXPENSE', EXPENSE_TREE), ('INCOME', INCOME_TREE))
+            for node in tree
+        ]
+        nodes = []
+        while level:
+            objs = Category.objects.bulk_create([
+                Category(user=user, name=node[0], type=type_, parent=parent)
+                for user, parent, type_, node in level
+            ], batch_size=BATCH_SIZE)
+            for obj in objs:
+                parent = obj.parent
+                obj.path = f"{parent.path if parent else '/'}{obj.pk}/"
+                obj.full_path = f"{parent.full_path}{Category.PATH_SEPARATOR}{obj.name}" if parent else obj.name
+                obj.root_id = (parent.root_id if parent else obj.pk)
+                obj.depth = parent.depth + 1 if parent else 0
+            Category.objects.bulk_update(objs, ['path', 'full_path', 'root', 'depth'], batch_size=BATCH_SIZE)
+
+            next_level = []
+            for obj, (user, _parent, type_, node) in zip(objs, level):
+                nodes.append((user, obj, node[1], node[2]))
+                next_level.extend((user, obj, type_, child) for child in node[3])
+            level = next_level
+        self.report.categories = len(nodes)
+        return nodes
+
+    # --- Tranzaksiyalar ---
+    def amount(self, low, high):
+        return Decimal(self.rng.randint(low // 1000, high // 1000) * 1000)
+
+    def months(self):
+        first = self.today.replace(day=1) - relativedelta(years=self.years)
+        month = first
+        while month <= self.today:
+            yield month
+            month += relativedelta(months=1)
+
+    def create_transactions(self, nodes):
+        batch = []
+        for month in self.months():
+            last_day = min((month + relativedelta(months=1) - datetime.timedelta(days=1)), self.today)
+            days = (last_day - month).days + 1
+            for user, category, (low, high), frequency in nodes:
+                expected = frequency * self.density
+                count = int(expected) + (self.rng.random() < expected % 1)
+                for _ in range(count):
+                    batch.append(Transaction(
+                        user=user, category=category, amount=self.amount(low, high),
+                        date=month + datetime.timedelta(days=self.rng.randrange(days)),
+                        description=self.rng.choice(('', '', '', 'Naqd', 'Karta orqali', 'Oilaviy')),
+                    ))
+            if len(batch) >= BATCH_SIZE:
+                self.report.transactions += len(Transaction.objects.bulk_create(batch, batch_size=BATCH_SIZE))
+                batch = []
+        self.report.transactions += len(Transaction.objects.bulk_create(batch, batch_size=BATCH_SIZE))
+
+    # --- Takrorlanuvchi jadvallar va budjetlar ---
+    def create_schedules(self, nodes):
+        recurring_names = {'Maosh', 'Internet', 'Elektr', 'Gaz'}
+        start = self.today.replace(day=1) - relativedelta(years=self.years)
+        schedules = []
+        for user, category, (low, high), _frequency in nodes:
+            if category.name not in recurring_names:
+                continue
+            schedule = RecurringSchedule(
+                user=user, category=category, amount=self.amount(low, high),
+                day_of_month=self.rng.randint(1, 28), start_date=start,
+                last_executed=self.today - datetime.timedelta(days=self.rng.randint(1, 40)),
+                note=f"{category.name} (avtomatik)",
+            )
+            schedule.next_run_date = schedule.compute_next_run_date()
+            schedules.append(schedule)
+        self.report.schedules = len(RecurringSchedule.objects.bulk_create(schedules, batch_size=BATCH_SIZE))
+
+    def create_budgets(self, nodes, months=12):
+        budgets = []
+        roots = [(user, category, low) for user, category, (low, _high), _f in nodes
+                 if category.type == 'EXPENSE' and category.depth == 0]
+        first = self.today.replace(day=1) - relativedelta(months=months - 1)
+        for offset in range(months):
+            month = first + relativedelta(months=offset)
+            for user, category, low in roots:
+                budgets.append(Budget(
+                    user=user, category=category, month=month,
+                    amount=Decimal(self.rng.randint(10, 60) * max(low, 50_000)),
+                ))
+        self.report.budgets = len(Budget.objects.bulk_create(budgets, batch_size=BATCH_SIZE))
+
+
+def generate_fake_data(**kwargs):
+    return FakeDataGenerator(**kwargs).run()
@@ -235,4 +235,45 @@ class RecurringScheduleForm(forms.ModelForm):
                 raise ValidationError("Miqdor musbat bo‘lishi kerak.")
             return decimal_value
         except (InvalidOperation, ValueError):
-            raise ValidationError("Noto‘g‘ri miqdor formati.")
\ No newline at end of file
+            raise ValidationError("Noto‘g‘ri miqdor formati.")
+
+
+class StatementImportForm(forms.Form):
+    """ Bank ko'chirmasi (CSV) importi: fayl va ustunlar moslamasi. """
+    file = forms.FileField(label=_("CSV fayl"))
+    date_column = forms.CharField(label=_("Sana ustuni"), initial='date')
+    amount_column = forms.CharField(
+        label=_("Summa ustuni"), initial='amount',
+        help_text=_("Musbat — daromad, manfiy — xarajat.")
+    )
+    description_column = forms.CharField(label=_("Izoh ustuni"), required=False, initial='description')
+    category_column = forms.CharField(label=_("Kategoriya ustuni"), required=False)
+    date_format = forms.CharField(
+        label=_("Sana formati"), required=False,
+        help_text=_("Masalan: %d.%m.%Y. Bo'sh bo'lsa — avtomatik aniqlanadi.")
+    )
+    delimiter = forms.ChoiceField(
+        label=_("Ajratuvchi"), choices=[(',', ','), (';', ';'), ('tab', 'TAB')], initial=','
+    )
+    income_category = forms.ModelChoiceField(
+        label=_("Standart daromad kategoriyasi"), queryset=Category.objects.none(), required=False
+    )
+    expense_category = forms.ModelChoiceField(
+        label=_("Standart xarajat kategoriyasi"), queryset=Category.objects.none(), required=False
+    )
+
+    def __init__(self, *args, user=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        for field in self.fields.values():
+            if not isinstance(field.widget, forms.FileInput):
+                field.widget.attrs.setdefault('class', TAILWIND_INPUT_CLASS)
+        if user:
+            categories = Category.objects.filter(
+                Q(user=user) | Q(user__isnull=True), is_active=True
+            ).select_related('parent')
+            self.fields['income_category'].queryset = categories.filter(type='INCOME')
+            self.fields['expense_category'].queryset = categories.filter(type='EXPENSE')
+
+    def clean_delimiter(self):
+        delimiter = self.cleaned_data['delimiter']
+        return '\t' if delimiter == 'tab' else delimiter
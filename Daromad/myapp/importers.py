@@ -0,0 +1,240 @@
+# myapp/importers.py
+"""
+Bank ko'chirmalarini (CSV) ommaviy import qilish.
+
+Fayl `csv.DictReader` bilan qatorma-qator (oqim) o'qiladi, qatorlar
+`batch_size` bo'yicha guruhlanib `bulk_create` bilan yoziladi. Har bir
+qatorning mazmun xeshi (`Transaction.import_hash`) saqlanadi — xuddi shu
+faylni qayta yuklash dublikat yaratmaydi.
+"""
+import csv
+import datetime
+import hashlib
+from collections import Counter
+from dataclasses import dataclass, field
+from decimal import Decimal
+
+from django.db import IntegrityError, transaction
+from django.db.models import Q
+
+from .caching import bump_data_version
+from .models import Category, Transaction
+from .rollups import apply_deltas, collect_deltas
+
+DEFAULT_DATE_FORMATS = ('%Y-%m-%d', '%d.%m.%Y', '%d/%m/%Y', '%d-%m-%Y')
+CENT = Decimal('0.01')
+# `Transaction.amount` sig'imi — kattaroq summa bazada DataError beradi
+AMOUNT_MAX_DIGITS = Transaction._meta.get_field('amount').max_digits
+
+
+@dataclass
+class ColumnMapping:
+    """ CSV ustun nomlari -> Transaction maydonlari. """
+    date: str = 'date'
+    amount: str = 'amount'
+    description: str = ''
+    category: str = ''
+    date_format: str = ''
+
+
+@dataclass
+class BatchResult:
+    number: int
+    created: int = 0
+    duplicates: int = 0
+    errors: list = field(default_factory=list)  # [(qator_raqami, xabar)]
+
+
+@dataclass
+class ImportReport:
+    batches: list = field(default_factory=list)
+
+    @property
+    def created(self):
+        return sum(batch.created for batch in self.batches)
+
+    @property
+    def duplicates(self):
+        return sum(batch.duplicates for batch in self.batches)
+
+    @property
+    def errors(self):
+        return [error for batch in self.batches for error in batch.errors]
+
+
+# === 1. QIYMATLARNI O'QISH ===
+def parse_amount(value):
+    """
+    Bank formatidagi summani tiyingacha yaxlitlangan Decimal'ga o'tkazadi:
+    "1 234 567,89", "-1,234.50", "+500" va h.k.
+    """
+    value = (value or '').strip().replace('\xa0', '').replace(' ', '')
+    if ',' in value and '.' in value:
+        value = value.replace(',', '')
+    else:
+        value = value.replace(',', '.')
+    try:
+        amount = Decimal(value)
+        if amount.is_finite():
+            amount = amount.quantize(CENT)  # 1e30 kabi qiymatlarda InvalidOperation
+    except ArithmeticError:
+        raise ValueError("Noto‘g‘ri summa")
+    if not amount.is_finite() or len(amount.as_tuple().digits) > AMOUNT_MAX_DIGITS:
+        raise ValueError("Noto‘g‘ri summa")
+    return amount
+
+
+def parse_date(value, date_format=''):
+    value = (value or '').strip()
+    formats = (date_format,) if date_format else DEFAULT_DATE_FORMATS
+    for fmt in formats:
+        try:
+            return datetime.datetime.strptime(value, fmt).date()
+        except ValueError:
+            continue
+    raise ValueError("Noto‘g‘ri sana")
+
+
+def content_hash(date, amount, description, occurrence):
+    """
+    Qator mazmunidan barqaror xesh. `occurrence` — faylda aynan shu qator
+    nechanchi marta uchrayotgani (bir kunda ikkita bir xil xarid bo'lishi mumkin).
+    """
+    raw = f"{date.isoformat()}|{amount:.2f}|{description.strip()}|{occurrence}"
+    return hashlib.sha256(raw.encode()).hexdigest()
+
+
+# === 2. IMPORT ===
+class StatementImporter:
+    """
+    Foydalanuvchi uchun CSV ko'chirmani import qiladi.
+    Musbat summa — daromad, manfiy — xarajat (miqdor musbat saqlanadi).
+    """
+
+    def __init__(self, user, mapping=None, income_category=None, expense_category=None,
+                 batch_size=1000, delimiter=','):
+        self.user = user
+        self.mapping = mapping or ColumnMapping()
+        self.defaults = {'INCOME': income_category, 'EXPENSE': expense_category}
+        self.batch_size = batch_size
+        self.delimiter = delimiter
+        self._occurrences = Counter()
+        self._categories = {
+            (category.type, category.name.casefold()): category
+            for category in Category.objects.filter(
+                Q(user=user) | Q(user__isnull=True), is_active=True
+            ).select_related('parent')
+        }
+
+    def build(self, line_number, row):
+        """ Bitta CSV qatoridan saqlanmagan Transaction yasaydi. """
+        mapping = self.mapping
+        day = parse_date(row.get(mapping.date), mapping.date_format)
+        signed_amount = parse_amount(row.get(mapping.amount))
+        if not signed_amount:  # "0.001" ham tiyinga yaxlitlanganda nol
+            raise ValueError("Summa nolga teng")
+        type_ = 'INCOME' if signed_amount > 0 else 'EXPENSE'
+        amount = abs(signed_amount)
+        description = (row.get(mapping.description) or '').strip() if mapping.description else ''
+
+        category = None
+        if mapping.category and row.get(mapping.category):
+            category = self._categories.get((type_, row[mapping.category].strip().casefold()))
+        category = category or self.defaults[type_]
+        if category is None:
+            # Kategoriyasiz qatorda daromad/xarajat belgisi yo'qolardi
+            raise ValueError("Kategoriya topilmadi va standart kategoriya tanlanmagan")
+
+        key = (day, amount, type_, description)
+        self._occurrences[key] += 1
+        tx = Transaction(
+            user=self.user,
+            amount=amount,
+            category=category,
+            date=day,
+            description=description,
+            import_hash=content_hash(day, amount if type_ == 'INCOME' else -amount,
+                                     description, self._occurrences[key]),
+        )
+        tx._import_line = line_number
+        return tx
+
+    def import_rows(self, rows, progress=None):
+        """
+        `rows` — (qator_raqami, dict) juftliklari oqimi. Har bir partiyadan keyin
+        `progress(BatchResult)` chaqiriladi. ImportReport qaytaradi.
+        """
+        report = ImportReport()
+        batch, number = [], 0
+        result = BatchResult(number=1)
+
+        line_number = 1
+        try:
+            for line_number, row in rows:
+                try:
+                    batch.append(self.build(line_number, row))
+                except ValueError as exc:
+                    result.errors.append((line_number, str(exc)))
+                if len(batch) >= self.batch_size:
+                    number += 1
+                    result.number = number
+                    self._flush(batch, result)
+                    report.batches.append(result)
+                    if progress:
+                        progress(result)
+                    batch, result = [], BatchResult(number=number + 1)
+        except csv.Error as exc:
+            # Buzilgan fayl (masalan, NUL bayt) — qolgan qismi o'qilmaydi,
+            # o'qilgan qatorlar esa odatdagidek yoziladi
+            result.errors.append((line_number + 1, f"Faylni o‘qib bo‘lmadi: {exc}"))
+
+        if batch or result.errors:
+            result.number = number + 1
+            self._flush(batch, result)
+            report.batches.append(result)
+            if progress:
+                progress(result)
+
+        if report.created:
+            bump_data_version(self.user.pk)
+        return report
+
+    def import_file(self, text_stream, progress=None):
+        """ Matnli fayl obyektidan (oqim) import qiladi. """
+        reader = csv.DictReader(text_stream, delimiter=self.delimiter)
+        # 1-qator — sarlavha, shuning uchun ma'lumotlar 2-qatordan boshlanadi
+        return self.import_rows(enumerate(reader, start=2), progress=progress)
+
+    def _existing_hashes(self, hashes):
+        return set(Transaction.objects.filter(
+            user=self.user, import_hash__in=hashes
+        ).values_list('import_hash', flat=True))
+
+    def _flush(self, batch, result, attempts=3):
+        """
+        Partiyani dublikatlarsiz yozadi va rollup'larni yangilaydi (bitta savepoint).
+        Xuddi shu ko'chirmani parallel import oldindan tekshiruvdan keyin yozib
+        ulgursa — savepoint bekor qilinadi va dublikatlar qayta so'raladi.
+        Urinishlar tugasa, partiya xato sifatida qayd etiladi (yozilmaydi).
+        """
+        if not batch:
+            return
+        hashes = [tx.import_hash for tx in batch]
+        for attempt in range(attempts):
+            try:
+                with transaction.atomic():
+                    existing = self._existing_hashes(hashes)
+                    new_rows = [tx for tx in batch if tx.import_hash not in existing]
+                    Transaction.objects.bulk_create(new_rows, batch_size=self.batch_size)
+                    apply_deltas(collect_deltas(new_rows))
+                break
+            except IntegrityError as exc:
+                if attempt == attempts - 1:
+                    lines = f"{batch[0]._import_line}–{batch[-1]._import_line}"
+                    result.errors.append((batch[0]._import_line, f"Partiyani yozib bo‘lmadi (qatorlar {lines}): {exc}"))
+                    return
+                for tx in batch:  # muvaffaqiyatli kichik partiyalardan qolgan pk'lar
+                    tx.pk = None
+                    tx._state.adding = True
+        result.created += len(new_rows)
+        result.duplicates += len(batch) - len(new_rows)
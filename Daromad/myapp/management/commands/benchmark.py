@@ -0,0 +1,23 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from myapp.benchmarks import BENCHMARKS
+
+
+class Command(BaseCommand):
+    help = "Mikro-benchmarklarni ishga tushiradi (myapp/benchmarks.py)."
+
+    def add_arguments(self, parser):
+        parser.add_argument('names', nargs='*', help="To'plam nomlari. Bo'sh bo'lsa — hammasi.")
+
+    def handle(self, *args, **options):
+        names = options['names'] or sorted(BENCHMARKS)
+        unknown = [name for name in names if name not in BENCHMARKS]
+        if unknown:
+            raise CommandError(f"Noma'lum benchmark: {', '.join(unknown)} (mavjud: {', '.join(sorted(BENCHMARKS))})")
+
+        for name in names:
+            self.stdout.write(self.style.NOTICE(f"== {name} =="))
+            for key, value in BENCHMARKS[name]().items():
+                if isinstance(value, float):
+                    value = f"{value:.4f}"
+                self.stdout.write(f"  {key}: {value}")
@@ -0,0 +1,42 @@
+import datetime
+import sys
+
+from django.core.management.base import BaseCommand, CommandError
+
+from myapp.exports import EXPORT_FORMATS, TYPE_LABELS, export_queryset
+from myapp.models import CustomUser
+
+
+class Command(BaseCommand):
+    help = "Foydalanuvchi tranzaksiyalarini CSV yoki XLSX faylga oqim bilan eksport qiladi."
+
+    def add_arguments(self, parser):
+        parser.add_argument('username')
+        parser.add_argument('--format', choices=sorted(EXPORT_FORMATS), default='csv')
+        parser.add_argument('--start', type=datetime.date.fromisoformat, help="YYYY-MM-DD")
+        parser.add_argument('--end', type=datetime.date.fromisoformat, help="YYYY-MM-DD")
+        parser.add_argument('--type', choices=sorted(TYPE_LABELS))
+        parser.add_argument('--output', '-o', help="Fayl yo'li (berilmasa — stdout).")
+
+    def handle(self, *args, **options):
+        try:
+            user = CustomUser.objects.get(username=options['username'])
+        except CustomUser.DoesNotExist:
+            raise CommandError(f"Foydalanuvchi topilmadi: {options['username']}")
+
+        streamer, _ = EXPORT_FORMATS[options['format']]
+        queryset = export_queryset(user, options['start'], options['end'], options['type'])
+
+        if options['output']:
+            out = open(options['output'], 'wb')
+        else:
+            out = sys.stdout.buffer
+        try:
+            for chunk in streamer(queryset):
+                out.write(chunk.encode() if isinstance(chunk, str) else chunk)
+        finally:
+            if options['output']:
+                out.close()
+
+        if options['output']:
+            self.stderr.write(self.style.SUCCESS(f"Eksport yakunlandi: {options['output']}"))
@@ -0,0 +1,33 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from myapp.fakedata import generate_fake_data
+
+
+class Command(BaseCommand):
+    help = (
+        "Sintetik ma'lumot yaratadi: foydalanuvchilar, kategoriya daraxtlari, tranzaksiyalar, "
+        "takrorlanuvchi jadvallar va budjetlar (bulk_create bilan)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=10)
+        parser.add_argument('--years', type=int, default=2, help="Necha yillik tranzaksiyalar.")
+        parser.add_argument('--density', type=float, default=1.0,
+                            help="Tranzaksiyalar zichligi (1.0 ≈ foydalanuvchiga oyiga ~90 ta).")
+        parser.add_argument('--seed', type=int, default=1)
+        parser.add_argument('--prefix', default='fake', help="Foydalanuvchi nomlari prefiksi: <prefix>_N.")
+
+    def handle(self, *args, **options):
+        if options['users'] < 1 or options['years'] < 1 or options['density'] <= 0:
+            raise CommandError("--users, --years va --density musbat bo'lishi kerak.")
+
+        report = generate_fake_data(
+            users=options['users'], years=options['years'], density=options['density'],
+            seed=options['seed'], prefix=options['prefix'],
+        )
+        self.stdout.write(self.style.SUCCESS(
+            f"Yaratildi: {report.users} ta foydalanuvchi, {report.categories} ta kategoriya, "
+            f"{report.transactions} ta tranzaksiya, {report.schedules} ta jadval, {report.budgets} ta budjet. "
+            f"{report.elapsed:.2f} s ({report.transactions / report.elapsed:.0f} tranzaksiya/s). "
+            f"Parol: parol12345"
+        ))
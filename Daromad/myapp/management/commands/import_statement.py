@@ -0,0 +1,68 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db.models import Q
+
+from myapp.importers import StatementImporter, ColumnMapping
+from myapp.models import CustomUser, Category
+
+
+class Command(BaseCommand):
+    help = "Bank ko'chirmasini (CSV) foydalanuvchi tranzaksiyalariga ommaviy import qiladi."
+
+    def add_arguments(self, parser):
+        parser.add_argument('username')
+        parser.add_argument('path', help="CSV fayl yo'li")
+        parser.add_argument('--date-column', default='date')
+        parser.add_argument('--amount-column', default='amount')
+        parser.add_argument('--description-column', default='description')
+        parser.add_argument('--category-column', default='')
+        parser.add_argument('--date-format', default='', help="Masalan: %%d.%%m.%%Y")
+        parser.add_argument('--delimiter', default=',')
+        parser.add_argument('--income-category', type=int, help="Standart daromad kategoriyasi ID")
+        parser.add_argument('--expense-category', type=int, help="Standart xarajat kategoriyasi ID")
+        parser.add_argument('--batch-size', type=int, default=1000)
+        parser.add_argument('--encoding', default='utf-8-sig')
+
+    def handle(self, *args, **options):
+        try:
+            user = CustomUser.objects.get(username=options['username'])
+        except CustomUser.DoesNotExist:
+            raise CommandError(f"Foydalanuvchi topilmadi: {options['username']}")
+
+        def category(pk, type_):
+            if pk is None:
+                return None
+            try:
+                # Faqat foydalanuvchining o'z yoki global kategoriyasi (forma bilan bir xil)
+                return Category.objects.get(Q(user=user) | Q(user__isnull=True), pk=pk, type=type_)
+            except Category.DoesNotExist:
+                raise CommandError(f"Kategoriya topilmadi: {pk} ({type_})")
+
+        importer = StatementImporter(
+            user,
+            mapping=ColumnMapping(
+                date=options['date_column'],
+                amount=options['amount_column'],
+                description=options['description_column'],
+                category=options['category_column'],
+                date_format=options['date_format'],
+            ),
+            income_category=category(options['income_category'], 'INCOME'),
+            expense_category=category(options['expense_category'], 'EXPENSE'),
+            batch_size=options['batch_size'],
+            delimiter=options['delimiter'],
+        )
+
+        def progress(batch):
+            self.stdout.write(
+                f"Partiya {batch.number}: +{batch.created}, dublikat {batch.duplicates}, xato {len(batch.errors)}"
+            )
+            for line_number, error in batch.errors:
+                self.stdout.write(self.style.ERROR(f"  {line_number}-qator: {error}"))
+
+        with open(options['path'], encoding=options['encoding'], newline='') as stream:
+            report = importer.import_file(stream, progress=progress)
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Import yakunlandi: {report.created} ta qo'shildi, {report.duplicates} ta dublikat, "
+            f"{len(report.errors)} ta xato."
+        ))
@@ -0,0 +1,34 @@
+from django.core.exceptions import ValidationError
+from django.core.management.base import BaseCommand, CommandError
+
+from myapp.merging import merge_categories
+from myapp.models import Category
+
+
+class Command(BaseCommand):
+    help = "Kategoriyani boshqasiga birlashtiradi: tranzaksiyalar, jadvallar va budjetlar ko'chiriladi."
+
+    def add_arguments(self, parser):
+        parser.add_argument('source', type=int, help="Manba kategoriya ID'si.")
+        parser.add_argument('target', type=int, help="Nishon kategoriya ID'si.")
+        parser.add_argument('--keep-source', action='store_true',
+                            help="Manbani o'chirmaslik (faqat qayta kategoriyalash).")
+
+    def handle(self, *args, **options):
+        categories = Category.objects.in_bulk([options['source'], options['target']])
+        for key in ('source', 'target'):
+            if options[key] not in categories:
+                raise CommandError(f"Kategoriya topilmadi: {options[key]}")
+
+        try:
+            report = merge_categories(categories[options['source']], categories[options['target']],
+                                      delete_source=not options['keep_source'])
+        except ValidationError as exc:
+            raise CommandError(' '.join(exc.messages))
+
+        self.stdout.write(self.style.SUCCESS(
+            f"«{report.source}» → «{report.target}»: {report.transactions} ta tranzaksiya, "
+            f"{report.schedules} ta jadval, {report.budgets} ta budjet, {report.rollups} ta rollup qatori, "
+            f"{report.subcategories} ta pastki kategoriya. "
+            f"{'Manba o‘chirildi. ' if report.deleted else ''}{report.elapsed:.2f} s."
+        ))
@@ -1,66 +1,64 @@
-from django.core.management.base import BaseCommand
-from django.db import transaction
-from django.utils import timezone
-# Kerakli modellarni import qilamiz
-from myapp.models import RecurringSchedule, Transaction, Category
-from django.db.models import Q
+import datetime
+
+from django.core.management.base import BaseCommand, CommandError
+
+from myapp.recurring import RecurringEngine, DEFAULT_CHUNK_SIZE, parse_shard, run_in_workers
+
 
 class Command(BaseCommand):
     help = 'Takrorlanuvchi jadvallarni tekshiradi va tegishli tranzaksiyalarni yaratadi.'
 
+    def add_arguments(self, parser):
+        parser.add_argument('--date', help="Qaysi kun uchun bajarish (YYYY-MM-DD). Standart — bugun.")
+        parser.add_argument('--chunk-size', type=int, default=DEFAULT_CHUNK_SIZE,
+                            help="Bitta savepoint'da qayta ishlanadigan jadvallar soni.")
+        parser.add_argument('--catch-up', action='store_true',
+                            help="Oxirgi bajarilgan sanadan beri o'tkazib yuborilgan barcha sanalarni yaratish.")
+        group = parser.add_mutually_exclusive_group()
+        group.add_argument('--shard', help="Faqat shu qismni bajarish: i/N (user_id %% N == i).")
+        group.add_argument('--workers', type=int, default=1, help="Parallel jarayonlar soni.")
+
     def handle(self, *args, **options):
-        # Bugungi sanani olamiz (faqat sanani, vaqtni emas)
-        today = timezone.now().date()
-        
-        # SQL/DB sathida to'liq xavfsizlikni ta'minlaymiz
-        with transaction.atomic():
-            
-            # Faol jadvallarni topish mantiqi:
-            # 1. Faol bo'lishi kerak (is_active=True).
-            # 2. Bugungi kun jadvalda belgilangan kunga mos kelishi kerak (day_of_month).
-            # 3. Agar mavjud bo'lsa, tugash sanasidan oldin bo'lishi kerak (end_date).
-            # 4. Oxirgi bajarilgan sana bugungi kundan oldin bo'lishi kerak, 
-            #    yoki umuman bajarilmagan bo'lishi kerak (bir kunda ikki marta bajarilishining oldini oladi).
-            
-            schedules_to_execute = RecurringSchedule.objects.filter(
-                is_active=True,
-                day_of_month=today.day,
-                start_date__lte=today, # Boshlanish sanasi o'tgan yoki bugun
-                end_date__gte=today,    # Tugash sanasi kelajakda (yoki bo'sh)
-            ).filter(
-                # Oxirgi bajarilgan sana bugun bo'lmasligi kerak
-                # OR Bu jadval hali umuman bajarilmagan (last_executed=None) bo'lishi kerak
-                Q(last_executed__lt=today) | Q(last_executed__isnull=True)
-            ).select_related('category', 'user') # Kategoriya va User ma'lumotlarini optimallashtirish uchun
+        today = None
+        if options['date']:
+            try:
+                today = datetime.date.fromisoformat(options['date'])
+            except ValueError:
+                raise CommandError(f"Noto'g'ri sana: {options['date']}")
+
+        shard = None
+        if options['shard']:
+            try:
+                shard = parse_shard(options['shard'])
+            except ValueError as exc:
+                raise CommandError(str(exc))
+        if options['workers'] < 1:
+            raise CommandError("--workers kamida 1 bo'lishi kerak.")
+
+        if options['workers'] > 1:
+            reports = run_in_workers(options['workers'], today=today, chunk_size=options['chunk_size'],
+                                     catch_up=options['catch_up'])
+        else:
+            engine = RecurringEngine(today=today, chunk_size=options['chunk_size'],
+                                     catch_up=options['catch_up'], shard=shard)
+
+            def progress(report):
+                if options['verbosity'] > 1:
+                    self.stdout.write(f"  {report.chunks}-bo'lak: {report.selected} ta jadval, {report.created} ta yaratildi")
+
+            reports = [engine.run(progress=progress)]
+
+        for report in reports:
+            self.write_report(report)
 
-            self.stdout.write(self.style.NOTICE(
-                f"[{today}] Bajariladigan jadvallar soni topildi: {schedules_to_execute.count()}"
-            ))
+    def write_report(self, report):
+        for schedule_ids, error in report.failed:
+            self.stdout.write(self.style.ERROR(f"Xatolik yuz berdi (jadvallar {schedule_ids}): {error}"))
 
-            for schedule in schedules_to_execute:
-                try:
-                    # 1. Yangi Tranzaksiya yaratish
-                    Transaction.objects.create(
-                        user=schedule.user,
-                        amount=schedule.amount,
-                        category=schedule.category,
-                        date=today,
-                        description=f"Avtomatik takrorlanuvchi tranzaksiya: {schedule.note or schedule.category.name}",
-                        recurring_schedule=schedule,
-                        is_automated=True  # Avtomatik yaratilganligini belgilash
-                        # Eslatma: Account modeli qo'shilmagani uchun bu yerda Account qo'shilmayapti
-                    )
-                    
-                    # 2. last_executed sanasini yangilash
-                    schedule.last_executed = today
-                    schedule.save()
-                    
-                    self.stdout.write(self.style.SUCCESS(
-                        f"Muvaffaqiyatli: {schedule.category.name} ({schedule.amount}) {today} sanasi uchun qo'shildi."
-                    ))
-                except Exception as e:
-                    self.stdout.write(self.style.ERROR(
-                        f"Xatolik yuz berdi ({schedule.id}): {e}"
-                    ))
-        
-        self.stdout.write(self.style.SUCCESS('Takrorlanuvchi tranzaksiyalarni qayta ishlash yakunlandi.'))
\ No newline at end of file
+        shard = f" [shard {report.shard[0]}/{report.shard[1]}]" if report.shard else ""
+        self.stdout.write(self.style.SUCCESS(
+            f"[{report.date}]{shard} Takrorlanuvchi tranzaksiyalarni qayta ishlash yakunlandi: "
+            f"{report.selected} ta jadval, {report.created} ta yaratildi, {report.skipped} ta avval yaratilgan, "
+            f"{len(report.failed)} ta bo'lakda xato. "
+            f"{report.elapsed:.2f} s ({report.throughput:.0f} tranzaksiya/s)."
+        ))
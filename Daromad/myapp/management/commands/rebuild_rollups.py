@@ -0,0 +1,23 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from myapp.models import CustomUser
+from myapp.rollups import rebuild_rollups
+
+
+class Command(BaseCommand):
+    help = "Oylik rollup jadvalini (MonthlyCategoryTotal) tranzaksiyalardan qaytadan quradi."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--user', help="Faqat shu foydalanuvchi (username) uchun qayta qurish.")
+        parser.add_argument('--batch-size', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        user = None
+        if options['user']:
+            try:
+                user = CustomUser.objects.get(username=options['user'])
+            except CustomUser.DoesNotExist:
+                raise CommandError(f"Foydalanuvchi topilmadi: {options['user']}")
+
+        created = rebuild_rollups(user=user, batch_size=options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(f"Rollup qayta qurildi: {created} ta qator."))
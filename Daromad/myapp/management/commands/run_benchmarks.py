@@ -0,0 +1,70 @@
+import datetime
+import json
+import platform
+
+import django
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+
+from myapp.benchmarks import compare_results, run_view_benchmarks
+
+
+class Command(BaseCommand):
+    help = (
+        "Asosiy view'lar va process_recurring ni bir necha ma'lumot hajmida o'lchaydi va natijani "
+        "JSON faylga yozadi. Yaratilgan ma'lumotlar oxirida orqaga qaytariladi."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--sizes', default='1,5,20', help="Foydalanuvchilar soni, vergul bilan (1,5,20).")
+        parser.add_argument('--years', type=int, default=2)
+        parser.add_argument('--density', type=float, default=1.0)
+        parser.add_argument('--repeat', type=int, default=3)
+        parser.add_argument('--seed', type=int, default=1)
+        parser.add_argument('--output', default='benchmark-results.json')
+        parser.add_argument('--compare', help="Avvalgi natija fayli — vaqt nisbatlarini chiqarish uchun.")
+
+    def handle(self, *args, **options):
+        try:
+            sizes = [int(size) for size in options['sizes'].split(',') if size.strip()]
+        except ValueError:
+            raise CommandError(f"Noto'g'ri --sizes: {options['sizes']}")
+        if not sizes or min(sizes) < 1 or options['repeat'] < 1:
+            raise CommandError("--sizes va --repeat musbat bo'lishi kerak.")
+
+        def progress(row):
+            self.stdout.write(self.style.NOTICE(
+                f"== {row['users']} foydalanuvchi, {row['transactions']} tranzaksiya =="
+            ))
+            for label, tier in row['tiers'].items():
+                self.stdout.write(f"  [{label}: {tier['user_transactions']} tranzaksiya]")
+                for name, values in tier['views'].items():
+                    self.stdout.write(f"    {name}: " + ", ".join(f"{key}={value}" for key, value in values.items()))
+            self.stdout.write("  process_recurring: " + ", ".join(
+                f"{key}={value}" for key, value in row['process_recurring'].items()
+            ))
+
+        results = {
+            'created_at': datetime.datetime.now().isoformat(timespec='seconds'),
+            'database': connection.vendor,
+            'django': django.get_version(),
+            'python': platform.python_version(),
+            'options': {key: options[key] for key in ('years', 'density', 'repeat', 'seed')},
+            'sizes': run_view_benchmarks(
+                sizes, years=options['years'], density=options['density'],
+                repeat=options['repeat'], seed=options['seed'], progress=progress,
+            ),
+        }
+        with open(options['output'], 'w', encoding='utf-8') as fh:
+            json.dump(results, fh, indent=2, ensure_ascii=False)
+        self.stdout.write(self.style.SUCCESS(f"Natijalar: {options['output']}"))
+
+        if options['compare']:
+            try:
+                with open(options['compare'], encoding='utf-8') as fh:
+                    previous = json.load(fh)
+            except (OSError, ValueError) as exc:
+                raise CommandError(f"Taqqoslash fayli o'qilmadi: {exc}")
+            for (users, tier, name), ratio in compare_results(previous, results).items():
+                style = self.style.ERROR if ratio > 1.2 else self.style.SUCCESS
+                self.stdout.write(style(f"  {users} / {tier} / {name}: x{ratio}"))
@@ -0,0 +1,67 @@
+import asyncio
+import datetime
+import signal
+
+from asgiref.sync import sync_to_async
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+from django.utils import timezone
+
+from myapp.recurring import RecurringEngine, DEFAULT_CHUNK_SIZE, nearest_run_date
+
+
+class Command(BaseCommand):
+    help = (
+        "Takrorlanuvchi jadvallar uchun doimiy ishlovchi rejalashtiruvchi (cron o'rniga). "
+        "Eng yaqin next_run_date gacha uxlaydi va faqat muddati kelganlarni bajaradi."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--chunk-size', type=int, default=DEFAULT_CHUNK_SIZE)
+        parser.add_argument('--max-sleep', type=int, default=300,
+                            help="Eng uzoq uyqu (soniya) — yangi qo'shilgan jadvallarni ko'rish uchun.")
+        parser.add_argument('--once', action='store_true', help="Bitta qadamni bajarib chiqish.")
+
+    def handle(self, *args, **options):
+        asyncio.run(self.serve(options))
+
+    async def serve(self, options):
+        stop = asyncio.Event()
+        loop = asyncio.get_running_loop()
+        for sig in (signal.SIGINT, signal.SIGTERM):
+            try:
+                loop.add_signal_handler(sig, stop.set)
+            except (NotImplementedError, RuntimeError):
+                pass  # Windows yoki asosiy bo'lmagan oqim
+
+        self.stdout.write(self.style.NOTICE("Rejalashtiruvchi ishga tushdi."))
+        while not stop.is_set():
+            delay = await sync_to_async(self.tick)(options)
+            if options['once']:
+                break
+            try:
+                await asyncio.wait_for(stop.wait(), timeout=delay)
+            except asyncio.TimeoutError:
+                pass
+        self.stdout.write(self.style.NOTICE("Rejalashtiruvchi to'xtadi."))
+
+    def tick(self, options):
+        """ Muddati kelganlarni bajaradi va keyingi uyg'onishgacha soniyalarni qaytaradi. """
+        close_old_connections()
+        today = timezone.localdate()
+        # Ishlamay qolgan kunlar ham yozilishi uchun catch-up rejimida
+        report = RecurringEngine(today=today, chunk_size=options['chunk_size'], catch_up=True).run()
+        if report.selected or report.failed:
+            self.stdout.write(self.style.SUCCESS(
+                f"[{today}] {report.selected} ta jadval, {report.created} ta yaratildi, "
+                f"{len(report.failed)} ta bo'lakda xato ({report.throughput:.0f} tranzaksiya/s)."
+            ))
+
+        nearest = nearest_run_date()
+        close_old_connections()
+        if nearest is None or nearest <= today:
+            # Yo'q yoki xato tufayli qolib ketgan — keyingi urinish max-sleep dan keyin
+            return options['max_sleep']
+        wake_at = timezone.make_aware(datetime.datetime.combine(nearest, datetime.time.min))
+        seconds = (wake_at - timezone.localtime()).total_seconds()
+        return max(1, min(seconds, options['max_sleep']))
@@ -0,0 +1,136 @@
+# myapp/merging.py
+"""
+Kategoriyalarni birlashtirish (merge) va qayta kategoriyalash.
+
+Manba kategoriyaning tranzaksiyalari, takrorlanuvchi jadvallari, budjetlari va
+rollup qatorlari nishon kategoriyaga bir nechta to'plamli UPDATE bilan
+ko'chiriladi — qatorlar Python'ga o'qilmaydi va signal'lar ishlamaydi, shuning
+uchun 100k+ tranzaksiyali kategoriya ham bir zumda ko'chadi. Hammasi bitta
+`transaction.atomic()` ichida: yarim yo'lda xato bo'lsa, hech narsa o'zgarmaydi.
+
+Rollup va budjet jadvallaridagi (user, oy) to'qnashuvlar qo'shib yuboriladi:
+nishonda shu oy qatori bo'lsa — summalar unga qo'shilib, manba qatori o'chiriladi,
+bo'lmasa — manba qatori nishonga o'tkaziladi.
+"""
+import time
+from dataclasses import dataclass
+
+from django.core.exceptions import ValidationError
+from django.db import transaction
+from django.db.models import Case, Exists, F, OuterRef, Subquery, Value, When
+from django.utils import timezone
+from django.utils.translation import gettext as _
+
+from .budgets import refresh_budget_counters
+from .caching import bump_data_version, CATEGORIES
+from .models import Budget, BudgetAlert, Category, MonthlyCategoryTotal, RecurringSchedule, Transaction
+
+
+@dataclass
+class CategoryMergeReport:
+    source: str
+    target: str
+    transactions: int = 0
+    schedules: int = 0
+    budgets: int = 0
+    rollups: int = 0
+    subcategories: int = 0
+    deleted: bool = False
+    elapsed: float = 0.0
+
+
+def validate_merge(source, target):
+    """ Birlashtirish mumkinligini tekshiradi; mumkin bo'lmasa `ValidationError`. """
+    if source.pk == target.pk:
+        raise ValidationError(_("Kategoriyani o'ziga birlashtirib bo'lmaydi."))
+    if source.type != target.type:
+        raise ValidationError(_("Kategoriyalar turi bir xil bo'lishi kerak."))
+    if target.user_id is not None and target.user_id != source.user_id:
+        # Global manbaning tranzaksiyalari ko'p foydalanuvchiga tegishli
+        raise ValidationError(_("Nishon kategoriya manba bilan bir foydalanuvchiga tegishli yoki global bo'lishi kerak."))
+    if target.path.startswith(source.path):
+        raise ValidationError(_("Kategoriyani o'zining pastki kategoriyasiga birlashtirib bo'lmaydi."))
+
+
+def _merge_monthly_rows(model, source, target, fields, **changes):
+    """
+    (user, month) bo'yicha noyob jadval qatorlarini (rollup, budjet) ko'chiradi:
+    to'qnashganlar nishon qatoriga qo'shiladi, qolganlari nishonga o'tkaziladi.
+    Qo'shib yuborilgan (manba_id -> nishon_id) juftliklarini qaytaradi.
+    """
+    source_rows = model.objects.filter(category=source)
+    same_source = source_rows.filter(user_id=OuterRef('user_id'), month=OuterRef('month'))
+    same_target = model.objects.filter(category=target, user_id=OuterRef('user_id'), month=OuterRef('month'))
+
+    pairs = dict(source_rows.filter(Exists(same_target)).annotate(
+        target_id=Subquery(same_target.values('pk')[:1])
+    ).values_list('pk', 'target_id'))
+    if pairs:
+        model.objects.filter(Exists(same_source), category=target).update(**{
+            field: F(field) + Subquery(same_source.values(field)[:1]) for field in fields
+        }, **changes)
+    moved = source_rows.exclude(pk__in=pairs).update(category=target, **changes)
+    return pairs, moved
+
+
+def merge_categories(source, target, delete_source=True):
+    """
+    `source` dagi hamma narsani `target` ga ko'chiradi.
+    `delete_source=True` (birlashtirish): pastki kategoriyalar nishonga o'tadi
+    (bir xil nomli bo'lsa — ular ham birlashtiriladi) va manba o'chiriladi.
+    `delete_source=False` (qayta kategoriyalash): faqat bog'langan yozuvlar ko'chadi.
+    """
+    validate_merge(source, target)
+    started = time.perf_counter()
+    report = CategoryMergeReport(source=source.get_full_path(), target=target.get_full_path())
+    now = timezone.now()
+
+    with transaction.atomic():
+        # Ta'sirlangan (user, oy) juftliklari — budjet hisoblagichlarini qayta hisoblash uchun
+        months = set(MonthlyCategoryTotal.objects.filter(category=source).values_list('user_id', 'month'))
+        months |= set(Budget.objects.filter(category=source).values_list('user_id', 'month'))
+
+        if delete_source:
+            existing = {
+                child.name: child
+                for child in Category.objects.filter(parent=target, user_id=source.user_id, type=source.type)
+            }
+            for child in Category.objects.filter(parent=source):
+                if child.name in existing:
+                    merge_categories(child, existing[child.name])
+                else:
+                    child.parent = target
+                    child.save()
+                report.subcategories += 1
+
+        report.transactions = Transaction.objects.filter(category=source).update(category=target)
+        report.schedules = RecurringSchedule.objects.filter(category=source).update(category=target)
+
+        rollup_pairs, moved = _merge_monthly_rows(
+            MonthlyCategoryTotal, source, target, ('total', 'count'), type=target.type, updated_at=now
+        )
+        MonthlyCategoryTotal.objects.filter(pk__in=rollup_pairs).delete()
+        report.rollups = len(rollup_pairs) + moved
+
+        budget_pairs, moved = _merge_monthly_rows(Budget, source, target, ('amount',))
+        if budget_pairs:
+            # Ogohlantirishlar tarixi nishon budjetiga o'tadi
+            BudgetAlert.objects.filter(budget_id__in=budget_pairs).update(budget_id=Case(
+                *[When(budget_id=source_id, then=Value(target_id)) for source_id, target_id in budget_pairs.items()]
+            ))
+            Budget.objects.filter(pk__in=budget_pairs).delete()
+        report.budgets = len(budget_pairs) + moved
+
+        if months:
+            refresh_budget_counters(Budget.objects.filter(
+                user_id__in={user_id for user_id, _month in months},
+                month__in={month for _user_id, month in months},
+            ))
+        if delete_source:
+            source.delete()
+            report.deleted = True
+
+    bump_data_version(source.user_id)
+    bump_data_version(source.user_id, CATEGORIES)
+    report.elapsed = time.perf_counter() - started
+    return report
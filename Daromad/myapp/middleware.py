@@ -0,0 +1,179 @@
+# myapp/middleware.py
+"""
+So'rov bo'yicha o'lchovlar: SQL so'rovlar soni va vaqti, shablon render vaqti,
+umumiy vaqt. Natija `Server-Timing` sarlavhasida (brauzer DevTools'da ko'rinadi)
+va `myapp.timing` logger'ida bitta tuzilgan qator sifatida chiqadi.
+
+Ishlab chiqarishda ham yoqib qo'yish uchun arzon: SQL `execute_wrapper` orqali
+faqat vaqt va matn havolasi saqlanadi (parametrlar formatlanmaydi, DEBUG shart emas),
+shablon vaqti esa backend `Template.render` ustidagi yupqa o'ram bilan o'lchanadi —
+o'ram faqat o'lchanayotgan so'rov bor paytda o'rnatiladi, qolgan vaqtda asl metod.
+Oqimli javoblar (eksport) tana oxirigacha yuborilganda (`close()`) yakunlanadi.
+`SLOW_REQUEST_THRESHOLD_MS` dan sekin so'rovlarda yig'ilgan SQL logga yoziladi.
+"""
+import contextvars
+import logging
+import threading
+import time
+from contextlib import ExitStack, contextmanager
+
+from django.conf import settings
+from django.db import connections
+from django.template.backends.django import Template as BackendTemplate
+
+logger = logging.getLogger('myapp.timing')
+
+_current = contextvars.ContextVar('request_timing', default=None)
+
+
+class RequestTiming:
+    __slots__ = ('queries', 'db_time', 'template_time', 'template_depth', 'statements', 'max_statements')
+
+    def __init__(self, max_statements):
+        self.queries = 0
+        self.db_time = 0.0
+        self.template_time = 0.0
+        self.template_depth = 0
+        self.statements = []
+        self.max_statements = max_statements
+
+    def __call__(self, execute, sql, params, many, context):
+        """ `connection.execute_wrapper` uchun: har bir SQL so'rovini o'lchaydi. """
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            elapsed = time.perf_counter() - started
+            self.queries += 1
+            self.db_time += elapsed
+            if len(self.statements) < self.max_statements:
+                self.statements.append((elapsed, sql))
+
+
+# === 1. SHABLON VAQTI ===
+_original_render = BackendTemplate.render
+
+
+def _timed_render(self, context=None, request=None):
+    timing = _current.get()
+    if timing is None:
+        return _original_render(self, context, request)
+    # Ichma-ich render (render_to_string shablon ichida) ikki marta hisoblanmasin
+    timing.template_depth += 1
+    started = time.perf_counter()
+    try:
+        return _original_render(self, context, request)
+    finally:
+        timing.template_depth -= 1
+        if not timing.template_depth:
+            timing.template_time += time.perf_counter() - started
+
+
+_instrument_lock = threading.Lock()
+_instrument_users = 0
+
+
+@contextmanager
+def instrument_templates():
+    """
+    Blok davomida backend `Template.render` ni o'raydi. Parallel so'rovlar uchun
+    hisoblagich bilan: oxirgi o'lchanayotgan so'rov tugaganda asl metod qaytariladi.
+    """
+    global _instrument_users
+    with _instrument_lock:
+        _instrument_users += 1
+        BackendTemplate.render = _timed_render
+    try:
+        yield
+    finally:
+        with _instrument_lock:
+            _instrument_users -= 1
+            if not _instrument_users:
+                BackendTemplate.render = _original_render
+
+
+# === 2. MIDDLEWARE ===
+class RequestTimingMiddleware:
+    """
+    Sozlamalar:
+      REQUEST_TIMING_ENABLED — o'chirish uchun False,
+      SERVER_TIMING_HEADER — `Server-Timing` sarlavhasini qo'shish,
+      SLOW_REQUEST_THRESHOLD_MS — shundan sekin so'rovlar SQL bilan WARNING darajasida,
+      REQUEST_TIMING_MAX_STATEMENTS — bitta so'rovda saqlanadigan SQL matnlari chegarasi.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.enabled = getattr(settings, 'REQUEST_TIMING_ENABLED', True)
+        self.header = getattr(settings, 'SERVER_TIMING_HEADER', True)
+        self.threshold = getattr(settings, 'SLOW_REQUEST_THRESHOLD_MS', 500) / 1000
+        self.max_statements = getattr(settings, 'REQUEST_TIMING_MAX_STATEMENTS', 200)
+
+    def __call__(self, request):
+        if not self.enabled:
+            return self.get_response(request)
+
+        timing = RequestTiming(self.max_statements)
+        token = _current.set(timing)
+        started = time.perf_counter()
+        try:
+            with ExitStack() as stack:
+                stack.enter_context(instrument_templates())
+                self.wrap_queries(stack, timing)
+                response = self.get_response(request)
+        finally:
+            _current.reset(token)
+        total = time.perf_counter() - started
+
+        if self.header:
+            # Oqimli javobda — sarlavhalar yuborilgunga qadar bo'lgan qism
+            response['Server-Timing'] = (
+                f'db;dur={timing.db_time * 1000:.1f};desc="SQL ({timing.queries})", '
+                f'tpl;dur={timing.template_time * 1000:.1f}, '
+                f'total;dur={total * 1000:.1f}'
+            )
+        if response.streaming:
+            # Tana generatori so'rovlarni shu yerdan keyin bajaradi — yopilganda logga yoziladi
+            response.streaming_content = self.timed_stream(
+                request, response, response.streaming_content, timing, started
+            )
+        else:
+            self.log(request, response, timing, total)
+        return response
+
+    @staticmethod
+    def wrap_queries(stack, timing):
+        for alias in connections:
+            stack.enter_context(connections[alias].execute_wrapper(timing))
+
+    def timed_stream(self, request, response, content, timing, started):
+        """ Oqimli tanani o'raydi; `response.close()` generatorni ham yopadi (to'liq yoki uzilgan). """
+        try:
+            with ExitStack() as stack:
+                self.wrap_queries(stack, timing)
+                yield from content
+        finally:
+            self.log(request, response, timing, time.perf_counter() - started)
+
+    def log(self, request, response, timing, total):
+        match = getattr(request, 'resolver_match', None)
+        record = {
+            'method': request.method,
+            'path': request.path,
+            'view': match.view_name if match else None,
+            'status': response.status_code,
+            'queries': timing.queries,
+            'db_ms': round(timing.db_time * 1000, 1),
+            'template_ms': round(timing.template_time * 1000, 1),
+            'total_ms': round(total * 1000, 1),
+        }
+        message = ' '.join(f"{key}={value}" for key, value in record.items())
+        if total < self.threshold:
+            logger.info(message, extra={'timing': record})
+            return
+
+        statements = sorted(timing.statements, key=lambda item: item[0], reverse=True)
+        sql = '\n'.join(f"  {elapsed * 1000:.1f} ms  {statement}" for elapsed, statement in statements)
+        if timing.queries > len(statements):
+            sql += f"\n  ... yana {timing.queries - len(statements)} ta so'rov"
+        logger.warning(f"slow {message}\n{sql}", extra={'timing': record})
@@ -0,0 +1,56 @@
+# Generated by Django 5.2.18 on 2026-10-18 15:20
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count, Sum
+from django.db.models.functions import TruncMonth
+
+
+def populate_rollups(apps, schema_editor):
+    Transaction = apps.get_model('myapp', 'Transaction')
+    MonthlyCategoryTotal = apps.get_model('myapp', 'MonthlyCategoryTotal')
+    rows = Transaction.objects.annotate(month=TruncMonth('date')).values(
+        'user_id', 'month', 'category_id', 'category__type'
+    ).annotate(total=Sum('amount'), count=Count('id')).order_by()
+    MonthlyCategoryTotal.objects.bulk_create([
+        MonthlyCategoryTotal(
+            user_id=row['user_id'],
+            month=row['month'],
+            category_id=row['category_id'],
+            type=row['category__type'] if row['category_id'] else '',
+            total=row['total'],
+            count=row['count'],
+        )
+        for row in rows
+    ], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('myapp', '0004_delete_userprofile'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='MonthlyCategoryTotal',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('month', models.DateField(verbose_name='Oy (1-kun)')),
+                ('type', models.CharField(blank=True, choices=[('INCOME', 'Daromad'), ('EXPENSE', 'Xarajat')], max_length=7, verbose_name='Turi')),
+                ('total', models.DecimalField(decimal_places=2, default=0, max_digits=17, verbose_name='Jami (UZS)')),
+                ('count', models.IntegerField(default=0, verbose_name='Soni')),
+                ('category', models.ForeignKey(blank=True, help_text="Bo'sh bo'lsa — kategoriyasiz tranzaksiyalar.", null=True, on_delete=django.db.models.deletion.CASCADE, related_name='monthly_totals', to='myapp.category')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='monthly_totals', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name': "Oylik yig'indi",
+                'verbose_name_plural': "Oylik yig'indilar",
+                'ordering': ['-month'],
+                'indexes': [models.Index(fields=['user', 'month'], name='myapp_month_user_id_baa984_idx')],
+                'constraints': [models.UniqueConstraint(fields=('user', 'month', 'category', 'type'), name='unique_monthly_total_user_month_category_type')],
+            },
+        ),
+        migrations.RunPython(populate_rollups, migrations.RunPython.noop),
+    ]
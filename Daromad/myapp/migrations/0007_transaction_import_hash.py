@@ -0,0 +1,22 @@
+# Generated by Django 5.2.18 on 2026-10-18 15:25
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('myapp', '0006_transaction_keyset_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='transaction',
+            name='import_hash',
+            field=models.CharField(blank=True, editable=False, help_text="Bank ko'chirmasidan import qilingan qatorning mazmun xeshi (dublikatlarga qarshi).", max_length=64, null=True, verbose_name='Import xeshi'),
+        ),
+        migrations.AddConstraint(
+            model_name='transaction',
+            constraint=models.UniqueConstraint(condition=models.Q(('import_hash__isnull', False)), fields=('user', 'import_hash'), name='unique_transaction_import_hash'),
+        ),
+    ]
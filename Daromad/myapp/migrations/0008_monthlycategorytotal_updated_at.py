@@ -0,0 +1,19 @@
+# Generated by Django 5.2.18 on 2026-10-18 15:26
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('myapp', '0007_transaction_import_hash'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='monthlycategorytotal',
+            name='updated_at',
+            field=models.DateTimeField(default=django.utils.timezone.now, verbose_name='Yangilangan'),
+        ),
+    ]
@@ -0,0 +1,59 @@
+# Generated by Django 5.2.18 on 2026-10-18 15:28
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def populate_paths(apps, schema_editor):
+    """ Mavjud daraxtni yuqoridan pastga (darajama-daraja) to'ldiradi. """
+    Category = apps.get_model('myapp', 'Category')
+    parents = {}  # id -> (path, full_path, root_id, depth)
+    level = list(Category.objects.filter(parent__isnull=True))
+    depth = 0
+    while level:
+        for category in level:
+            parent = parents.get(category.parent_id)
+            if parent:
+                category.path = f"{parent[0]}{category.pk}/"
+                category.full_path = f"{parent[1]} > {category.name}"
+                category.root_id = parent[2]
+            else:
+                category.path = f"/{category.pk}/"
+                category.full_path = category.name
+                category.root_id = category.pk
+            category.depth = depth
+            parents[category.pk] = (category.path, category.full_path, category.root_id, depth)
+        Category.objects.bulk_update(level, ['path', 'full_path', 'root', 'depth'], batch_size=1000)
+        level = list(Category.objects.filter(parent_id__in=[category.pk for category in level]))
+        depth += 1
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('myapp', '0008_monthlycategorytotal_updated_at'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='category',
+            name='depth',
+            field=models.PositiveSmallIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='category',
+            name='full_path',
+            field=models.CharField(blank=True, editable=False, max_length=1000, verbose_name="To'liq nomi"),
+        ),
+        migrations.AddField(
+            model_name='category',
+            name='path',
+            field=models.CharField(blank=True, db_index=True, editable=False, help_text="Ota-bobolar ID'lari: /1/5/12/", max_length=255),
+        ),
+        migrations.AddField(
+            model_name='category',
+            name='root',
+            field=models.ForeignKey(blank=True, editable=False, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='descendants', to='myapp.category', verbose_name='Asosiy kategoriya'),
+        ),
+        migrations.RunPython(populate_paths, migrations.RunPython.noop),
+    ]
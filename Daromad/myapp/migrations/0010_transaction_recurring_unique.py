@@ -0,0 +1,57 @@
+# Generated by Django 5.2.18 on 2026-10-18 15:30
+
+from collections import defaultdict
+
+from django.db import migrations, models
+from django.db.models import Count, F, Min
+
+
+def delete_duplicate_postings(apps, schema_editor):
+    """
+    Cheklovdan oldin: bir jadval bir kunda bir necha marta yozilgan bo'lsa (masalan, cron
+    ikki marta ishlagan), eng birinchisi qoladi, qolganlari o'chiriladi va ularning
+    summalari oylik rollup'dan ayiriladi.
+    """
+    Transaction = apps.get_model('myapp', 'Transaction')
+    MonthlyCategoryTotal = apps.get_model('myapp', 'MonthlyCategoryTotal')
+
+    groups = Transaction.objects.filter(recurring_schedule__isnull=False).values(
+        'recurring_schedule_id', 'date'
+    ).annotate(keep=Min('pk'), copies=Count('pk')).filter(copies__gt=1).order_by()
+
+    extra_ids = []
+    for group in groups:
+        extra_ids.extend(Transaction.objects.filter(
+            recurring_schedule_id=group['recurring_schedule_id'], date=group['date'],
+        ).exclude(pk=group['keep']).values_list('pk', flat=True))
+    if not extra_ids:
+        return
+
+    deltas = defaultdict(lambda: [0, 0])
+    duplicates = Transaction.objects.filter(pk__in=extra_ids).values_list(
+        'user_id', 'date', 'category_id', 'category__type', 'amount'
+    )
+    for user_id, date, category_id, category_type, amount in duplicates:
+        key = (user_id, date.replace(day=1), category_id, category_type if category_id else '')
+        deltas[key][0] += amount
+        deltas[key][1] += 1
+    for (user_id, month, category_id, category_type), (amount, count) in deltas.items():
+        MonthlyCategoryTotal.objects.filter(
+            user_id=user_id, month=month, category_id=category_id, type=category_type or '',
+        ).update(total=F('total') - amount, count=F('count') - count)
+    Transaction.objects.filter(pk__in=extra_ids).delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('myapp', '0009_category_materialized_path'),
+    ]
+
+    operations = [
+        migrations.RunPython(delete_duplicate_postings, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='transaction',
+            constraint=models.UniqueConstraint(condition=models.Q(('recurring_schedule__isnull', False)), fields=('recurring_schedule', 'date'), name='unique_transaction_recurring_schedule_date'),
+        ),
+    ]
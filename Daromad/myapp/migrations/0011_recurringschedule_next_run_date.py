@@ -0,0 +1,46 @@
+# Generated by Django 5.2.18 on 2026-10-18 15:34
+
+import calendar
+import datetime
+
+from django.db import migrations, models
+
+
+def _occurrence(year, month, day_of_month):
+    return datetime.date(year, month, min(day_of_month, calendar.monthrange(year, month)[1]))
+
+
+def populate_next_run_date(apps, schema_editor):
+    """ `RecurringSchedule.compute_next_run_date` bilan bir xil hisob (tarixiy modelda metod yo'q). """
+    RecurringSchedule = apps.get_model('myapp', 'RecurringSchedule')
+    schedules = list(RecurringSchedule.objects.filter(is_active=True))
+    for schedule in schedules:
+        start = schedule.start_date
+        if schedule.last_executed:
+            start = max(start, schedule.last_executed + datetime.timedelta(days=1))
+        day = _occurrence(start.year, start.month, schedule.day_of_month)
+        if day < start:
+            year, month = (start.year + 1, 1) if start.month == 12 else (start.year, start.month + 1)
+            day = _occurrence(year, month, schedule.day_of_month)
+        schedule.next_run_date = None if schedule.end_date and day > schedule.end_date else day
+    RecurringSchedule.objects.bulk_update(schedules, ['next_run_date'], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('myapp', '0010_transaction_recurring_unique'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='recurringschedule',
+            name='next_run_date',
+            field=models.DateField(blank=True, editable=False, help_text="save() va har bir bajarilishdan keyin hisoblanadi. Bo'sh — boshqa bajarilmaydi.", null=True, verbose_name='Keyingi bajarilish'),
+        ),
+        migrations.AddIndex(
+            model_name='recurringschedule',
+            index=models.Index(fields=['is_active', 'next_run_date'], name='recurring_due_idx'),
+        ),
+        migrations.RunPython(populate_next_run_date, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,67 @@
+# Generated by Django 5.2.18 on 2026-10-18 15:40
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Sum
+
+
+def populate_counters(apps, schema_editor):
+    Budget = apps.get_model('myapp', 'Budget')
+    MonthlyCategoryTotal = apps.get_model('myapp', 'MonthlyCategoryTotal')
+    budgets = list(Budget.objects.select_related('category'))
+    for budget in budgets:
+        spent = MonthlyCategoryTotal.objects.filter(
+            user_id=budget.user_id, month=budget.month, type='EXPENSE',
+            category__path__startswith=budget.category.path,
+        ).aggregate(total=Sum('total'))['total'] or 0
+        budget.spent_total = spent
+        if budget.amount <= 0:
+            budget.alert_level = 0
+        elif spent >= budget.amount:
+            budget.alert_level = 2
+        elif spent * 100 >= budget.amount * budget.warning_threshold:
+            budget.alert_level = 1
+        else:
+            budget.alert_level = 0
+    Budget.objects.bulk_update(budgets, ['spent_total', 'alert_level'], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('myapp', '0011_recurringschedule_next_run_date'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='budget',
+            name='alert_level',
+            field=models.PositiveSmallIntegerField(choices=[(0, "Yo'q"), (1, 'Ogohlantirish'), (2, 'Budjet oshdi')], default=0, editable=False, verbose_name='Ogohlantirish darajasi'),
+        ),
+        migrations.AddField(
+            model_name='budget',
+            name='spent_total',
+            field=models.DecimalField(decimal_places=2, default=0, editable=False, max_digits=17, verbose_name='Sarf hisoblagichi'),
+        ),
+        migrations.CreateModel(
+            name='BudgetAlert',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('level', models.PositiveSmallIntegerField(choices=[(1, 'Ogohlantirish'), (2, 'Budjet oshdi')], verbose_name='Daraja')),
+                ('spent', models.DecimalField(decimal_places=2, max_digits=17, verbose_name='Sarflangan')),
+                ('percent', models.DecimalField(decimal_places=2, max_digits=9, verbose_name='Foiz')),
+                ('is_read', models.BooleanField(default=False, verbose_name="O'qilgan")),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('budget', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='alerts', to='myapp.budget')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='budget_alerts', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name': 'Budjet ogohlantirishi',
+                'verbose_name_plural': 'Budjet ogohlantirishlari',
+                'ordering': ['-created_at'],
+                'indexes': [models.Index(fields=['user', 'is_read', '-created_at'], name='budget_alert_inbox_idx')],
+            },
+        ),
+        migrations.RunPython(populate_counters, migrations.RunPython.noop),
+    ]
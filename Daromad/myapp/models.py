@@ -7,7 +7,10 @@ from django.utils.translation import gettext_lazy as _
 from django.utils import timezone
 from django.contrib.auth.models import AbstractUser
 from django.core.validators import MinValueValidator, MaxValueValidator
+from django.db.models.functions import Coalesce, Concat, Substr
+import calendar
 import datetime
+from decimal import Decimal
 
 
 class CustomUser(AbstractUser):
@@ -77,9 +80,29 @@ class Category(models.Model):
         verbose_name=_("Yuqori Kategoriya")
     )
     is_active = models.BooleanField(default=True, verbose_name=_("Faol"))
+
+    # --- Daraxt (materialized path) — save() da avtomatik to'ldiriladi ---
+    path = models.CharField(
+        max_length=255, blank=True, editable=False, db_index=True,
+        help_text=_("Ota-bobolar ID'lari: /1/5/12/")
+    )
+    full_path = models.CharField(max_length=1000, blank=True, editable=False, verbose_name=_("To'liq nomi"))
+    root = models.ForeignKey(
+        'self',
+        on_delete=models.CASCADE,
+        related_name='descendants',
+        null=True,
+        blank=True,
+        editable=False,
+        verbose_name=_("Asosiy kategoriya")
+    )
+    depth = models.PositiveSmallIntegerField(default=0, editable=False)
+
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    PATH_SEPARATOR = ' > '
+
     class Meta:
         verbose_name = _("Kategoriya")
         verbose_name_plural = _("Kategoriyalar")
@@ -92,9 +115,8 @@ class Category(models.Model):
         ordering = ['type', 'name']
 
     def __str__(self):
-        if self.parent:
-            return f"{self.parent} > {self.name} ({self.get_type_display()})"
-        return f"{self.name} ({self.get_type_display()})"
+        # Saqlangan to'liq yo'l — ota-bobolarni so'rov bilan yuklash shart emas
+        return f"{self.get_full_path()} ({self.get_type_display()})"
 
     def clean(self):
         if not self.name.strip():
@@ -106,10 +128,56 @@ class Category(models.Model):
                 raise ValidationError({'parent': _('Yuqori va pastki kategoriya bir foydalanuvchiga tegishli bo\'lishi kerak.')})
             if self.parent.user and not self.user:
                 raise ValidationError({'user': _('Agar yuqori kategoriya foydalanuvchiga tegishli bo\'lsa, pastki ham shunday bo\'lishi kerak.')})
+            if self.pk and (self.parent_id == self.pk or f"/{self.pk}/" in self.parent.path):
+                raise ValidationError({'parent': _('Kategoriyani o\'zining pastki kategoriyasiga ko\'chirib bo\'lmaydi.')})
 
     def save(self, *args, **kwargs):
         self.full_clean()
+        if self.pk is None:
+            super().save(*args, **kwargs)
+            # Yo'l o'z ID'sini o'z ichiga oladi — birinchi saqlashdan keyin yoziladi
+            self._set_tree_fields()
+            Category.objects.filter(pk=self.pk).update(
+                path=self.path, full_path=self.full_path, root_id=self.root_id, depth=self.depth
+            )
+            return
+
+        old = Category.objects.filter(pk=self.pk).values('path', 'full_path', 'depth').first()
+        self._set_tree_fields()
         super().save(*args, **kwargs)
+        if old and old['path'] and (old['path'] != self.path or old['full_path'] != self.full_path):
+            self._move_descendants(old['path'], old['full_path'], old['depth'])
+
+    # --- Daraxt yordamchilari ---
+    def _set_tree_fields(self):
+        parent = self.parent
+        if parent:
+            self.path = f"{parent.path}{self.pk}/"
+            self.full_path = f"{parent.full_path}{self.PATH_SEPARATOR}{self.name}"
+            self.root_id = parent.root_id or parent.pk
+            self.depth = parent.depth + 1
+        else:
+            self.path = f"/{self.pk}/"
+            self.full_path = self.name
+            self.root_id = self.pk
+            self.depth = 0
+
+    def _move_descendants(self, old_path, old_full_path, old_depth):
+        """ Ko'chirish yoki qayta nomlashda barcha avlodlarni bitta UPDATE bilan yangilaydi. """
+        Category.objects.filter(path__startswith=old_path).exclude(pk=self.pk).update(
+            path=Concat(models.Value(self.path), Substr('path', len(old_path) + 1)),
+            full_path=Concat(models.Value(self.full_path), Substr('full_path', len(old_full_path) + 1)),
+            root_id=self.root_id,
+            depth=models.F('depth') + (self.depth - old_depth),
+        )
+
+    def get_full_path(self):
+        return self.full_path or self.name
+
+    def get_descendants(self, include_self=True):
+        """ Butun pastki daraxt — rekursiyasiz, bitta `LIKE 'path%'` so'rovi. """
+        qs = Category.objects.filter(path__startswith=self.path)
+        return qs if include_self else qs.exclude(pk=self.pk)
 
 
 # === 5. RECURRING SCHEDULE ===
@@ -126,18 +194,71 @@ class RecurringSchedule(models.Model):
     last_executed = models.DateField(null=True, blank=True, verbose_name=_("Oxirgi bajarilgan"))
     is_active = models.BooleanField(default=True, verbose_name=_("Faol"))
     note = models.TextField(blank=True, verbose_name=_("Izoh"))
+    next_run_date = models.DateField(
+        null=True, blank=True, editable=False,
+        verbose_name=_("Keyingi bajarilish"),
+        help_text=_("save() va har bir bajarilishdan keyin hisoblanadi. Bo'sh — boshqa bajarilmaydi.")
+    )
 
     class Meta:
         verbose_name = _("Takrorlanuvchi jadval")
         verbose_name_plural = _("Takrorlanuvchi jadvalar")
         ordering = ['day_of_month', '-is_active']
+        indexes = [
+            # Rejalashtiruvchi: faqat muddati kelgan jadvallarni oladi
+            models.Index(fields=['is_active', 'next_run_date'], name='recurring_due_idx'),
+        ]
 
     def __str__(self):
         status = "Faol" if self.is_active else "To'xtatilgan"
         return f"{self.category} — {self.amount:,} UZS — {self.day_of_month}-kun [{status}]"
 
+    def save(self, *args, **kwargs):
+        self.next_run_date = self.compute_next_run_date()
+        super().save(*args, **kwargs)
+
+    def compute_next_run_date(self):
+        """
+        `last_executed` (yoki `start_date`) dan keyingi bajarilish sanasi.
+        Kun oyda bo'lmasa — oyning oxirgi kuni. Faol emas yoki muddati tugagan bo'lsa — None.
+        """
+        if not self.is_active:
+            return None
+        start = self.start_date
+        if isinstance(start, datetime.datetime):
+            start = start.date()
+        if self.last_executed:
+            start = max(start, self.last_executed + datetime.timedelta(days=1))
+
+        year, month = start.year, start.month
+        day = datetime.date(year, month, min(self.day_of_month, calendar.monthrange(year, month)[1]))
+        if day < start:
+            year, month = (year + 1, 1) if month == 12 else (year, month + 1)
+            day = datetime.date(year, month, min(self.day_of_month, calendar.monthrange(year, month)[1]))
+
+        if self.end_date and day > self.end_date:
+            return None
+        return day
+
 
 # === 6. TRANSACTION ===
+class TransactionQuerySet(models.QuerySet):
+    def delete(self):
+        """
+        Ommaviy o'chirish: rollup deltalari kalit bo'yicha bitta guruhlangan so'rov bilan
+        yig'iladi va qatorlar bitta DELETE bilan o'chadi (`myapp.rollups.delete_transactions`) —
+        har bir qator uchun signal ishlamaydi.
+        """
+        query = self.query
+        if query.is_sliced or query.distinct or query.distinct_fields or query.combinator or self._fields is not None:
+            return super().delete()  # Django'ning o'z xatolari
+        from .rollups import delete_transactions
+
+        deleted = delete_transactions(self)
+        self._result_cache = None
+        return deleted, {self.model._meta.label: deleted}
+
+
 class Transaction(models.Model):
     user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='transactions')
     amount = models.DecimalField(max_digits=17, decimal_places=2, verbose_name=_("Miqdor (UZS)"))
@@ -146,13 +267,42 @@ class Transaction(models.Model):
     description = models.TextField(blank=True, verbose_name=_("Izoh"))
     recurring_schedule = models.ForeignKey(RecurringSchedule, on_delete=models.SET_NULL, null=True, blank=True)
     is_automated = models.BooleanField(default=False, verbose_name=_("Avtomatik"))
+    import_hash = models.CharField(
+        max_length=64,
+        null=True,
+        blank=True,
+        editable=False,
+        verbose_name=_("Import xeshi"),
+        help_text=_("Bank ko'chirmasidan import qilingan qatorning mazmun xeshi (dublikatlarga qarshi).")
+    )
     created_at = models.DateTimeField(auto_now_add=True)
 
+    objects = TransactionQuerySet.as_manager()
+
     class Meta:
         verbose_name = _("Tranzaksiya")
         verbose_name_plural = _("Tranzaksiyalar")
         ordering = ['-date', '-created_at']
-        indexes = [models.Index(fields=['user', 'date']), models.Index(fields=['category'])]
+        indexes = [
+            models.Index(fields=['user', 'date']),
+            models.Index(fields=['category']),
+            # Keyset sahifalash: (-date, -created_at, id)
+            models.Index(fields=['user', '-date', '-created_at', 'id'], name='transaction_user_keyset_idx'),
+        ]
+        constraints = [
+            # Import dublikatlarini aniqlash uchun indeks ham shu
+            models.UniqueConstraint(
+                fields=['user', 'import_hash'],
+                condition=models.Q(import_hash__isnull=False),
+                name='unique_transaction_import_hash'
+            ),
+            # Takrorlanuvchi jadval bir kunda faqat bir marta bajariladi
+            models.UniqueConstraint(
+                fields=['recurring_schedule', 'date'],
+                condition=models.Q(recurring_schedule__isnull=False),
+                name='unique_transaction_recurring_schedule_date'
+            ),
+        ]
 
     def __str__(self):
         cat = self.category.get_full_path() if self.category else "Kategoriyasiz"
@@ -161,6 +311,44 @@ class Transaction(models.Model):
 
 
 # === 7. BUDGET ===
+BUDGET_ALERT_WARNING = 1
+BUDGET_ALERT_EXCEEDED = 2
+BUDGET_ALERT_LEVELS = [
+    (BUDGET_ALERT_WARNING, _("Ogohlantirish")),
+    (BUDGET_ALERT_EXCEEDED, _("Budjet oshdi")),
+]
+# `BudgetAlert.percent` (numeric(9, 2)) sig'imi: kichik budjetda katta sarf foizi shu bilan cheklanadi
+BUDGET_ALERT_MAX_PERCENT = Decimal('9999999.99')
+
+
+class BudgetQuerySet(models.QuerySet):
+    def with_spending(self):
+        """
+        Har bir budjetga `spent` (sarflangan) va `spent_percent` (foiz) annotatsiyalarini
+        qo'shadi. Sarf oylik rollup jadvalidan bitta korrelyatsiyalangan subquery bilan
+        olinadi va pastki kategoriyalarni ham o'z ichiga oladi (`Category.path` prefiksi).
+        Budjetlar soniga qaramay — bitta SQL so'rov.
+        """
+        spent = MonthlyCategoryTotal.objects.filter(
+            user_id=models.OuterRef('user_id'),
+            month=models.OuterRef('month'),
+            type='EXPENSE',
+            category__path__startswith=models.OuterRef('category__path'),
+        ).order_by().values('user_id').annotate(spent=models.Sum('total')).values('spent')
+
+        money = models.DecimalField(max_digits=17, decimal_places=2)
+        return self.annotate(
+            spent=Coalesce(models.Subquery(spent, output_field=money), models.Value(Decimal('0')), output_field=money),
+        ).annotate(
+            spent_percent=models.Case(
+                models.When(amount__gt=0, then=models.F('spent') * 100 / models.F('amount')),
+                default=models.Value(Decimal('0')),
+                # Chegara yo'q: 1 so'mlik budjetga 10^8 sarf — 10^10 %
+                output_field=models.DecimalField(max_digits=24, decimal_places=2),
+            ),
+        )
+
+
 class Budget(models.Model):
     user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='budgets')
     category = models.ForeignKey(
@@ -173,6 +361,16 @@ class Budget(models.Model):
     month = models.DateField(verbose_name=_("Oy (1-kun)"), help_text=_("Masalan: 2025-11-01"))
     warning_threshold = models.PositiveSmallIntegerField(default=80, verbose_name=_("Ogohlantirish (%)"))
     is_active = models.BooleanField(default=True, verbose_name=_("Faol"))
+    # Tranzaksiya yozilganda F() bilan oshiriladi (myapp.budgets) — ogohlantirishlar uchun
+    spent_total = models.DecimalField(
+        max_digits=17, decimal_places=2, default=0, editable=False, verbose_name=_("Sarf hisoblagichi")
+    )
+    alert_level = models.PositiveSmallIntegerField(
+        choices=[(0, _("Yo'q"))] + BUDGET_ALERT_LEVELS, default=0, editable=False,
+        verbose_name=_("Ogohlantirish darajasi")
+    )
+
+    objects = BudgetQuerySet.as_manager()
 
     class Meta:
         verbose_name = _("Budjet")
@@ -194,17 +392,98 @@ class Budget(models.Model):
     def save(self, *args, **kwargs):
         if self.month.day != 1:
             self.month = self.month.replace(day=1)
+        # Hisoblagich rollup'dan boshlanadi (limit yoki kategoriya o'zgargan bo'lishi mumkin);
+        # daraja jimgina yangilanadi — saqlashning o'zi ogohlantirish chiqarmaydi
+        # `with_spending()` annotatsiyasi eski kategoriya/oy bo'yicha bo'lishi mumkin — har doim rollup'dan
+        self.spent_total = self._rollup_spent()
+        self.alert_level = self.compute_alert_level(self.spent_total)
         super().save(*args, **kwargs)
 
+    def compute_alert_level(self, spent):
+        """ 0 — me'yorda, 1 — ogohlantirish chegarasidan o'tdi, 2 — budjet oshdi. """
+        if self.amount <= 0:
+            return 0
+        if spent >= self.amount:
+            return BUDGET_ALERT_EXCEEDED
+        if spent * 100 >= self.amount * self.warning_threshold:
+            return BUDGET_ALERT_WARNING
+        return 0
+
     def spent_amount(self):
-        start = self.month
-        end = (self.month.replace(day=28) + datetime.timedelta(days=4)).replace(day=1) - datetime.timedelta(days=1)
-        total = self.category.transactions.filter(
-            user=self.user,
-            date__gte=start,
-            date__lte=end
-        ).aggregate(total=models.Sum('amount'))['total']
+        # `with_spending()` orqali olingan bo'lsa — qo'shimcha so'rov yo'q
+        if hasattr(self, 'spent'):
+            return self.spent
+        return self._rollup_spent()
+
+    def _rollup_spent(self):
+        # Oylik rollup jadvalidan o'qiladi (pastki kategoriyalar bilan birga)
+        total = MonthlyCategoryTotal.objects.filter(
+            user_id=self.user_id,
+            month=self.month.replace(day=1),
+            type='EXPENSE',
+            category__path__startswith=self.category.path,
+        ).aggregate(total=models.Sum('total'))['total']
         return total or 0
 
     def spent_percentage(self):
-        return round((self.spent_amount() / self.amount) * 100, 2) if self.amount > 0 else 0
\ No newline at end of file
+        if hasattr(self, 'spent_percent'):
+            return round(self.spent_percent, 2)
+        return round((self.spent_amount() / self.amount) * 100, 2) if self.amount > 0 else 0
+
+# === 8. OYLIK YIG'INDI (ROLLUP) ===
+class MonthlyCategoryTotal(models.Model):
+    """
+    Foydalanuvchi, oy, kategoriya va tur bo'yicha oldindan hisoblangan jami.
+    Tranzaksiya yozilganda `myapp.rollups` orqali yangilanib boradi —
+    hisobotlar xom `Transaction` qatorlarini qayta yig'ishi shart emas.
+    """
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='monthly_totals')
+    month = models.DateField(verbose_name=_("Oy (1-kun)"))
+    category = models.ForeignKey(
+        Category,
+        on_delete=models.CASCADE,
+        null=True,
+        blank=True,
+        related_name='monthly_totals',
+        help_text=_("Bo'sh bo'lsa — kategoriyasiz tranzaksiyalar.")
+    )
+    type = models.CharField(max_length=7, choices=TYPE_CHOICES, blank=True, verbose_name=_("Turi"))
+    total = models.DecimalField(max_digits=17, decimal_places=2, default=0, verbose_name=_("Jami (UZS)"))
+    count = models.IntegerField(default=0, verbose_name=_("Soni"))
+    updated_at = models.DateTimeField(default=timezone.now, verbose_name=_("Yangilangan"))
+
+    class Meta:
+        verbose_name = _("Oylik yig'indi")
+        verbose_name_plural = _("Oylik yig'indilar")
+        constraints = [
+            models.UniqueConstraint(
+                fields=['user', 'month', 'category', 'type'],
+                name='unique_monthly_total_user_month_category_type'
+            )
+        ]
+        indexes = [models.Index(fields=['user', 'month'])]
+        ordering = ['-month']
+
+    def __str__(self):
+        return f"{self.month.strftime('%Y-%m')} | {self.category or 'Kategoriyasiz'} | {self.total:,} UZS"
+
+
+# === 9. BUDJET OGOHLANTIRISHLARI ===
+class BudgetAlert(models.Model):
+    """ Budjet chegarasi kesib o'tilganda yoziladigan ilova ichidagi bildirishnoma. """
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='budget_alerts')
+    budget = models.ForeignKey(Budget, on_delete=models.CASCADE, related_name='alerts')
+    level = models.PositiveSmallIntegerField(choices=BUDGET_ALERT_LEVELS, verbose_name=_("Daraja"))
+    spent = models.DecimalField(max_digits=17, decimal_places=2, verbose_name=_("Sarflangan"))
+    percent = models.DecimalField(max_digits=9, decimal_places=2, verbose_name=_("Foiz"))
+    is_read = models.BooleanField(default=False, verbose_name=_("O'qilgan"))
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        verbose_name = _("Budjet ogohlantirishi")
+        verbose_name_plural = _("Budjet ogohlantirishlari")
+        ordering = ['-created_at']
+        indexes = [models.Index(fields=['user', 'is_read', '-created_at'], name='budget_alert_inbox_idx')]
+
+    def __str__(self):
+        return f"{self.budget} — {self.get_level_display()} ({self.percent}%)"
@@ -0,0 +1,68 @@
+# myapp/pagination.py
+"""
+Tranzaksiyalar ro'yxati uchun keyset (kursor) sahifalash.
+
+OFFSET o'rniga oxirgi ko'rsatilgan qatorning (date, created_at, id) qiymatlari
+kursor sifatida olinadi, shuning uchun har bir sahifa oyda nechta qator
+bo'lishidan qat'i nazar bir xil tezlikda yuklanadi.
+Tartib: -date, -created_at, id.
+"""
+import base64
+import datetime
+import json
+
+from django.conf import settings
+from django.db.models import Q
+
+TRANSACTION_ORDERING = ('-date', '-created_at', 'id')
+
+
+def get_page_size():
+    return getattr(settings, 'TRANSACTIONS_PAGE_SIZE', 50)
+
+
+def encode_cursor(obj):
+    """ Qatordan URL uchun xavfsiz kursor satrini yasaydi. """
+    payload = json.dumps([obj.date.isoformat(), obj.created_at.isoformat(), obj.pk])
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip('=')
+
+
+def decode_cursor(value):
+    """ Kursorni (date, created_at, id) ga aylantiradi. Noto'g'ri bo'lsa — None. """
+    if not value:
+        return None
+    try:
+        padded = value + '=' * (-len(value) % 4)
+        day, created_at, pk = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        return (
+            datetime.date.fromisoformat(day),
+            datetime.datetime.fromisoformat(created_at),
+            int(pk),
+        )
+    except (ValueError, TypeError):
+        return None
+
+
+def keyset_page(queryset, cursor=None, page_size=None):
+    """
+    QuerySet'dan bitta sahifani qaytaradi: (qatorlar, keyingi_kursor).
+    Keyingi sahifa bo'lmasa kursor — None. Sahifa borligini bilish uchun
+    bitta ortiqcha qator o'qiladi (COUNT(*) kerak emas).
+    """
+    page_size = page_size or get_page_size()
+    queryset = queryset.order_by(*TRANSACTION_ORDERING)
+
+    position = decode_cursor(cursor) if isinstance(cursor, str) else cursor
+    if position:
+        day, created_at, pk = position
+        queryset = queryset.filter(
+            Q(date__lt=day)
+            | Q(date=day, created_at__lt=created_at)
+            | Q(date=day, created_at=created_at, id__gt=pk)
+        )
+
+    rows = list(queryset[:page_size + 1])
+    if len(rows) > page_size:
+        rows = rows[:page_size]
+        return rows, encode_cursor(rows[-1])
+    return rows, None
@@ -0,0 +1,163 @@
+# myapp/projections.py
+"""
+Takrorlanuvchi jadvallar asosida pul oqimi (cash-flow) prognozi.
+
+Jadvallar oyma-oy Python siklida yoyilmaydi: (jadval x oy) matritsasi NumPy
+bilan bir yo'la hisoblanadi, so'ng kun yoki oy bo'yicha yig'iladi. Summalar
+butun tiyinlarda (int64) saqlanadi — float yaxlitlash xatolari yo'q.
+Boshlang'ich nuqta — bugungi haqiqiy balans va joriy oyning haqiqiy
+daromad/xarajatlari (`Transaction`).
+"""
+import datetime
+from decimal import Decimal
+
+import numpy as np
+from dateutil.relativedelta import relativedelta
+from django.db.models import Sum, Q
+from django.utils import timezone
+
+from .models import RecurringSchedule, Transaction
+
+GRANULARITIES = ('monthly', 'daily')
+MAX_HORIZON_MONTHS = 60
+
+_NO_END = np.datetime64('9999-12-31', 'D')
+
+
+def _to_day(value):
+    return np.datetime64(value, 'D')
+
+
+def _from_cents(value):
+    return Decimal(int(value)) / 100
+
+
+# === 1. VEKTORLASHTIRILGAN YOYISH ===
+def expand_schedules(day_of_month, start, end, amount, after, horizon_end):
+    """
+    Jadvallarni bajarilish sanalariga yoyadi (barcha argumentlar — massivlar, uzunligi S).
+      day_of_month: int, start/end: datetime64[D] (end yo'q bo'lsa — _NO_END),
+      amount: int64 tiyin (daromad +, xarajat -),
+      after: datetime64[D] — shu sanadan KEYINGI sanalar olinadi (kecha yoki last_executed).
+    (sanalar, summalar) — bir o'lchamli massivlar qaytaradi.
+    """
+    if not len(day_of_month):
+        return np.array([], dtype='datetime64[D]'), np.array([], dtype=np.int64)
+
+    first_month = after.min().astype('datetime64[M]')
+    last_month = np.datetime64(horizon_end, 'M')
+    months = np.arange(first_month, last_month + 1, dtype='datetime64[M]')
+    month_starts = months.astype('datetime64[D]')
+    days_in_month = ((months + 1).astype('datetime64[D]') - month_starts).astype(np.int64)
+
+    # (S, M): oyda bo'lmagan kun (30-fevral) — oyning oxirgi kuni
+    offsets = np.minimum(day_of_month[:, None], days_in_month[None, :]) - 1
+    dates = month_starts[None, :] + offsets.astype('timedelta64[D]')
+
+    mask = (
+        (dates > after[:, None])
+        & (dates >= start[:, None])
+        & (dates <= end[:, None])
+        & (dates <= _to_day(horizon_end))
+    )
+    amounts = np.broadcast_to(amount[:, None], dates.shape)
+    return dates[mask], amounts[mask]
+
+
+def schedule_arrays(schedules, today):
+    """
+    `values_list` qatorlaridan `expand_schedules` uchun massivlar:
+    (day_of_month, start, end, amount, after).
+    """
+    rows = list(schedules)
+    size = len(rows)
+    day_of_month = np.empty(size, dtype=np.int64)
+    start = np.empty(size, dtype='datetime64[D]')
+    end = np.empty(size, dtype='datetime64[D]')
+    after = np.empty(size, dtype='datetime64[D]')
+    amount = np.empty(size, dtype=np.int64)
+    # Bugun bajarilishi kerak, lekin hali yozilmagan (process_recurring kutilmoqda) sana ham prognozda
+    yesterday = _to_day(today) - 1
+    for index, (dom, start_date, end_date, last_executed, value, type_) in enumerate(rows):
+        day_of_month[index] = dom
+        start[index] = _to_day(start_date)
+        end[index] = _to_day(end_date) if end_date else _NO_END
+        # last_executed gacha bo'lganlari haqiqiy tranzaksiyalarda, kechagacha o'tkazib
+        # yuborilganlari esa faqat catch-up'da yoziladi
+        after[index] = max(yesterday, _to_day(last_executed)) if last_executed else yesterday
+        cents = int(value * 100)
+        amount[index] = cents if type_ == 'INCOME' else -cents
+    return day_of_month, start, end, amount, after
+
+
+# === 2. PROGNOZ ===
+def project_cash_flow(user, months=12, granularity='monthly', today=None):
+    """
+    Foydalanuvchi uchun `months` oy oldinga prognoz.
+    Natija: {'today', 'horizon_end', 'granularity', 'opening_balance', 'rows': [...]}.
+    Har bir qator: period (oy 1-kuni yoki kun), income, expense, net, balance.
+    Joriy oy qatoriga shu oyning haqiqiy summalari ham qo'shiladi.
+    """
+    if granularity not in GRANULARITIES:
+        raise ValueError(f"Noma'lum davr: {granularity}")
+    if not 1 <= months <= MAX_HORIZON_MONTHS:
+        raise ValueError(f"Muddat 1..{MAX_HORIZON_MONTHS} oy bo'lishi kerak")
+
+    today = today or timezone.localdate()
+    month_start = today.replace(day=1)
+    horizon_end = month_start + relativedelta(months=months) - datetime.timedelta(days=1)
+
+    actuals = Transaction.objects.filter(user=user, date__lte=today).aggregate(
+        income=Sum('amount', filter=Q(category__type='INCOME')),
+        expense=Sum('amount', filter=Q(category__type='EXPENSE')),
+        month_income=Sum('amount', filter=Q(category__type='INCOME', date__gte=month_start)),
+        month_expense=Sum('amount', filter=Q(category__type='EXPENSE', date__gte=month_start)),
+    )
+    actuals = {key: int((value or 0) * 100) for key, value in actuals.items()}
+    balance = actuals['income'] - actuals['expense']
+
+    schedules = RecurringSchedule.objects.filter(
+        user=user, is_active=True, start_date__lte=horizon_end,
+    ).filter(
+        Q(end_date__isnull=True) | Q(end_date__gte=today)
+    ).values_list('day_of_month', 'start_date', 'end_date', 'last_executed', 'amount', 'category__type')
+    dates, amounts = expand_schedules(*schedule_arrays(schedules, today), horizon_end=horizon_end)
+
+    if granularity == 'monthly':
+        periods = np.arange(np.datetime64(month_start, 'M'), np.datetime64(horizon_end, 'M') + 1)
+        index = (dates.astype('datetime64[M]') - periods[0]).astype(np.int64)
+        labels = [period.astype('datetime64[D]').item() for period in periods]
+    else:
+        periods = np.arange(_to_day(today), _to_day(horizon_end) + 1)
+        index = (dates - periods[0]).astype(np.int64)
+        labels = [period.item() for period in periods]
+
+    income = np.zeros(len(periods), dtype=np.int64)
+    expense = np.zeros(len(periods), dtype=np.int64)
+    np.add.at(income, index, np.where(amounts > 0, amounts, 0))
+    np.add.at(expense, index, np.where(amounts < 0, -amounts, 0))
+    if granularity == 'monthly' and len(periods):
+        income[0] += actuals['month_income']
+        expense[0] += actuals['month_expense']
+        opening = balance - actuals['month_income'] + actuals['month_expense']
+    else:
+        opening = balance
+    balances = opening + np.cumsum(income - expense)
+
+    return {
+        'today': today,
+        'horizon_end': horizon_end,
+        'granularity': granularity,
+        'opening_balance': _from_cents(opening),
+        'rows': [
+            {
+                'period': label,
+                'income': _from_cents(income[i]),
+                'expense': _from_cents(expense[i]),
+                'net': _from_cents(income[i] - expense[i]),
+                'balance': _from_cents(balances[i]),
+            }
+            for i, label in enumerate(labels)
+        ],
+    }
+
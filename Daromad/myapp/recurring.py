@@ -0,0 +1,238 @@
+# myapp/recurring.py
+"""
+Takrorlanuvchi jadvallarni (`RecurringSchedule`) bajarish mexanizmi.
+
+Bajariladigan jadvallar ID bo'yicha bo'laklab (keyset) tanlanadi. Har bir
+bo'lak alohida `transaction.atomic()` (savepoint) ichida yoziladi:
+tranzaksiyalar `bulk_create`, `last_executed` esa `bulk_update` bilan.
+Bitta bo'lakdagi xato faqat o'sha bo'lakni bekor qiladi.
+(recurring_schedule, date) bo'yicha unikal cheklov qayta ishga tushirishni
+xavfsiz qiladi — bir kun uchun ikkinchi tranzaksiya yaratilmaydi.
+
+`catch_up=True` rejimida `last_executed` (yoki `start_date`) dan bugungacha
+o'tkazib yuborilgan barcha sanalar oy bo'yicha hisoblanadi (kunma-kun emas)
+va bitta o'tishda yoziladi. Oyda `day_of_month` kuni bo'lmasa (masalan,
+fevralda 30-kun) — oyning oxirgi kuni olinadi.
+
+Parallel ishlash: `shard=(i, N)` faqat `user_id % N == i` bo'lgan jadvallarni
+oladi, `run_in_workers(N, ...)` esa N ta jarayonni ishga tushiradi. Har bir
+bo'lak `select_for_update(skip_locked=True)` bilan band qilinadi va band
+qilingandan keyin qayta tekshiriladi — bir vaqtda ishlayotgan jarayonlar
+bitta jadvalni ikki marta bajarmaydi.
+
+Tanlov indekslangan `next_run_date` bo'yicha qilinadi, shuning uchun har bir
+ishga tushirish faqat muddati kelgan jadvallar soniga (O(due)) bog'liq.
+"""
+import calendar
+import datetime
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+
+import django
+from django.db import DatabaseError, connections, transaction
+from django.db.models import Min, Q
+from django.db.models.functions import Mod
+from django.utils import timezone
+
+from .caching import bump_data_version
+from .models import RecurringSchedule, Transaction
+from .rollups import apply_deltas, collect_deltas
+
+DEFAULT_CHUNK_SIZE = 500
+
+
+@dataclass
+class RecurringRunReport:
+    date: object
+    shard: tuple = None
+    selected: int = 0
+    created: int = 0
+    skipped: int = 0
+    chunks: int = 0
+    failed: list = field(default_factory=list)  # [(jadval_idlari, xabar)]
+    elapsed: float = 0.0
+
+    @property
+    def throughput(self):
+        """ Soniyasiga yaratilgan tranzaksiyalar. """
+        return self.created / self.elapsed if self.elapsed else 0.0
+
+
+def occurrence_in_month(year, month, day_of_month):
+    """ Oydagi bajarilish sanasi: kun oyda bo'lmasa — oyning oxirgi kuni. """
+    return datetime.date(year, month, min(day_of_month, calendar.monthrange(year, month)[1]))
+
+
+def occurrences_between(day_of_month, start, end):
+    """ [start, end] oralig'idagi barcha bajarilish sanalari (har oyda bittadan). """
+    if start > end:
+        return []
+    dates = []
+    year, month = start.year, start.month
+    while (year, month) <= (end.year, end.month):
+        day = occurrence_in_month(year, month, day_of_month)
+        if start <= day <= end:
+            dates.append(day)
+        year, month = (year + 1, 1) if month == 12 else (year, month + 1)
+    return dates
+
+
+def parse_shard(value):
+    """ "i/N" -> (i, N). Noto'g'ri bo'lsa ValueError. """
+    try:
+        index, count = (int(part) for part in value.split('/'))
+    except (AttributeError, ValueError):
+        raise ValueError(f"Noto'g'ri shard: {value!r} (kutilgan ko'rinish: i/N)")
+    if count < 1 or not 0 <= index < count:
+        raise ValueError(f"Noto'g'ri shard: {value!r} (0 <= i < N bo'lishi kerak)")
+    return index, count
+
+
+def build_transaction(schedule, day):
+    """ Jadval va sana uchun saqlanmagan avtomatik `Transaction`. """
+    return Transaction(
+        user_id=schedule.user_id,
+        amount=schedule.amount,
+        category=schedule.category,
+        date=day,
+        description=f"Avtomatik takrorlanuvchi tranzaksiya: {schedule.note or schedule.category.name}",
+        recurring_schedule=schedule,
+        is_automated=True,
+    )
+
+
+class RecurringEngine:
+    """ Berilgan kun (`today`) uchun bajarilishi kerak bo'lgan jadvallarni bo'laklab bajaradi. """
+
+    def __init__(self, today=None, chunk_size=DEFAULT_CHUNK_SIZE, catch_up=False, shard=None):
+        self.today = today or timezone.now().date()
+        self.chunk_size = chunk_size
+        self.catch_up = catch_up
+        self.shard = shard
+
+    def due_schedules(self):
+        today = self.today
+        queryset = RecurringSchedule.objects.filter(
+            is_active=True,
+            next_run_date__lte=today,
+        )
+        if self.shard:
+            index, count = self.shard
+            queryset = queryset.alias(shard=Mod('user_id', count)).filter(shard=index)
+        if self.catch_up:
+            # O'tkazib yuborilgan sanalar (tugash sanasidan oldingilari ham) shu yerda yoziladi
+            return queryset
+
+        queryset = queryset.filter(Q(last_executed__lt=today) | Q(last_executed__isnull=True))
+        if today.day == calendar.monthrange(today.year, today.month)[1]:
+            # Oyning oxirgi kuni: bu oyda bo'lmagan kunlar (29, 30) ham shu kuni bajariladi
+            return queryset.filter(day_of_month__gte=today.day)
+        return queryset.filter(day_of_month=today.day)
+
+    def occurrences(self, schedule):
+        """ Jadval uchun yaratiladigan sanalar. """
+        if not self.catch_up:
+            return [self.today]
+        start = schedule.start_date
+        if schedule.last_executed:
+            start = max(start, schedule.last_executed + datetime.timedelta(days=1))
+        end = min(self.today, schedule.end_date) if schedule.end_date else self.today
+        return occurrences_between(schedule.day_of_month, start, end)
+
+    def run(self, progress=None):
+        """
+        Barcha bo'laklarni bajaradi va `RecurringRunReport` qaytaradi.
+        Har bir bo'lakdan keyin `progress(report)` chaqiriladi.
+        """
+        report = RecurringRunReport(date=self.today, shard=self.shard)
+        started = time.perf_counter()
+        users = set()
+        candidates = self.due_schedules().order_by('pk').values_list('pk', flat=True)
+
+        last_pk = 0
+        while True:
+            ids = list(candidates.filter(pk__gt=last_pk)[:self.chunk_size])
+            if not ids:
+                break
+            last_pk = ids[-1]
+            report.chunks += 1
+            users.update(self._process_chunk(ids, report))
+            if progress:
+                progress(report)
+
+        for user_id in users:
+            bump_data_version(user_id)
+        report.elapsed = time.perf_counter() - started
+        return report
+
+    def _process_chunk(self, ids, report):
+        """
+        Bitta bo'lakni bitta savepoint ichida yozadi. Ta'sirlangan user_id'larni qaytaradi.
+        Qatorlar band qilinadi; boshqa jarayon band qilgan yoki allaqachon bajargan
+        jadvallar (qayta tekshiruvdan o'tmaganlar) tashlab ketiladi.
+        """
+        try:
+            with transaction.atomic():
+                chunk = list(self.due_schedules().filter(pk__in=ids).select_related('category').select_for_update(
+                    skip_locked=True, of=('self',)
+                ).order_by('pk'))
+                pairs = [(schedule, day) for schedule in chunk for day in self.occurrences(schedule)]
+                existing = set(Transaction.objects.filter(
+                    recurring_schedule__in=chunk,
+                    date__in={day for _, day in pairs},
+                ).values_list('recurring_schedule_id', 'date')) if pairs else set()
+                new_rows = [
+                    build_transaction(schedule, day)
+                    for schedule, day in pairs
+                    if (schedule.pk, day) not in existing
+                ]
+                Transaction.objects.bulk_create(new_rows, batch_size=self.chunk_size)
+                apply_deltas(collect_deltas(new_rows))
+
+                for schedule, day in pairs:
+                    if schedule.last_executed is None or schedule.last_executed < day:
+                        schedule.last_executed = day
+                for schedule in chunk:
+                    schedule.next_run_date = schedule.compute_next_run_date()
+                RecurringSchedule.objects.bulk_update(
+                    chunk, ['last_executed', 'next_run_date'], batch_size=self.chunk_size
+                )
+        except DatabaseError as exc:
+            report.failed.append((ids, str(exc)))
+            return set()
+
+        report.selected += len(chunk)
+        report.created += len(new_rows)
+        report.skipped += len(pairs) - len(new_rows)
+        return {tx.user_id for tx in new_rows}
+
+
+def nearest_run_date():
+    """ Faol jadvallar ichida eng yaqin `next_run_date` (indeks bo'yicha bitta so'rov). """
+    return RecurringSchedule.objects.filter(is_active=True).aggregate(
+        nearest=Min('next_run_date')
+    )['nearest']
+
+
+# === PARALLEL JARAYONLAR ===
+def _run_shard(options):
+    """ Alohida jarayonda bitta shard'ni bajaradi (jarayon o'z ulanishini ochadi). """
+    django.setup()
+    try:
+        return RecurringEngine(**options).run()
+    finally:
+        connections.close_all()
+
+
+def run_in_workers(workers, today=None, chunk_size=DEFAULT_CHUNK_SIZE, catch_up=False):
+    """ `workers` ta jarayonda har biriga o'z shard'ini berib bajaradi. Hisobotlar ro'yxati. """
+    today = today or timezone.now().date()
+    # Ota jarayon ulanishlari bolalarga meros qolmasligi kerak
+    connections.close_all()
+    jobs = [
+        {'today': today, 'chunk_size': chunk_size, 'catch_up': catch_up, 'shard': (index, workers)}
+        for index in range(workers)
+    ]
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        return list(executor.map(_run_shard, jobs))
@@ -0,0 +1,175 @@
+# myapp/rollups.py
+"""
+`MonthlyCategoryTotal` jadvalini yangilab borish uchun yordamchi funksiyalar.
+
+Har bir o'zgarish "delta" ko'rinishida beriladi:
+    (user_id, month, category_id, type) -> (summa, soni)
+Signal'lar (bitta tranzaksiya) va ommaviy yozuvlar (bulk_create/update)
+ham shu funksiyalardan foydalanadi.
+"""
+from collections import defaultdict
+from decimal import Decimal
+
+from dateutil.relativedelta import relativedelta
+
+from django.db import IntegrityError, transaction
+from django.db.models import Sum, Count, F
+from django.db.models.functions import TruncMonth
+from django.utils import timezone
+
+from .budgets import apply_budget_deltas, refresh_budget_counters
+from .caching import bump_data_version
+from .models import Budget, MonthlyCategoryTotal, Transaction
+
+
+def month_start(value):
+    """ Sanani oyning 1-kuniga keltiradi. """
+    return value.replace(day=1)
+
+
+def rollup_key(user_id, date, category_id, category_type):
+    """ Bitta tranzaksiya uchun rollup kaliti. Kategoriyasiz bo'lsa tur — ''. """
+    if category_id is None:
+        category_type = ''
+    return (user_id, month_start(date), category_id, category_type or '')
+
+
+def transaction_key(tx):
+    """ `Transaction` obyekti uchun rollup kaliti (kategoriya yuklangan bo'lishi kerak). """
+    category_type = tx.category.type if tx.category_id else ''
+    return rollup_key(tx.user_id, tx.date, tx.category_id, category_type)
+
+
+def collect_deltas(transactions, sign=1):
+    """
+    Tranzaksiyalar ro'yxatidan kalit bo'yicha guruhlangan deltalarni yig'adi.
+    `sign=-1` o'chirilgan qatorlar uchun.
+    """
+    deltas = defaultdict(lambda: [Decimal('0'), 0])
+    for tx in transactions:
+        entry = deltas[transaction_key(tx)]
+        entry[0] += sign * Decimal(tx.amount)
+        entry[1] += sign
+    return deltas
+
+
+def merge_deltas(target, source):
+    """ Ikki delta lug'atini birlashtiradi (`target` o'zgaradi). """
+    for key, (amount, count) in source.items():
+        entry = target.setdefault(key, [Decimal('0'), 0])
+        entry[0] += amount
+        entry[1] += count
+    return target
+
+
+def apply_deltas(deltas):
+    """
+    Deltalarni F-ifodalar bilan atomik qo'llaydi.
+    Qator yo'q bo'lsa va delta musbat bo'lsa — yangi qator yaratiladi.
+    Manfiy delta uchun qator topilmasa (masalan, foydalanuvchi o'chirilayotganda)
+    hech narsa qilinmaydi. Nol delta ham `updated_at` ni yangilaydi (masalan,
+    faqat izoh tahrirlanganda) — bu oy uchun o'zgarish belgisi.
+    """
+    now = timezone.now()
+    for (user_id, month, category_id, category_type), (amount, count) in deltas.items():
+        lookup = {
+            'user_id': user_id,
+            'month': month,
+            'category_id': category_id,
+            'type': category_type,
+        }
+        updated = MonthlyCategoryTotal.objects.filter(**lookup).update(
+            total=F('total') + amount,
+            count=F('count') + count,
+            updated_at=now,
+        )
+        if updated or count <= 0:
+            continue
+        try:
+            with transaction.atomic():
+                MonthlyCategoryTotal.objects.create(total=amount, count=count, **lookup)
+        except IntegrityError:
+            # Parallel so'rov qatorni bizdan oldin yaratdi
+            MonthlyCategoryTotal.objects.filter(**lookup).update(
+                total=F('total') + amount,
+                count=F('count') + count,
+                updated_at=now,
+            )
+
+    # Xuddi shu deltalar budjet hisoblagichlariga ham (ogohlantirishlar shu yerda chiqadi)
+    apply_budget_deltas(deltas)
+
+
+def aggregate_transactions(queryset):
+    """
+    Tranzaksiyalar QuerySet'idan rollup qatorlarini (saqlanmagan) hosil qiladi.
+    Bitta guruhlangan so'rov ishlatiladi.
+    """
+    rows = queryset.annotate(month=TruncMonth('date')).values(
+        'user_id', 'month', 'category_id', 'category__type'
+    ).annotate(total=Sum('amount'), count=Count('id')).order_by()
+
+    return [
+        MonthlyCategoryTotal(
+            user_id=row['user_id'],
+            month=row['month'],
+            category_id=row['category_id'],
+            type=row['category__type'] if row['category_id'] else '',
+            total=row['total'],
+            count=row['count'],
+        )
+        for row in rows
+    ]
+
+
+def delete_transactions(queryset):
+    """
+    `Transaction.objects.filter(...).delete()` yadrosi: o'chiriladigan qatorlar bitta
+    guruhlangan so'rov bilan deltalarga yig'iladi, keyin bitta DELETE va har kalit
+    uchun bitta UPDATE. Qatorlar Python'ga o'qilmaydi. O'chirilganlar sonini qaytaradi.
+    """
+    with transaction.atomic(using=queryset.db):
+        deltas = {
+            (row.user_id, row.month, row.category_id, row.type): [-row.total, -row.count]
+            for row in aggregate_transactions(queryset)
+        }
+        # Transaction'ga bog'langan jadval yo'q — kaskadsiz to'g'ridan-to'g'ri DELETE
+        deleted = queryset._raw_delete(queryset.db)
+        apply_deltas(deltas)
+    for user_id in {key[0] for key in deltas}:
+        bump_data_version(user_id)
+    return deleted
+
+
+def rebuild_rollups(user=None, batch_size=1000):
+    """
+    Rollup jadvalini `Transaction` jadvalidan qaytadan quradi.
+    `user` berilsa faqat shu foydalanuvchi uchun. Yaratilgan qatorlar sonini qaytaradi.
+    """
+    transactions_qs = Transaction.objects.all()
+    rollups_qs = MonthlyCategoryTotal.objects.all()
+    if user is not None:
+        transactions_qs = transactions_qs.filter(user=user)
+        rollups_qs = rollups_qs.filter(user=user)
+
+    with transaction.atomic():
+        rollups_qs.delete()
+        objs = aggregate_transactions(transactions_qs)
+        MonthlyCategoryTotal.objects.bulk_create(objs, batch_size=batch_size)
+        refresh_budget_counters(Budget.objects.filter(user=user) if user is not None else None)
+    return len(objs)
+
+
+def rebuild_uncategorized(keys):
+    """
+    Berilgan (user_id, month) juftliklari uchun kategoriyasiz qatorlarni qayta hisoblaydi.
+    Kategoriya o'chirilganda (SET_NULL) ishlatiladi.
+    """
+    for user_id, month in keys:
+        next_month = month + relativedelta(months=1)
+        MonthlyCategoryTotal.objects.filter(user_id=user_id, month=month, category__isnull=True).delete()
+        objs = aggregate_transactions(Transaction.objects.filter(
+            user_id=user_id, category__isnull=True, date__gte=month, date__lt=next_month
+        ))
+        MonthlyCategoryTotal.objects.bulk_create(objs)
+
@@ -0,0 +1,236 @@
+# myapp/services.py
+"""
+Hisobotlar uchun qayta ishlatiladigan hisob-kitob xizmatlari.
+
+View'lar bu yerdagi funksiyalarni chaqiradi — har bir funksiya imkon qadar
+kam (odatda bitta) SQL so'rov bilan ishlaydi.
+"""
+from decimal import Decimal
+
+from dateutil.relativedelta import relativedelta
+from django.db.models import Sum, Min, Max, Q, F
+
+from .models import Transaction, MonthlyCategoryTotal, Category, Budget
+
+
+def month_end(month_start):
+    """ Oyning oxirgi kunini qaytaradi. """
+    return month_start + relativedelta(months=1) - relativedelta(days=1)
+
+
+# === 1. DAVR XULOSASI (bitta so'rov) ===
+def get_period_summary(user, start, end, prev_start, prev_end):
+    """
+    Joriy va oldingi davr uchun daromad/xarajat summalarini hamda
+    foydalanuvchining eng birinchi va oxirgi tranzaksiya sanalarini
+    BITTA shartli agregatsiya so'rovi bilan hisoblaydi.
+    """
+    current = Q(date__gte=start, date__lte=end)
+    previous = Q(date__gte=prev_start, date__lte=prev_end)
+    income = Q(category__type='INCOME')
+    expense = Q(category__type='EXPENSE')
+
+    totals = Transaction.objects.filter(user=user).aggregate(
+        income=Sum('amount', filter=current & income),
+        expense=Sum('amount', filter=current & expense),
+        prev_income=Sum('amount', filter=previous & income),
+        prev_expense=Sum('amount', filter=previous & expense),
+        min_date=Min('date'),
+        max_date=Max('date'),
+    )
+
+    summary = {
+        'income': totals['income'] or 0,
+        'expense': totals['expense'] or 0,
+        'prev_income': totals['prev_income'] or 0,
+        'prev_expense': totals['prev_expense'] or 0,
+        'min_date': totals['min_date'],
+        'max_date': totals['max_date'],
+    }
+    summary['net_balance'] = summary['income'] - summary['expense']
+    summary['prev_net_balance'] = summary['prev_income'] - summary['prev_expense']
+    summary['balance_change'] = summary['net_balance'] - summary['prev_net_balance']
+    return summary
+
+
+# === 2. ASOSIY KATEGORIYALAR BO'YICHA JAMI ===
+def get_main_category_totals(queryset, amount_field='amount'):
+    """
+    Tranzaksiyalarni (yoki rollup qatorlarini) daraxt ildizi — asosiy kategoriya
+    bo'yicha guruhlaydi (`Category.root`, istalgan chuqurlikda). Ildiz nomi va
+    turi ham shu so'rovning o'zida olinadi, alohida `in_bulk` so'rovi kerak emas.
+    """
+    rows = queryset.filter(category__isnull=False).annotate(
+        main_cat_id=F('category__root_id'),
+        main_cat_name=F('category__root__name'),
+    ).values('main_cat_id', 'main_cat_name', 'category__type').annotate(
+        total=Sum(amount_field)
+    ).order_by('-total')
+
+    return [
+        {
+            'category__name': row['main_cat_name'],
+            'category__type': row['category__type'],
+            'total': row['total'],
+        }
+        for row in rows
+    ]
+
+
+# === 3. ROLLUP ASOSIDAGI HISOBOT (to'liq oylar uchun) ===
+def get_rollup_summary(user, month, prev_month):
+    """
+    `get_period_summary` bilan bir xil lug'at, lekin `MonthlyCategoryTotal`
+    jadvalidan BITTA so'rovda olinadi. Faqat to'liq oylar uchun ishlatiladi.
+    Sana chegaralari oy aniqligida qaytadi (birinchi oyning 1-kuni,
+    oxirgi oyning oxirgi kuni).
+    """
+    current = Q(month=month)
+    previous = Q(month=prev_month)
+    income = Q(type='INCOME')
+    expense = Q(type='EXPENSE')
+    non_empty = Q(count__gt=0)
+
+    totals = MonthlyCategoryTotal.objects.filter(user=user).aggregate(
+        income=Sum('total', filter=current & income),
+        expense=Sum('total', filter=current & expense),
+        prev_income=Sum('total', filter=previous & income),
+        prev_expense=Sum('total', filter=previous & expense),
+        min_month=Min('month', filter=non_empty),
+        max_month=Max('month', filter=non_empty),
+    )
+
+    summary = {
+        'income': totals['income'] or 0,
+        'expense': totals['expense'] or 0,
+        'prev_income': totals['prev_income'] or 0,
+        'prev_expense': totals['prev_expense'] or 0,
+        'min_date': totals['min_month'],
+        'max_date': month_end(totals['max_month']) if totals['max_month'] else None,
+    }
+    summary['net_balance'] = summary['income'] - summary['expense']
+    summary['prev_net_balance'] = summary['prev_income'] - summary['prev_expense']
+    summary['balance_change'] = summary['net_balance'] - summary['prev_net_balance']
+    return summary
+
+
+def get_rollup_main_category_totals(user, month):
+    """ `get_main_category_totals` ning rollup jadvalidan o'qiydigan varianti. """
+    rollups_qs = MonthlyCategoryTotal.objects.filter(
+        user=user, month=month, category__isnull=False, count__gt=0
+    )
+    return get_main_category_totals(rollups_qs, amount_field='total')
+
+
+# === 4. DASHBOARD UCHUN UMUMIY HISOBOT ===
+def get_dashboard_totals(user, start_of_month, end_date):
+    """
+    Dashboard kartalari uchun jami summalar va asosiy kategoriyalar tahlili.
+    Oy to'liq bo'lsa (o'tgan oylar) — rollup jadvalidan, joriy oy (bugungacha)
+    bo'lsa — xom tranzaksiyalardan hisoblanadi.
+    """
+    prev_month_start = start_of_month - relativedelta(months=1)
+    prev_month_end = start_of_month - relativedelta(days=1)
+
+    if end_date == month_end(start_of_month):
+        summary = get_rollup_summary(user, start_of_month, prev_month_start)
+        summary['main_category_totals'] = get_rollup_main_category_totals(user, start_of_month)
+        return summary
+
+    summary = get_period_summary(user, start_of_month, end_date, prev_month_start, prev_month_end)
+    summary['main_category_totals'] = get_main_category_totals(Transaction.objects.filter(
+        user=user, date__gte=start_of_month, date__lte=end_date
+    ))
+    return summary
+
+
+# === 5. KATEGORIYALAR KATALOGI (formalar uchun JSON) ===
+ICON_MAP = {
+    'Oziq-ovqat': 'fas fa-shopping-basket', 'Uy-joy / Ijara': 'fas fa-home',
+    'Transport': 'fas fa-car', 'Ko\'ngilochar': 'fas fa-film',
+    'Kommunal to\'lovlar': 'fas fa-lightbulb', 'Ta\'lim': 'fas fa-graduation-cap',
+    'Restoran / Kafe': 'fas fa-utensils', 'Sog\'liqni Saqlash': 'fas fa-hospital',
+    'Maosh / Oylik': 'fas fa-briefcase', 'Freelance': 'fas fa-laptop-code',
+    'Ijara Daromadi': 'fas fa-house-user', 'Dividenda / Foiz': 'fas fa-chart-line',
+    'Sovg\'a / Mukofot': 'fas fa-gift',
+    'default_expense': 'fas fa-minus-circle',
+    'default_income': 'fas fa-plus-circle',
+}
+
+
+def build_category_catalogue(user):
+    """
+    Foydalanuvchi va global kategoriyalar ro'yxati (faol va faolsiz) — tranzaksiya
+    formasi ham, kategoriyalar sahifasi ham shu bitta ro'yxatdan foydalanadi.
+    """
+    categories = Category.objects.filter(
+        Q(user=user) | Q(user__isnull=True),
+    ).select_related('parent').order_by('type', 'parent__id', 'name')
+
+    catalogue = []
+    for cat in categories:
+        default_icon = ICON_MAP['default_expense' if cat.type == 'EXPENSE' else 'default_income']
+        catalogue.append({
+            'id': cat.id,
+            'name': cat.name,
+            'type': cat.type,
+            'icon': ICON_MAP.get(cat.name, default_icon),
+            'parent_id': cat.parent_id,
+            'parent_name': cat.parent.name if cat.parent else None,
+            'full_path': cat.get_full_path(),
+            'depth': cat.depth,
+            'user_owned': cat.user_id == user.pk,
+            'is_active': cat.is_active,
+        })
+    return catalogue
+
+
+# === 6. BUDJETLAR HOLATI ===
+def get_budget_overview(user, month_start, today):
+    """
+    Oyning faol budjetlari: sarflangan, qolgan, foiz va kunlik sarf sur'ati
+    bo'yicha oy oxiriga prognoz. Budjetlar soniga qaramay BITTA so'rov
+    (`with_spending()`), qolgan hisob-kitob xotirada.
+    """
+    days_in_month = month_end(month_start).day
+    if today < month_start:
+        days_elapsed = 0
+    elif today > month_end(month_start):
+        days_elapsed = days_in_month
+    else:
+        days_elapsed = today.day
+    days_left = days_in_month - days_elapsed
+
+    budgets = list(Budget.objects.filter(
+        user=user, month=month_start, is_active=True
+    ).with_spending().select_related('category').order_by('category__full_path'))
+
+    # Ota kategoriyasi ham budjetlangan budjet — ota limiti ichida (sarfi ota summasida bor),
+    # shuning uchun jami faqat eng yuqori darajadagi budjetlardan yig'iladi
+    budgeted_paths = {budget.category.path for budget in budgets}
+    totals = {'amount': Decimal('0'), 'spent': Decimal('0'), 'projected': Decimal('0')}
+    for budget in budgets:
+        parts = budget.category.path.strip('/').split('/')
+        budget.is_nested = any(f"/{'/'.join(parts[:depth])}/" in budgeted_paths for depth in range(1, len(parts)))
+        budget.remaining = budget.amount - budget.spent
+        budget.daily_burn = budget.spent / days_elapsed if days_elapsed else Decimal('0')
+        budget.projected = budget.daily_burn * days_in_month if days_elapsed else budget.spent
+        budget.projected_percent = budget.projected * 100 / budget.amount if budget.amount else Decimal('0')
+        # Limitdan oshmaslik uchun qolgan kunlarda kuniga qancha sarflash mumkin
+        budget.daily_allowance = max(budget.remaining, Decimal('0')) / days_left if days_left else Decimal('0')
+        budget.will_exceed = budget.projected > budget.amount
+        if budget.is_nested:
+            continue
+        totals['amount'] += budget.amount
+        totals['spent'] += budget.spent
+        totals['projected'] += budget.projected
+
+    totals['remaining'] = totals['amount'] - totals['spent']
+    totals['percent'] = totals['spent'] * 100 / totals['amount'] if totals['amount'] else Decimal('0')
+    return {
+        'budgets': budgets,
+        'totals': totals,
+        'days_in_month': days_in_month,
+        'days_elapsed': days_elapsed,
+        'days_left': days_left,
+    }
@@ -0,0 +1,136 @@
+# myapp/signals.py
+"""
+Model signal'lari: `Transaction` va `Category` yozilganda oylik rollup
+jadvalini (`MonthlyCategoryTotal`) mos holda yangilaydi va foydalanuvchi
+kesh versiyasini oshiradi.
+"""
+from decimal import Decimal
+
+from django.db.models.signals import pre_save, post_save, pre_delete, post_delete
+from django.dispatch import receiver
+
+from .models import Budget, Category, Transaction, MonthlyCategoryTotal
+from .rollups import rollup_key, transaction_key, apply_deltas, rebuild_uncategorized
+from .budgets import ancestor_ids, refresh_budget_counters
+from .caching import bump_data_version, CATEGORIES
+
+
+def _affected_budgets(category, old_path):
+    """
+    Kategoriya ko'chsa yoki turi o'zgarsa — faqat eski va yangi ota-bobolari
+    (va o'zi) bo'yicha budjetlar sarfi o'zgaradi.
+    Global kategoriya (user=None) budjetlari hamma foydalanuvchilarda bo'lishi mumkin.
+    """
+    category_ids = set(ancestor_ids(category.path)) | set(ancestor_ids(old_path or ''))
+    budgets = Budget.objects.filter(category_id__in=category_ids)
+    return budgets if category.user_id is None else budgets.filter(user_id=category.user_id)
+
+
+# === 1. TRANSACTION ===
+@receiver(pre_save, sender=Transaction)
+def remember_old_transaction(sender, instance, **kwargs):
+    """ Tahrirlashdan oldingi holatni eslab qolamiz (delta hisoblash uchun). """
+    instance._rollup_old_key = None
+    if instance.pk and not instance._state.adding:
+        old = Transaction.objects.filter(pk=instance.pk).values(
+            'user_id', 'date', 'amount', 'category_id', 'category__type'
+        ).first()
+        if old:
+            key = rollup_key(old['user_id'], old['date'], old['category_id'], old['category__type'])
+            instance._rollup_old_key = (key, old['amount'])
+
+
+@receiver(post_save, sender=Transaction)
+def update_rollup_on_save(sender, instance, **kwargs):
+    deltas = {}
+    old = getattr(instance, '_rollup_old_key', None)
+    if old:
+        key, amount = old
+        deltas[key] = [-Decimal(amount), -1]
+
+    new_key = transaction_key(instance)
+    entry = deltas.setdefault(new_key, [Decimal('0'), 0])
+    entry[0] += Decimal(instance.amount)
+    entry[1] += 1
+    apply_deltas(deltas)
+    bump_data_version(instance.user_id)
+
+
+def _cascaded_from_elsewhere(origin):
+    """
+    Tranzaksiya boshqa model (foydalanuvchi) bilan kaskad o'chirilyaptimi?
+    Unda rollup va budjet qatorlari ham kaskad bilan o'chadi — qatorma-qator ish shart emas.
+    Ommaviy `QuerySet.delete()` signal'siz ishlaydi (`TransactionQuerySet.delete`).
+    """
+    return origin is not None and getattr(origin, 'model', type(origin)) is not Transaction
+
+
+@receiver(pre_delete, sender=Transaction)
+def remember_deleted_transaction(sender, instance, origin=None, **kwargs):
+    if _cascaded_from_elsewhere(origin):
+        return
+    # Kaskad o'chirishda kategoriya tranzaksiyadan oldin o'chishi mumkin,
+    # shuning uchun kalitni hali hammasi joyida bo'lganda olamiz.
+    instance._rollup_old_key = transaction_key(instance)
+
+
+@receiver(post_delete, sender=Transaction)
+def update_rollup_on_delete(sender, instance, origin=None, **kwargs):
+    if _cascaded_from_elsewhere(origin):
+        return
+    key = getattr(instance, '_rollup_old_key', None) or transaction_key(instance)
+    apply_deltas({key: [-Decimal(instance.amount), -1]})
+    bump_data_version(instance.user_id)
+
+
+# === 2. CATEGORY ===
+@receiver(pre_save, sender=Category)
+def remember_old_category_type(sender, instance, **kwargs):
+    instance._rollup_old_type = instance._rollup_old_path = None
+    if instance.pk and not instance._state.adding:
+        old = Category.objects.filter(pk=instance.pk).values('type', 'path').first()
+        if old:
+            instance._rollup_old_type, instance._rollup_old_path = old['type'], old['path']
+
+
+@receiver(post_save, sender=Category)
+def update_rollup_on_type_change(sender, instance, **kwargs):
+    old_type = getattr(instance, '_rollup_old_type', None)
+    if old_type and old_type != instance.type:
+        MonthlyCategoryTotal.objects.filter(category=instance).update(type=instance.type)
+    old_path = getattr(instance, '_rollup_old_path', None)
+    if (old_type and old_type != instance.type) or (old_path and old_path != instance.path):
+        # Ota-bobolar o'zgardi — budjet hisoblagichlari qayta hisoblanadi
+        refresh_budget_counters(_affected_budgets(instance, old_path))
+    # Nom, ota yoki tur o'zgarishi hisobotlarga ta'sir qiladi
+    bump_data_version(instance.user_id)
+    bump_data_version(instance.user_id, CATEGORIES)
+
+
+@receiver(pre_delete, sender=Category)
+def remember_category_months(sender, instance, origin=None, **kwargs):
+    """
+    Kategoriya o'chirilganda tranzaksiyalar SET_NULL bo'ladi (signal'siz UPDATE).
+    Ta'sirlangan (user, oy) juftliklarini eslab, o'chirishdan keyin
+    kategoriyasiz qatorlarni qayta hisoblaymiz.
+    Foydalanuvchi o'chirilayotgan bo'lsa (kaskad) — uning rollup'lari ham o'chadi.
+    """
+    origin_model = getattr(origin, 'model', type(origin))
+    if origin_model is not Category:
+        instance._rollup_months = None
+        return
+    instance._rollup_months = set(
+        MonthlyCategoryTotal.objects.filter(category=instance, count__gt=0).values_list('user_id', 'month')
+    )
+
+
+@receiver(post_delete, sender=Category)
+def rebuild_rollup_on_category_delete(sender, instance, **kwargs):
+    months = getattr(instance, '_rollup_months', None)
+    if months:
+        rebuild_uncategorized(months)
+        refresh_budget_counters(Budget.objects.filter(
+            user_id__in={user_id for user_id, _ in months}, month__in={month for _, month in months}
+        ))
+    bump_data_version(instance.user_id)
+    bump_data_version(instance.user_id, CATEGORIES)
@@ -1,6 +1,7 @@
 from django import template
-from django.db.models import QuerySet 
 from decimal import Decimal
+from functools import lru_cache
+from math import isfinite
 
 register = template.Library()
 
@@ -20,57 +21,137 @@ def percentage_of(numerator, denominator):
         return 0
     return 0
 
+def _format_currency(value, currency_symbol):
+    """ `currency` ning keshsiz yadrosi. """
+    if value is None or value == '':
+        return f'0{currency_symbol}'
+    try:
+        # int/Decimal uchun str() orqali aylanib o'tish shart emas:
+        # kasr qismi nol tomon tashlanadi (int() bilan bir xil)
+        if type(value) is int:
+            integer = value
+        elif type(value) is Decimal:
+            integer = int(value)
+        elif type(value) is float and isfinite(value):
+            # int(1e23) == 99999999999999991611392 — qisqa o'nlik ko'rinish (repr) orqali
+            integer = int(Decimal(repr(value)))
+        else:
+            value = Decimal(str(value))
+            integer = int(value)
+    except Exception:
+        # Xatolik yuz bersa (NaN, Infinity, matn), original qiymatni qaytarish
+        return f"{value}{currency_symbol}"
+    # Har 3 ta raqamdan keyin bo'sh joy: 1234567 -> "1 234 567"
+    return f"{integer:,}".replace(',', ' ') + currency_symbol
+
+
+@lru_cache(maxsize=4096, typed=True)
+def _format_currency_cached(value, currency_symbol):
+    return _format_currency(value, currency_symbol)
+
+
 @register.filter(name='currency')
 def currency(value, currency_symbol=' so\'m'):
     """ 
     Sonni valyuta formatiga o'tkazadi (masalan, 1234567.89 -> 1 234 567 so'm). 
-    Oxiridagi .00 ni olib tashlaydi.
+    Oxiridagi .00 ni olib tashlaydi. Takroriy qiymatlar keshdan olinadi.
     """
-    if value is None or value == '':
-        return f'0{currency_symbol}'
-    
     try:
-        # Decimal'ga o'tkazamiz va faqat butun qismini olamiz
-        value = Decimal(str(value))
-        integer_part_val = int(value) # Butun sonni olish
-        
-        # Sonni stringga o'tkazish
-        s = str(integer_part_val)
-        
-        # Manfiy sonni aniqlash
-        is_negative = s.startswith('-')
-        if is_negative:
-            s = s[1:]
-            
-        # Har 3 ta raqamdan keyin bo'luvchi qo'shish
-        new_integer_part = ''
-        for i, digit in enumerate(reversed(s)):
-            if i > 0 and i % 3 == 0:
-                new_integer_part += ' '
-            new_integer_part += digit
-            
-        formatted_integer_part = ''.join(reversed(new_integer_part))
-        
-        result = f"{formatted_integer_part}{currency_symbol}"
-        
-        return f"-{result}" if is_negative else result
-        
-    except Exception:
-        # Xatolik yuz bersa, original qiymatni qaytarish
-        return f"{str(value)}{currency_symbol}"
+        return _format_currency_cached(value, currency_symbol)
+    except TypeError:
+        # Hash qilib bo'lmaydigan qiymat — keshsiz
+        return _format_currency(value, currency_symbol)
+
+
+@register.filter(name='currency_many')
+def currency_many(values, currency_symbol=' so\'m'):
+    """
+    Ro'yxatni bir yo'la formatlaydi (masalan, jadval ustuni). Ro'yxat ichidagi
+    takrorlar bir marta hisoblanadi.
+    """
+    seen = {}
+    result = []
+    append = result.append
+    for value in values or ():
+        key = (type(value), value)
+        try:
+            text = seen[key]
+        except KeyError:
+            text = seen[key] = _format_currency(value, currency_symbol)
+        except TypeError:
+            text = _format_currency(value, currency_symbol)
+        append(text)
+    return result
+
+
+class TypeGroup:
+    """ Bitta tur (INCOME/EXPENSE) bo'yicha guruh: qatorlar, soni va jami summa. """
+    __slots__ = ('type', 'label', 'items', 'total')
+
+    def __init__(self, type_name):
+        self.type = type_name
+        self.label = filter_display_name(type_name) if type_name else 'Kategoriyasiz'
+        self.items = []
+        self.total = Decimal('0')
+
+    @property
+    def count(self):
+        return len(self.items)
+
+    def __bool__(self):
+        return bool(self.items)
+
+
+class TypeGroups:
+    """
+    `group_by_type` natijasi. Shablonda ikki xil ishlatiladi:
+    `{% for group in groups %}` (Daromadlar, Xarajatlar tartibida) yoki `groups.EXPENSE.total`.
+    """
+    def __init__(self, groups):
+        self._groups = groups
+
+    def __iter__(self):
+        return iter(self._groups.values())
+
+    def __len__(self):
+        return len(self._groups)
+
+    def __getitem__(self, type_name):
+        return self._groups[type_name]
+
+
+def _row_type_and_amount(row):
+    if isinstance(row, dict):  # .values() qatorlari
+        return row.get('category__type') or '', row.get('amount', row.get('total')) or 0
+    category = row.category
+    return (category.type if category else ''), row.amount or 0
+
 
 @register.filter
-def filter_by_type(queryset, type_name):
-    """ 
-    Tranzaksiya QuerySet'ini category__type bo'yicha filtrlash uchun.
+def group_by_type(transactions):
+    """
+    Tayyor (allaqachon o'qilgan) tranzaksiyalar ro'yxatini bir o'tishda turlarga ajratadi.
+    Bazaga murojaat qilmaydi — kategoriya oldindan yuklangan bo'lishi kerak (select_related).
+    """
+    groups = {type_name: TypeGroup(type_name) for type_name in ('INCOME', 'EXPENSE')}
+    for row in transactions or ():
+        type_name, amount = _row_type_and_amount(row)
+        group = groups.get(type_name)
+        if group is None:
+            group = groups[type_name] = TypeGroup(type_name)
+        group.items.append(row)
+        group.total += amount
+    return TypeGroups(groups)
+
+
+@register.filter
+def filter_by_type(transactions, type_name):
+    """
+    Eski nom: `group_by_type` ustidan. Yangi so'rov yubormaydi — ro'yxat xotirada ajratiladi.
     """
-    if not isinstance(queryset, QuerySet):
-        return []
-        
     if type_name not in ['INCOME', 'EXPENSE']:
-        return queryset 
-        
-    return queryset.filter(category__type=type_name)
+        return list(transactions or ())
+    return group_by_type(transactions)[type_name].items
 
 @register.filter
 def filter_display_name(value):
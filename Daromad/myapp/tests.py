@@ -1,3 +1,1617 @@
-from django.test import TestCase
+import csv
+import datetime
+import io
+import json
+import multiprocessing
+import os
+import pickle
+import tempfile
+import zipfile
+from decimal import Decimal
+from unittest import mock
+from xml.etree import ElementTree
 
-# Create your tests here.
+from dateutil.relativedelta import relativedelta
+from django.core.cache import cache
+from django.core.exceptions import ValidationError
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import CommandError, call_command
+from django.db import IntegrityError, connection, transaction
+from django.db.migrations.executor import MigrationExecutor
+from django.db.migrations.loader import MigrationLoader
+from django.db.models.functions import Mod
+from django.template import Context, Template
+from django.template.backends.django import Template as BackendTemplate
+from django.test import Client, TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from .models import (
+    CustomUser, Category, Transaction, MonthlyCategoryTotal, Budget, BudgetAlert, RecurringSchedule,
+    BUDGET_ALERT_MAX_PERCENT,
+)
+from .admin_tools import EstimatedCountPaginator
+from .benchmarks import BENCHMARKS, CURRENCY_EDGE_CASES, _legacy_currency, time_view
+from .fakedata import generate_fake_data
+from .importers import StatementImporter, ColumnMapping
+from .merging import merge_categories
+from .middleware import _timed_render as timed_render
+from .pagination import keyset_page
+from .projections import project_cash_flow
+from .recurring import RecurringEngine, nearest_run_date, occurrences_between, parse_shard, run_in_workers
+from .rollups import rebuild_rollups
+from .services import get_period_summary, get_main_category_totals, get_budget_overview
+from .management.commands.run_scheduler import Command as SchedulerCommand
+
+
+class PeriodSummaryTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = CustomUser.objects.create_user(
+            username='ali', password='parol12345', first_name='Ali', last_name='Valiyev'
+        )
+        cls.salary = Category.objects.create(user=cls.user, name='Maosh', type='INCOME')
+        cls.food = Category.objects.create(user=cls.user, name='Oziq-ovqat', type='EXPENSE')
+        cls.cafe = Category.objects.create(user=cls.user, name='Kafe', type='EXPENSE', parent=cls.food)
+
+        rows = [
+            (cls.salary, '1000', datetime.date(2025, 10, 5)),
+            (cls.food, '200', datetime.date(2025, 10, 7)),
+            (cls.salary, '1500', datetime.date(2025, 11, 5)),
+            (cls.food, '300', datetime.date(2025, 11, 8)),
+            (cls.cafe, '50', datetime.date(2025, 11, 9)),
+            (None, '999', datetime.date(2025, 9, 1)),
+        ]
+        for category, amount, day in rows:
+            Transaction.objects.create(user=cls.user, category=category, amount=Decimal(amount), date=day)
+
+    def setUp(self):
+        cache.clear()
+
+    def test_summary_is_single_query(self):
+        with self.assertNumQueries(1):
+            summary = get_period_summary(
+                self.user,
+                datetime.date(2025, 11, 1), datetime.date(2025, 11, 30),
+                datetime.date(2025, 10, 1), datetime.date(2025, 10, 31),
+            )
+        self.assertEqual(summary['income'], Decimal('1500'))
+        self.assertEqual(summary['expense'], Decimal('350'))
+        self.assertEqual(summary['prev_income'], Decimal('1000'))
+        self.assertEqual(summary['prev_expense'], Decimal('200'))
+        self.assertEqual(summary['balance_change'], Decimal('350'))
+        # Kategoriyasiz tranzaksiya ham sana chegarasiga kiradi
+        self.assertEqual(summary['min_date'], datetime.date(2025, 9, 1))
+        self.assertEqual(summary['max_date'], datetime.date(2025, 11, 9))
+
+    def test_dashboard_query_count(self):
+        self.client.force_login(self.user)
+        url = reverse('dashboard_select_month', args=[2025, 11])
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        # sessiya + foydalanuvchi + xulosa + kategoriyalar + ro'yxat
+        self.assertLessEqual(len(ctx.captured_queries), 5)
+
+        totals = {item['category__name']: item['total'] for item in response.context['main_category_totals']}
+        self.assertEqual(totals, {'Maosh': Decimal('1500'), 'Oziq-ovqat': Decimal('350')})
+        # Yon panel turlar bo'yicha guruhlangan (`group_by_type`), har biri o'z jami bilan
+        self.assertContains(response, '<span>Daromadlar</span>', html=False)
+        self.assertContains(response, '<span>-350 so&#x27;m</span>', html=False)
+
+
+class MonthlyRollupTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = CustomUser.objects.create_user(
+            username='vali', password='parol12345', first_name='Vali', last_name='Aliyev'
+        )
+        cls.food = Category.objects.create(user=cls.user, name='Oziq-ovqat', type='EXPENSE')
+        cls.rent = Category.objects.create(user=cls.user, name='Ijara', type='EXPENSE')
+
+    def snapshot(self):
+        return sorted(
+            MonthlyCategoryTotal.objects.filter(count__gt=0).values_list(
+                'month', 'category_id', 'type', 'total', 'count'
+            )
+        )
+
+    def assertMatchesRebuild(self):
+        incremental = self.snapshot()
+        rebuild_rollups()
+        self.assertEqual(incremental, self.snapshot())
+
+    def test_create_update_delete(self):
+        tx = Transaction.objects.create(
+            user=self.user, category=self.food, amount=Decimal('100'), date=datetime.date(2025, 3, 10)
+        )
+        Transaction.objects.create(
+            user=self.user, category=self.food, amount=Decimal('40'), date=datetime.date(2025, 3, 12)
+        )
+        row = MonthlyCategoryTotal.objects.get(category=self.food, month=datetime.date(2025, 3, 1))
+        self.assertEqual((row.total, row.count), (Decimal('140'), 2))
+
+        # Boshqa oy va boshqa kategoriyaga ko'chirish
+        tx.date = datetime.date(2025, 4, 2)
+        tx.category = self.rent
+        tx.amount = Decimal('120')
+        tx.save()
+        self.assertMatchesRebuild()
+
+        tx.delete()
+        self.assertMatchesRebuild()
+
+    def test_category_delete_moves_totals_to_uncategorized(self):
+        Transaction.objects.create(
+            user=self.user, category=self.rent, amount=Decimal('500'), date=datetime.date(2025, 5, 1)
+        )
+        self.rent.delete()
+        row = MonthlyCategoryTotal.objects.get(user=self.user, category__isnull=True)
+        self.assertEqual((row.type, row.total, row.count), ('', Decimal('500'), 1))
+        self.assertMatchesRebuild()
+
+    def create_many(self, user, count):
+        Transaction.objects.bulk_create([
+            Transaction(user=user, category=(self.food, self.rent)[i % 2], amount=Decimal(10 + i),
+                        date=datetime.date(2025, 1 + i % 3, 1 + i % 28))
+            for i in range(count)
+        ])
+        rebuild_rollups(user=user)
+
+    def test_queryset_delete_is_set_based(self):
+        budget = Budget.objects.create(
+            user=self.user, category=self.food, amount=Decimal('100'), month=datetime.date(2025, 3, 1)
+        )
+        self.create_many(self.user, 30)
+        with CaptureQueriesContext(connection) as small:
+            Transaction.objects.filter(date__month=3).delete()
+        self.assertMatchesRebuild()
+
+        self.create_many(self.user, 300)
+        with CaptureQueriesContext(connection) as large:
+            deleted, _ = Transaction.objects.filter(user=self.user, date__month=3).delete()
+        self.assertEqual(deleted, 100)
+        self.assertEqual(len(small), len(large))
+        self.assertMatchesRebuild()
+        budget.refresh_from_db()
+        self.assertEqual(budget.spent_total, budget.spent_amount())
+
+    def test_user_cascade_skips_per_row_rollup_work(self):
+        other = CustomUser.objects.create_user(
+            username='gani', password='parol12345', first_name='Gani', last_name='Aliyev'
+        )
+        self.create_many(other, 200)
+        with CaptureQueriesContext(connection) as queries:
+            other.delete()
+        self.assertLess(len(queries), 30)
+        self.assertFalse(MonthlyCategoryTotal.objects.filter(user_id=other.pk).exists())
+
+    def test_budget_spent_amount_reads_rollup(self):
+        Transaction.objects.create(
+            user=self.user, category=self.food, amount=Decimal('250'), date=datetime.date(2025, 6, 3)
+        )
+        budget = Budget.objects.create(
+            user=self.user, category=self.food, amount=Decimal('1000'), month=datetime.date(2025, 6, 1)
+        )
+        with self.assertNumQueries(1):
+            self.assertEqual(budget.spent_amount(), Decimal('250'))
+
+
+class DashboardCacheTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = CustomUser.objects.create_user(
+            username='sardor', password='parol12345', first_name='Sardor', last_name='Karimov'
+        )
+        cls.salary = Category.objects.create(user=cls.user, name='Maosh', type='INCOME')
+        Transaction.objects.create(
+            user=cls.user, category=cls.salary, amount=Decimal('700'), date=datetime.date(2025, 2, 5)
+        )
+
+    def setUp(self):
+        cache.clear()
+        self.client.force_login(self.user)
+        self.url = reverse('dashboard_select_month', args=[2025, 2])
+
+    def test_past_month_served_from_cache(self):
+        with CaptureQueriesContext(connection) as cold:
+            self.client.get(self.url)
+        with CaptureQueriesContext(connection) as warm:
+            response = self.client.get(self.url)
+        # Ikkinchi so'rovda rollup jadvaliga murojaat qilinmaydi
+        self.assertFalse(any('myapp_monthlycategorytotal' in q['sql'] for q in warm.captured_queries))
+        self.assertLess(len(warm.captured_queries), len(cold.captured_queries))
+        self.assertEqual(response.context['total_income'], Decimal('700'))
+
+    def test_write_invalidates_cache(self):
+        self.client.get(self.url)
+        Transaction.objects.create(
+            user=self.user, category=self.salary, amount=Decimal('300'), date=datetime.date(2025, 2, 20)
+        )
+        response = self.client.get(self.url)
+        self.assertEqual(response.context['total_income'], Decimal('1000'))
+
+        self.salary.name = 'Oylik'
+        self.salary.save()
+        response = self.client.get(self.url)
+        self.assertEqual(response.context['main_category_totals'][0]['category__name'], 'Oylik')
+
+
+class RequestTimingMiddlewareTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = CustomUser.objects.create_user(
+            username='jasur', password='parol12345', first_name='Jasur', last_name='Ergashev'
+        )
+        salary = Category.objects.create(user=cls.user, name='Maosh', type='INCOME')
+        Transaction.objects.create(user=cls.user, category=salary, amount=Decimal('700'),
+                                   date=datetime.date(2025, 2, 5))
+
+    def setUp(self):
+        cache.clear()
+        self.client.force_login(self.user)
+        self.url = reverse('dashboard_select_month', args=[2025, 2])
+
+    def server_timing(self, response):
+        metrics = {}
+        for metric in response['Server-Timing'].split(', '):
+            name, *params = metric.split(';')
+            metrics[name] = dict(param.split('=', 1) for param in params)
+        return metrics
+
+    def test_header_and_log_line(self):
+        with CaptureQueriesContext(connection) as queries, self.assertLogs('myapp.timing', 'INFO') as logs:
+            response = self.client.get(self.url)
+        metrics = self.server_timing(response)
+        self.assertEqual(metrics['db']['desc'], f'"SQL ({len(queries)})"')
+        self.assertGreater(float(metrics['tpl']['dur']), 0)
+        self.assertGreaterEqual(float(metrics['total']['dur']), float(metrics['db']['dur']))
+        self.assertIn('view=dashboard_select_month', logs.output[0])
+        self.assertIn(f'queries={len(queries)}', logs.output[0])
+        self.assertEqual(logs.records[0].timing['status'], 200)
+
+    @override_settings(SLOW_REQUEST_THRESHOLD_MS=0)
+    def test_slow_request_dumps_sql(self):
+        with self.assertLogs('myapp.timing', 'WARNING') as logs:
+            self.client.get(self.url)
+        self.assertIn('slow method=GET', logs.output[0])
+        self.assertIn('FROM "django_session"', logs.output[0])
+
+    def test_template_patch_only_active_during_request(self):
+        self.assertIsNot(BackendTemplate.render, timed_render)
+        response = self.client.get(self.url)
+        self.assertGreater(float(self.server_timing(response)['tpl']['dur']), 0)
+        # So'rovdan tashqaridagi render'lar (boshqa testlar, buyruqlar) o'ralmaydi
+        self.assertIsNot(BackendTemplate.render, timed_render)
+
+    def test_streaming_response_logged_after_body(self):
+        Transaction.objects.create(user=self.user, amount=Decimal('5'), date=datetime.date(2025, 2, 6))
+        with self.assertLogs('myapp.timing', 'INFO') as logs:
+            response = self.client.get(reverse('export_transactions'), {'format': 'csv'})
+            self.assertEqual(logs.output, [])
+            with CaptureQueriesContext(connection) as body_queries:
+                # Test klienti tana tugagach response.close() ni o'zi chaqiradi
+                body = b''.join(response.streaming_content)
+        self.assertIn(b'700', body)
+        self.assertTrue(body_queries)
+        header_queries = int(response['Server-Timing'].split('SQL (')[1].split(')')[0])
+        self.assertEqual(logs.records[0].timing['queries'], header_queries + len(body_queries))
+
+    @override_settings(REQUEST_TIMING_ENABLED=False)
+    def test_can_be_disabled(self):
+        self.assertNotIn('Server-Timing', self.client.get(self.url))
+
+
+@override_settings(TRANSACTIONS_PAGE_SIZE=4)
+class KeysetPaginationTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = CustomUser.objects.create_user(
+            username='nodira', password='parol12345', first_name='Nodira', last_name='Yusupova'
+        )
+        cls.food = Category.objects.create(user=cls.user, name='Oziq-ovqat', type='EXPENSE')
+        # Bir xil sanali qatorlar — tartib created_at va id bo'yicha hal qilinadi
+        for i in range(10):
+            Transaction.objects.create(
+                user=cls.user, category=cls.food, amount=Decimal(i + 1),
+                date=datetime.date(2025, 7, 1 + i % 3)
+            )
+
+    def test_pages_cover_all_rows_in_order(self):
+        qs = Transaction.objects.filter(user=self.user)
+        seen, cursor = [], None
+        while True:
+            with self.assertNumQueries(1):
+                rows, cursor = keyset_page(qs, cursor)
+            seen.extend(rows)
+            if cursor is None:
+                break
+        expected = list(qs.order_by('-date', '-created_at', 'id'))
+        self.assertEqual(seen, expected)
+
+    def test_load_more_endpoint(self):
+        self.client.force_login(self.user)
+        response = self.client.get(reverse('transactions_list_partial'), {'year': 2025, 'month': 7})
+        self.assertEqual(len(response.content.decode().split('transaction-card')) - 1, 4)
+        self.assertContains(response, 'load-more-btn')
+
+        more_url = response.content.decode().split('data-url="')[1].split('"')[0].replace('&amp;', '&')
+        response = self.client.get(more_url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.content.decode().split('transaction-card')) - 1, 4)
+
+        response = self.client.get(reverse('transactions_more'), {'year': 2025, 'month': 7, 'cursor': 'xx'})
+        self.assertEqual(response.status_code, 400)
+
+
+class ExportTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = CustomUser.objects.create_user(
+            username='jasur', password='parol12345', first_name='Jasur', last_name='Tursunov'
+        )
+        food = Category.objects.create(user=cls.user, name='Oziq-ovqat', type='EXPENSE')
+        cafe = Category.objects.create(user=cls.user, name='Kafe', type='EXPENSE', parent=food)
+        salary = Category.objects.create(user=cls.user, name='Maosh', type='INCOME')
+        Transaction.objects.create(user=cls.user, category=cafe, amount=Decimal('45.50'),
+                                   date=datetime.date(2025, 8, 2), description='Tushlik & choy')
+        Transaction.objects.create(user=cls.user, category=salary, amount=Decimal('900'),
+                                   date=datetime.date(2025, 8, 10))
+        Transaction.objects.create(user=cls.user, category=salary, amount=Decimal('900'),
+                                   date=datetime.date(2025, 9, 10))
+
+    def setUp(self):
+        self.client.force_login(self.user)
+
+    def test_csv_export_is_streamed_and_filtered(self):
+        response = self.client.get(reverse('export_transactions'), {
+            'format': 'csv', 'start': '2025-08-01', 'end': '2025-08-31',
+        })
+        self.assertTrue(response.streaming)
+        content = b''.join(response.streaming_content).decode('utf-8-sig')
+        rows = list(csv.reader(io.StringIO(content)))
+        self.assertEqual(rows[0][0], 'Sana')
+        self.assertEqual(rows[1][:5], ['2025-08-02', 'Xarajat', 'Oziq-ovqat', 'Kafe', '45.50'])
+        self.assertEqual(len(rows), 3)
+
+    def test_xlsx_export_is_valid_archive(self):
+        response = self.client.get(reverse('export_transactions'), {'format': 'xlsx', 'type': 'INCOME'})
+        archive = zipfile.ZipFile(io.BytesIO(b''.join(response.streaming_content)))
+        self.assertIn('xl/workbook.xml', archive.namelist())
+        sheet = archive.read('xl/worksheets/sheet1.xml').decode()
+        self.assertEqual(sheet.count('<row>'), 3)
+        self.assertNotIn('Kafe', sheet)
+
+    def test_xlsx_strips_xml_illegal_characters(self):
+        Transaction.objects.filter(description='Tushlik & choy').update(description='Tushlik\x01 & choy\x0b')
+        response = self.client.get(reverse('export_transactions'), {'format': 'xlsx', 'type': 'EXPENSE'})
+        archive = zipfile.ZipFile(io.BytesIO(b''.join(response.streaming_content)))
+        root = ElementTree.fromstring(archive.read('xl/worksheets/sheet1.xml'))  # buzilgan XML -> ParseError
+        texts = [node.text for node in root.iter('{http://schemas.openxmlformats.org/spreadsheetml/2006/main}t')]
+        self.assertIn('Tushlik & choy', texts)
+
+    def test_bad_parameters(self):
+        self.assertEqual(self.client.get(reverse('export_transactions'), {'format': 'pdf'}).status_code, 400)
+        self.assertEqual(self.client.get(reverse('export_transactions'), {'start': '2025-13-01'}).status_code, 400)
+
+
+class StatementImportTests(TestCase):
+    CSV = (
+        "Sana;Summa;Izoh;Kategoriya\n"
+        "01.03.2025;-45 000,00;Korzinka;Oziq-ovqat\n"
+        "01.03.2025;-45 000,00;Korzinka;Oziq-ovqat\n"
+        "05.03.2025;5 000 000;Oylik;\n"
+        "xx.03.2025;-10;Xato sana;\n"
+    )
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = CustomUser.objects.create_user(
+            username='dilnoza', password='parol12345', first_name='Dilnoza', last_name='Rahimova'
+        )
+        cls.food = Category.objects.create(user=cls.user, name='Oziq-ovqat', type='EXPENSE')
+        cls.salary = Category.objects.create(user=cls.user, name='Maosh', type='INCOME')
+
+    def make_importer(self):
+        return StatementImporter(
+            self.user,
+            mapping=ColumnMapping(date='Sana', amount='Summa', description='Izoh',
+                                  category='Kategoriya', date_format='%d.%m.%Y'),
+            income_category=self.salary,
+            batch_size=2,
+            delimiter=';',
+        )
+
+    def test_import_batches_and_skips_duplicates(self):
+        batches = []
+        report = self.make_importer().import_file(io.StringIO(self.CSV), progress=batches.append)
+        # Bir xil ikkita xarid — ikkalasi ham qo'shiladi
+        self.assertEqual(report.created, 3)
+        self.assertEqual([line for line, _ in report.errors], [5])
+        self.assertEqual(len(batches), 2)
+        self.assertEqual(Transaction.objects.filter(category=self.food).count(), 2)
+        self.assertEqual(
+            Transaction.objects.get(category=self.salary).amount, Decimal('5000000')
+        )
+
+        # Qayta import — hammasi dublikat
+        report = self.make_importer().import_file(io.StringIO(self.CSV))
+        self.assertEqual((report.created, report.duplicates), (0, 3))
+
+        # Rollup bulk_create'dan keyin ham to'g'ri
+        row = MonthlyCategoryTotal.objects.get(category=self.food)
+        self.assertEqual((row.total, row.count), (Decimal('90000'), 2))
+
+    def test_bad_amounts_and_missing_category_are_line_errors(self):
+        csv_text = (
+            "Sana;Summa;Izoh;Kategoriya\n"
+            "01.03.2025;1e30;Juda katta;\n"
+            "01.03.2025;123456789012345678901;20+ raqam;\n"
+            "01.03.2025;0.001;Yaxlitlanganda nol;\n"
+            "01.03.2025;-1e-5;Yaxlitlanganda nol;\n"
+            "02.03.2025;-300;Kategoriyasiz xarajat;Noma'lum\n"
+            "03.03.2025;12 345 678 901,25;Katta, lekin sig'adi;\n"
+        )
+        report = self.make_importer().import_file(io.StringIO(csv_text))
+        self.assertEqual([line for line, _ in report.errors], [2, 3, 4, 5, 6])
+        self.assertEqual(report.errors[0][1], "Noto‘g‘ri summa")
+        self.assertEqual(report.errors[2][1], "Summa nolga teng")
+        self.assertEqual(list(Transaction.objects.values_list('category', 'amount')),
+                         [(self.salary.pk, Decimal('12345678901.25'))])
+
+    def test_command_rejects_other_users_category(self):
+        stranger = CustomUser.objects.create_user(
+            username='begona', password='parol12345', first_name='Begona', last_name='Foydalanuvchi'
+        )
+        private = Category.objects.create(user=stranger, name='Shaxsiy', type='EXPENSE')
+        with tempfile.NamedTemporaryFile('w', suffix='.csv', delete=False, encoding='utf-8') as handle:
+            handle.write(self.CSV)
+        self.addCleanup(os.remove, handle.name)
+        with self.assertRaisesMessage(CommandError, 'Kategoriya topilmadi'):
+            call_command('import_statement', self.user.username, handle.name, '--expense-category', str(private.pk),
+                         stdout=io.StringIO())
+        call_command('import_statement', self.user.username, handle.name, '--delimiter', ';',
+                     '--date-column', 'Sana', '--amount-column', 'Summa', '--description-column', 'Izoh',
+                     '--category-column', 'Kategoriya', '--income-category', str(self.salary.pk),
+                     stdout=io.StringIO())
+        self.assertEqual(Transaction.objects.filter(user=self.user).count(), 3)
+
+    def test_sustained_conflict_is_reported_as_batch_error(self):
+        self.make_importer().import_file(io.StringIO(self.CSV))
+        importer = self.make_importer()
+        importer._existing_hashes = lambda hashes: set()  # har urinishda to'qnashuv
+        report = importer.import_file(io.StringIO(self.CSV))
+        self.assertEqual(report.created, 0)
+        self.assertIn("Partiyani yozib bo‘lmadi (qatorlar 2–3)", report.errors[0][1])
+        row = MonthlyCategoryTotal.objects.get(category=self.food)
+        self.assertEqual((row.total, row.count), (Decimal('90000'), 2))
+
+    def test_malformed_file_is_reported_not_raised(self):
+        # csv.Error: juda uzun maydon (eski Python'larda NUL bayt ham)
+        broken = self.CSV.replace("Oylik", "x" * (csv.field_size_limit() + 1))
+        report = self.make_importer().import_file(io.StringIO(broken))
+        self.assertEqual(report.created, 2)  # buzilgan qatorgacha o'qilganlari yoziladi
+        self.assertEqual(report.errors[0][0], 4)
+        self.assertIn("Faylni o‘qib bo‘lmadi", report.errors[0][1])
+
+        self.client.force_login(self.user)
+        upload = SimpleUploadedFile('kochirma.csv', broken.encode('utf-8'), content_type='text/csv')
+        response = self.client.post(reverse('import_transactions'), {
+            'file': upload, 'date_column': 'Sana', 'amount_column': 'Summa',
+            'date_format': '%d.%m.%Y', 'delimiter': ';', 'income_category': self.salary.pk,
+        })
+        self.assertEqual(response.status_code, 200)
+
+    def test_concurrent_import_counts_conflicts_as_duplicates(self):
+        # Parallel import oldindan tekshiruvdan keyin, lekin bulk_create'dan oldin yozib ulgurdi
+        self.make_importer().import_file(io.StringIO(self.CSV))
+        importer = self.make_importer()
+        real = importer._existing_hashes
+        calls = []
+
+        def racing(hashes):
+            calls.append(hashes)
+            return set() if len(calls) == 1 else real(hashes)
+
+        importer._existing_hashes = racing
+        report = importer.import_file(io.StringIO(self.CSV))
+        self.assertEqual((report.created, report.duplicates), (0, 3))
+        self.assertEqual(len(calls), 3)  # 1-partiya qayta urinish bilan, 2-partiya bir marta
+        row = MonthlyCategoryTotal.objects.get(category=self.food)
+        self.assertEqual((row.total, row.count), (Decimal('90000'), 2))
+
+    def test_import_view(self):
+        self.client.force_login(self.user)
+        upload = SimpleUploadedFile('kochirma.csv', self.CSV.encode('utf-8'), content_type='text/csv')
+        response = self.client.post(reverse('import_transactions'), {
+            'file': upload, 'date_column': 'Sana', 'amount_column': 'Summa',
+            'description_column': 'Izoh', 'category_column': 'Kategoriya',
+            'date_format': '%d.%m.%Y', 'delimiter': ';', 'income_category': self.salary.pk,
+        })
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.context['report'].created, 3)
+
+
+class ConditionalTransactionsListTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = CustomUser.objects.create_user(
+            username='malika', password='parol12345', first_name='Malika', last_name='Saidova'
+        )
+        cls.food = Category.objects.create(user=cls.user, name='Oziq-ovqat', type='EXPENSE')
+        Transaction.objects.create(user=cls.user, category=cls.food, amount=Decimal('10'),
+                                   date=datetime.date(2025, 4, 4))
+
+    def setUp(self):
+        cache.clear()
+        self.client.force_login(self.user)
+        self.url = reverse('transactions_list_partial')
+        self.params = {'year': 2025, 'month': 4, 'type': 'EXPENSE'}
+
+    def transaction_queries(self, ctx):
+        return [q for q in ctx.captured_queries if 'myapp_transaction' in q['sql']]
+
+    def test_not_modified_without_touching_transactions(self):
+        response = self.client.get(self.url, self.params)
+        etag = response['ETag']
+        self.assertTrue(response.has_header('Last-Modified'))
+
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get(self.url, self.params, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(self.transaction_queries(ctx), [])
+
+        # Shartsiz so'rov ham serverdagi fragment keshidan beriladi
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get(self.url, self.params)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.transaction_queries(ctx), [])
+
+    def test_changes_produce_new_etag(self):
+        etag = self.client.get(self.url, self.params)['ETag']
+
+        tx = Transaction.objects.get(user=self.user)
+        tx.description = 'Non'
+        tx.save()
+        response = self.client.get(self.url, self.params, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, 'Non')
+
+        etag = response['ETag']
+        self.food.name = 'Ovqat'
+        self.food.save()
+        response = self.client.get(self.url, self.params, HTTP_IF_NONE_MATCH=etag)
+        self.assertContains(response, 'Ovqat')
+
+
+class CategoryCatalogueTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = CustomUser.objects.create_user(
+            username='bekzod', password='parol12345', first_name='Bekzod', last_name='Ergashev'
+        )
+        cls.food = Category.objects.create(user=cls.user, name='Oziq-ovqat', type='EXPENSE')
+        Category.objects.create(name='Transport', type='EXPENSE')  # global
+
+    def setUp(self):
+        cache.clear()
+        self.client.force_login(self.user)
+
+    def test_catalogue_json_and_etag(self):
+        response = self.client.get(reverse('category_catalogue'))
+        data = response.json()
+        self.assertEqual({c['name'] for c in data}, {'Oziq-ovqat', 'Transport'})
+        food = next(c for c in data if c['name'] == 'Oziq-ovqat')
+        self.assertEqual(food['icon'], 'fas fa-shopping-basket')
+        self.assertTrue(food['user_owned'])
+
+        etag = response['ETag']
+        with self.assertNumQueries(2):  # faqat sessiya va foydalanuvchi
+            response = self.client.get(reverse('category_catalogue'), HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+
+        Category.objects.create(user=self.user, name='Kafe', type='EXPENSE', parent=self.food)
+        response = self.client.get(reverse('category_catalogue'), HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('Kafe', {c['name'] for c in response.json()})
+
+    def test_forms_link_versioned_catalogue(self):
+        response = self.client.get(reverse('add_transaction'))
+        url = response.context['categories_url']
+        self.assertNotContains(response, 'data-categories')
+        response = self.client.get(url)
+        self.assertIn('immutable', response['Cache-Control'])
+        self.assertEqual(self.client.get(reverse('add_category')).context['categories_url'], url)
+
+
+class CategoryTreeTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = CustomUser.objects.create_user(
+            username='nodira', password='parol12345', first_name='Nodira', last_name='Yusupova'
+        )
+        cls.food = Category.objects.create(user=cls.user, name='Oziq-ovqat', type='EXPENSE')
+        cls.cafe = Category.objects.create(user=cls.user, name='Kafe', type='EXPENSE', parent=cls.food)
+        cls.coffee = Category.objects.create(user=cls.user, name='Qahva', type='EXPENSE', parent=cls.cafe)
+        cls.leisure = Category.objects.create(user=cls.user, name="Ko'ngilochar", type='EXPENSE')
+
+    def test_paths_are_materialized(self):
+        self.coffee.refresh_from_db()
+        self.assertEqual(self.coffee.path, f"/{self.food.pk}/{self.cafe.pk}/{self.coffee.pk}/")
+        self.assertEqual(self.coffee.get_full_path(), 'Oziq-ovqat > Kafe > Qahva')
+        self.assertEqual(self.coffee.root_id, self.food.pk)
+        self.assertEqual(self.coffee.depth, 2)
+        self.assertEqual(set(self.food.get_descendants()), {self.food, self.cafe, self.coffee})
+
+    def test_move_and_rename_update_descendants(self):
+        self.cafe.parent = self.leisure
+        self.cafe.name = 'Kafe va restoran'
+        self.cafe.save()
+        self.coffee.refresh_from_db()
+        self.assertEqual(self.coffee.path, f"/{self.leisure.pk}/{self.cafe.pk}/{self.coffee.pk}/")
+        self.assertEqual(self.coffee.full_path, "Ko'ngilochar > Kafe va restoran > Qahva")
+        self.assertEqual(self.coffee.root_id, self.leisure.pk)
+
+        self.cafe.parent = None
+        self.cafe.save()
+        self.coffee.refresh_from_db()
+        self.assertEqual(self.coffee.root_id, self.cafe.pk)
+        self.assertEqual(self.coffee.depth, 1)
+
+    def test_cannot_move_under_own_descendant(self):
+        self.food.parent = self.coffee
+        with self.assertRaises(ValidationError):
+            self.food.save()
+
+    def test_totals_roll_up_to_root_at_any_depth(self):
+        day = datetime.date(2025, 3, 10)
+        Transaction.objects.create(user=self.user, amount=Decimal('100'), category=self.coffee, date=day)
+        Transaction.objects.create(user=self.user, amount=Decimal('50'), category=self.food, date=day)
+        tx = Transaction.objects.select_related('category').get(category=self.coffee)
+        self.assertIn('Oziq-ovqat > Kafe > Qahva', str(tx))
+
+        with self.assertNumQueries(1):
+            totals = get_main_category_totals(Transaction.objects.filter(user=self.user))
+        self.assertEqual(totals, [
+            {'category__name': 'Oziq-ovqat', 'category__type': 'EXPENSE', 'total': Decimal('150.00')},
+        ])
+
+
+class MergeCategoriesTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = CustomUser.objects.create_user(
+            username='bekzod', password='parol12345', first_name='Bekzod', last_name='Tursunov'
+        )
+        cls.june, cls.july = datetime.date(2025, 6, 1), datetime.date(2025, 7, 1)
+
+    def setUp(self):
+        self.source = Category.objects.create(user=self.user, name='Oziq', type='EXPENSE')
+        self.source_cafe = Category.objects.create(user=self.user, name='Kafe', type='EXPENSE', parent=self.source)
+        self.bread = Category.objects.create(user=self.user, name='Non', type='EXPENSE', parent=self.source)
+        self.target = Category.objects.create(user=self.user, name='Ovqat', type='EXPENSE')
+        self.target_cafe = Category.objects.create(user=self.user, name='Kafe', type='EXPENSE', parent=self.target)
+        for amount, category, date in (
+            (100, self.source, datetime.date(2025, 6, 3)), (200, self.source, datetime.date(2025, 7, 3)),
+            (40, self.source_cafe, datetime.date(2025, 6, 4)), (5, self.bread, datetime.date(2025, 6, 5)),
+            (70, self.target, datetime.date(2025, 6, 6)), (30, self.target_cafe, datetime.date(2025, 6, 7)),
+        ):
+            Transaction.objects.create(user=self.user, amount=Decimal(amount), category=category, date=date)
+        self.june_budget = Budget.objects.create(user=self.user, category=self.target, amount=Decimal('500'), month=self.june)
+        Budget.objects.create(user=self.user, category=self.source, amount=Decimal('300'), month=self.june)
+        Budget.objects.create(user=self.user, category=self.source, amount=Decimal('250'), month=self.july)
+        RecurringSchedule.objects.create(user=self.user, category=self.source, amount=Decimal('10'),
+                                         day_of_month=1, start_date=self.june)
+
+    def rollup_snapshot(self):
+        return sorted(MonthlyCategoryTotal.objects.values_list('month', 'category_id', 'type', 'total', 'count'))
+
+    def test_merge_moves_everything_and_keeps_rollups_consistent(self):
+        report = merge_categories(self.source, self.target)
+        self.assertEqual((report.transactions, report.schedules, report.budgets, report.subcategories), (2, 1, 2, 2))
+        self.assertFalse(Category.objects.filter(pk__in=[self.source.pk, self.source_cafe.pk]).exists())
+        self.assertEqual(Transaction.objects.filter(category=self.target).count(), 3)
+        self.assertEqual(Transaction.objects.filter(category=self.target_cafe).count(), 2)
+        self.bread.refresh_from_db()
+        self.assertEqual(self.bread.full_path, 'Ovqat > Non')
+        self.assertEqual(RecurringSchedule.objects.get().category, self.target)
+
+        merged = self.rollup_snapshot()
+        rebuild_rollups()
+        self.assertEqual(merged, self.rollup_snapshot())
+
+        budgets = {b.month: b for b in Budget.objects.filter(user=self.user)}
+        self.assertEqual(len(budgets), 2)
+        self.assertEqual(budgets[self.june].amount, Decimal('800'))
+        self.assertEqual(budgets[self.june].spent_total, Decimal('245'))  # 100 + 40 + 5 + 70 + 30
+        self.assertEqual(budgets[self.july].spent_total, Decimal('200'))
+
+    def test_query_count_independent_of_transaction_count(self):
+        other = Category.objects.create(user=self.user, name='Boshqa', type='EXPENSE')
+        with CaptureQueriesContext(connection) as few:
+            merge_categories(other, self.target, delete_source=False)
+        Transaction.objects.bulk_create(
+            Transaction(user=self.user, amount=Decimal('1'), category=other, date=datetime.date(2025, 6, 9))
+            for _ in range(500)
+        )
+        rebuild_rollups()
+        with CaptureQueriesContext(connection) as many:
+            report = merge_categories(other, self.target, delete_source=False)
+        self.assertEqual(report.transactions, 500)
+        self.assertLessEqual(len(many), len(few) + 4, [q['sql'] for q in many.captured_queries])
+        self.assertTrue(Category.objects.filter(pk=other.pk).exists())
+
+    def test_invalid_merges_are_rejected(self):
+        income = Category.objects.create(user=self.user, name='Maosh', type='INCOME')
+        for source, target in ((self.source, income), (self.source, self.bread), (self.source, self.source)):
+            with self.assertRaises(ValidationError):
+                merge_categories(source, target)
+        self.assertEqual(Transaction.objects.filter(category=self.source).count(), 2)
+
+    def test_delete_conflict_offers_merge_view(self):
+        self.client.force_login(self.user)
+        response = self.client.delete(reverse('category_delete', args=[self.source.pk]))
+        self.assertEqual(response.status_code, 409)
+        merge_url = response.json()['merge_url']
+        response = self.client.post(merge_url, {'target': self.target.pk})
+        self.assertEqual(response.json()['transactions'], 2)
+        self.assertFalse(Category.objects.filter(pk=self.source.pk).exists())
+
+    def test_command(self):
+        out = io.StringIO()
+        call_command('merge_categories', self.bread.pk, self.target.pk, '--keep-source', stdout=out)
+        self.assertIn('1 ta tranzaksiya', out.getvalue())
+        self.assertTrue(Category.objects.filter(pk=self.bread.pk).exists())
+
+
+class TypeGroupingFilterTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = CustomUser.objects.create_user(
+            username='lola', password='parol12345', first_name='Lola', last_name='Karimova'
+        )
+        salary = Category.objects.create(user=cls.user, name='Maosh', type='INCOME')
+        food = Category.objects.create(user=cls.user, name='Oziq-ovqat', type='EXPENSE')
+        day = datetime.date(2025, 4, 2)
+        for amount, category in ((1000, salary), (120, food), (30, food), (15, None)):
+            Transaction.objects.create(user=cls.user, amount=Decimal(amount), category=category, date=day)
+
+    def test_groups_evaluated_list_without_queries(self):
+        transactions = list(Transaction.objects.select_related('category').order_by('pk'))
+        template = Template(
+            "{% load custom_filters %}{% with groups=transactions|group_by_type %}"
+            "{% for group in groups %}{{ group.label }}:{{ group.count }}:{{ group.total }};{% endfor %}"
+            "|{{ groups.EXPENSE.items.0.amount }}{% endwith %}"
+            "|{{ transactions|filter_by_type:'INCOME'|length }}"
+        )
+        with self.assertNumQueries(0):
+            html = template.render(Context({'transactions': transactions}))
+        self.assertEqual(html, "Daromadlar:1:1000.00;Xarajatlar:2:150.00;Kategoriyasiz:1:15.00;|120.00|1")
+
+    def test_currency_matches_previous_output(self):
+        from .templatetags.custom_filters import currency, currency_many
+
+        for value in CURRENCY_EDGE_CASES:
+            self.assertEqual(currency(value), _legacy_currency(value), value)
+            self.assertEqual(currency(value, ''), _legacy_currency(value, ''), value)
+        self.assertEqual(currency(Decimal('-1234567.89')), "-1 234 567 so'm")
+        self.assertEqual(currency_many([Decimal('1000'), 1000, True, [1]]),
+                         ["1 000 so'm", "1 000 so'm", "True so'm", "[1] so'm"])
+
+    def test_currency_benchmark_suite(self):
+        result = BENCHMARKS['currency'](rows=500, distinct=50)
+        self.assertEqual(result['rows'], 500)
+
+
+class RecurringEngineTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = CustomUser.objects.create_user(
+            username='sardor', password='parol12345', first_name='Sardor', last_name='Qodirov'
+        )
+        cls.rent = Category.objects.create(user=cls.user, name='Ijara', type='EXPENSE')
+        cls.salary = Category.objects.create(user=cls.user, name='Maosh', type='INCOME')
+        cls.today = datetime.date(2025, 4, 10)
+        for amount, category in ((Decimal('3000000'), cls.rent), (Decimal('9000000'), cls.salary)):
+            RecurringSchedule.objects.create(
+                user=cls.user, category=category, amount=amount,
+                day_of_month=10, start_date=datetime.date(2025, 1, 1),
+            )
+        RecurringSchedule.objects.create(  # boshqa kun — bajarilmaydi
+            user=cls.user, category=cls.rent, amount=Decimal('1'),
+            day_of_month=11, start_date=datetime.date(2025, 1, 1),
+        )
+
+    def test_run_is_batched_and_idempotent(self):
+        report = RecurringEngine(today=self.today, chunk_size=1).run()
+        self.assertEqual((report.selected, report.created, report.chunks), (2, 2, 2))
+        self.assertEqual(Transaction.objects.filter(is_automated=True, date=self.today).count(), 2)
+        self.assertFalse(RecurringSchedule.objects.filter(day_of_month=10).exclude(last_executed=self.today).exists())
+        rollup = MonthlyCategoryTotal.objects.get(category=self.salary, month=datetime.date(2025, 4, 1))
+        self.assertEqual((rollup.total, rollup.count), (Decimal('9000000.00'), 1))
+
+        # Qayta ishga tushirish (last_executed qo'lda tozalangan bo'lsa ham) dublikat yaratmaydi
+        RecurringSchedule.objects.update(last_executed=None, next_run_date=self.today)
+        report = RecurringEngine(today=self.today).run()
+        self.assertEqual((report.created, report.skipped), (0, 2))
+        self.assertEqual(Transaction.objects.filter(is_automated=True).count(), 2)
+
+    def test_constraint_rejects_second_posting(self):
+        schedule = RecurringSchedule.objects.filter(day_of_month=10).first()
+        Transaction.objects.create(user=self.user, amount=1, category=self.rent, date=self.today,
+                                   recurring_schedule=schedule)
+        with self.assertRaises(IntegrityError), transaction.atomic():
+            Transaction.objects.create(user=self.user, amount=1, category=self.rent, date=self.today,
+                                       recurring_schedule=schedule)
+
+    def test_command_reports_throughput(self):
+        out = io.StringIO()
+        call_command('process_recurring', date=self.today.isoformat(), stdout=out)
+        self.assertIn('2 ta yaratildi', out.getvalue())
+        self.assertIn('tranzaksiya/s', out.getvalue())
+
+
+class RecurringCatchUpTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = CustomUser.objects.create_user(
+            username='malika', password='parol12345', first_name='Malika', last_name='Karimova'
+        )
+        cls.rent = Category.objects.create(user=cls.user, name='Ijara', type='EXPENSE')
+        cls.schedule = RecurringSchedule.objects.create(
+            user=cls.user, category=cls.rent, amount=Decimal('100'),
+            day_of_month=30, start_date=datetime.date(2024, 12, 1),
+            last_executed=datetime.date(2024, 12, 30),
+        )
+
+    def test_occurrences_clamp_to_month_end(self):
+        self.assertEqual(occurrences_between(30, datetime.date(2025, 1, 31), datetime.date(2025, 4, 29)), [
+            datetime.date(2025, 2, 28), datetime.date(2025, 3, 30),
+        ])
+        self.assertEqual(occurrences_between(30, datetime.date(2024, 2, 1), datetime.date(2024, 2, 29)),
+                         [datetime.date(2024, 2, 29)])
+
+    def test_catch_up_materializes_missed_months(self):
+        report = RecurringEngine(today=datetime.date(2025, 4, 15), catch_up=True).run()
+        self.assertEqual(report.created, 3)
+        self.assertEqual(
+            list(Transaction.objects.filter(recurring_schedule=self.schedule).order_by('date').values_list('date', flat=True)),
+            [datetime.date(2025, 1, 30), datetime.date(2025, 2, 28), datetime.date(2025, 3, 30)],
+        )
+        self.schedule.refresh_from_db()
+        self.assertEqual(self.schedule.last_executed, datetime.date(2025, 3, 30))
+        self.assertEqual(MonthlyCategoryTotal.objects.filter(category=self.rent, count=1).count(), 3)
+
+        # Takroriy ishga tushirish hech narsa qo'shmaydi
+        self.assertEqual(RecurringEngine(today=datetime.date(2025, 4, 15), catch_up=True).run().created, 0)
+
+    def test_catch_up_respects_end_date(self):
+        RecurringSchedule.objects.filter(pk=self.schedule.pk).update(end_date=datetime.date(2025, 2, 1))
+        report = RecurringEngine(today=datetime.date(2025, 6, 1), catch_up=True).run()
+        self.assertEqual(report.created, 1)
+
+    def test_daily_run_fires_short_month_schedules_on_last_day(self):
+        report = RecurringEngine(today=datetime.date(2025, 2, 28)).run()
+        self.assertEqual(report.created, 1)
+
+
+class RecurringShardTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.today = datetime.date(2025, 5, 5)
+        for index in range(4):
+            user = CustomUser.objects.create_user(
+                username=f'shard{index}', password='parol12345', first_name='Test', last_name='Shard'
+            )
+            category = Category.objects.create(user=user, name='Ijara', type='EXPENSE')
+            RecurringSchedule.objects.create(
+                user=user, category=category, amount=Decimal('10'),
+                day_of_month=5, start_date=datetime.date(2025, 1, 1),
+            )
+
+    def test_parse_shard(self):
+        self.assertEqual(parse_shard('1/4'), (1, 4))
+        for value in ('4/4', '1', 'a/b', '0/0'):
+            with self.assertRaises(ValueError):
+                parse_shard(value)
+
+    def test_shards_partition_schedules_without_double_posting(self):
+        reports = [RecurringEngine(today=self.today, shard=(index, 3)).run() for index in range(3)]
+        self.assertEqual(sum(report.created for report in reports), 4)
+        # Ikkinchi "jarayon" xuddi shu shard'larni qayta olsa — hammasi allaqachon bajarilgan
+        again = [RecurringEngine(today=self.today, shard=(index, 3)).run() for index in range(3)]
+        self.assertEqual(sum(report.selected for report in again), 0)
+        self.assertEqual(Transaction.objects.filter(is_automated=True).count(), 4)
+
+    def test_run_in_workers_partitions_by_user_and_merges_reports(self):
+        class InProcessExecutor:
+            """ ProcessPoolExecutor o'rnida: vazifa va natija pickle orqali o'tadi, baza esa test tranzaksiyasida. """
+            def __init__(self, max_workers):
+                self.max_workers = max_workers
+
+            def __enter__(self):
+                return self
+
+            def __exit__(self, *exc):
+                return False
+
+            def map(self, func, jobs):
+                return [pickle.loads(pickle.dumps(func(pickle.loads(pickle.dumps(job))))) for job in jobs]
+
+        # Test bazasi boshqa jarayonlarga ko'rinmaydi va ulanish yopilmasligi kerak
+        with mock.patch('myapp.recurring.ProcessPoolExecutor', InProcessExecutor), \
+                mock.patch('myapp.recurring.connections'):
+            reports = run_in_workers(2, today=self.today, chunk_size=1)
+            again = run_in_workers(2, today=self.today)
+
+        self.assertEqual([report.shard for report in reports], [(0, 2), (1, 2)])
+        for index, report in enumerate(reports):
+            posted = Transaction.objects.filter(is_automated=True, user_id__in=[
+                pk for pk in CustomUser.objects.filter(username__startswith='shard').values_list('pk', flat=True)
+                if pk % 2 == index
+            ])
+            self.assertEqual(report.created, posted.count())
+        self.assertEqual([report.created for report in reports], [2, 2])  # ketma-ket 4 ta user_id
+        self.assertEqual(sum(report.selected for report in again), 0)
+        self.assertEqual(
+            Transaction.objects.filter(is_automated=True).values('recurring_schedule_id').distinct().count(), 4
+        )
+
+        # Buyruq har bir shard hisobotini alohida chiqaradi
+        out = io.StringIO()
+        with mock.patch('myapp.management.commands.process_recurring.run_in_workers',
+                        return_value=reports) as runner:
+            call_command('process_recurring', '--workers', '2', stdout=out)
+        self.assertEqual(runner.call_args.args, (2,))
+        self.assertIn('[shard 0/2]', out.getvalue())
+        self.assertIn('[shard 1/2]', out.getvalue())
+
+    def test_claim_rechecks_schedules_already_run(self):
+        engine = RecurringEngine(today=self.today)
+        ids = list(engine.due_schedules().values_list('pk', flat=True))
+        RecurringSchedule.objects.filter(pk=ids[0]).update(last_executed=self.today)  # boshqa jarayon bajardi
+        report = engine.run()
+        self.assertEqual((report.selected, report.created), (3, 3))
+
+
+class RecurringWorkerProcessTests(TransactionTestCase):
+    """ `run_in_workers` haqiqiy jarayonlar va haqiqiy (faylli) baza bilan. """
+
+    def setUp(self):
+        if connection.vendor == 'sqlite' and connection.is_in_memory_db():
+            self.skipTest("Xotiradagi SQLite bazasi boshqa jarayonlarga ko'rinmaydi")
+        if multiprocessing.get_start_method() != 'fork':
+            self.skipTest("Bolalar jarayoni test bazasi sozlamalarini fork orqali oladi")
+        self.today = datetime.date(2025, 5, 5)
+        for index in range(6):
+            user = CustomUser.objects.create_user(
+                username=f'worker{index}', password='parol12345', first_name='Test', last_name='Worker'
+            )
+            category = Category.objects.create(user=user, name='Ijara', type='EXPENSE')
+            for day in (5, 5):
+                RecurringSchedule.objects.create(
+                    user=user, category=category, amount=Decimal('10'),
+                    day_of_month=day, start_date=datetime.date(2025, 1, 1),
+                )
+
+    def test_each_schedule_posted_exactly_once(self):
+        reports = run_in_workers(3, today=self.today, chunk_size=2)
+        self.assertEqual([report.shard for report in reports], [(0, 3), (1, 3), (2, 3)])
+        self.assertEqual([report.failed for report in reports], [[], [], []])
+        self.assertEqual(sum(report.created for report in reports), 12)
+        for index, report in enumerate(reports):
+            self.assertEqual(report.created, Transaction.objects.filter(is_automated=True).alias(
+                shard=Mod('user_id', 3)
+            ).filter(shard=index).count())
+
+        posted = Transaction.objects.filter(is_automated=True).values('recurring_schedule_id')
+        self.assertEqual(posted.count(), 12)
+        self.assertEqual(posted.distinct().count(), RecurringSchedule.objects.count())
+        self.assertFalse(RecurringSchedule.objects.exclude(last_executed=self.today).exists())
+
+        again = run_in_workers(3, today=self.today)
+        self.assertEqual(sum(report.selected for report in again), 0)
+        self.assertEqual(Transaction.objects.filter(is_automated=True).count(), 12)
+
+
+class RecurringUniqueMigrationTests(TransactionTestCase):
+    """ 0010 migratsiyasi mavjud dublikatlarni cheklovdan oldin tozalaydi. """
+
+    def migrate(self, target):
+        executor = MigrationExecutor(connection)
+        executor.loader.build_graph()
+        executor.migrate([('myapp', target)])
+        return executor.loader.project_state([('myapp', target)]).apps
+
+    def tearDown(self):
+        self.migrate(MigrationLoader(connection).graph.leaf_nodes('myapp')[0][1])
+
+    def test_duplicate_postings_are_removed_before_constraint(self):
+        apps = self.migrate('0009_category_materialized_path')
+        User = apps.get_model('myapp', 'CustomUser')
+        Category = apps.get_model('myapp', 'Category')
+        Schedule = apps.get_model('myapp', 'RecurringSchedule')
+        Tx = apps.get_model('myapp', 'Transaction')
+        Rollup = apps.get_model('myapp', 'MonthlyCategoryTotal')
+
+        user = User.objects.create(username='dublikat', first_name='D', last_name='D')
+        rent = Category.objects.create(user=user, name='Ijara', type='EXPENSE', path='/x/', full_path='Ijara')
+        schedule = Schedule.objects.create(user=user, category=rent, amount=Decimal('100'), day_of_month=5,
+                                           start_date=datetime.date(2025, 1, 1))
+        day = datetime.date(2025, 3, 5)
+        first = Tx.objects.create(user=user, category=rent, amount=Decimal('100'), date=day, recurring_schedule=schedule)
+        for _ in range(2):
+            Tx.objects.create(user=user, category=rent, amount=Decimal('100'), date=day, recurring_schedule=schedule)
+        Tx.objects.create(user=user, category=rent, amount=Decimal('100'), date=day.replace(month=4),
+                          recurring_schedule=schedule)
+        Rollup.objects.create(user=user, category=rent, type='EXPENSE', month=day.replace(day=1),
+                              total=Decimal('300'), count=3)
+
+        apps = self.migrate('0010_transaction_recurring_unique')
+        Tx = apps.get_model('myapp', 'Transaction')
+        Rollup = apps.get_model('myapp', 'MonthlyCategoryTotal')
+        self.assertEqual(sorted(Tx.objects.values_list('date', flat=True)), [day, day.replace(month=4)])
+        self.assertTrue(Tx.objects.filter(pk=first.pk).exists())
+        row = Rollup.objects.get(month=day.replace(day=1))
+        self.assertEqual((row.total, row.count), (Decimal('100'), 1))
+
+
+class RecurringNextRunDateTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = CustomUser.objects.create_user(
+            username='jasur', password='parol12345', first_name='Jasur', last_name='Aliyev'
+        )
+        cls.rent = Category.objects.create(user=cls.user, name='Ijara', type='EXPENSE')
+
+    def make_schedule(self, **kwargs):
+        values = {'user': self.user, 'category': self.rent, 'amount': Decimal('10'),
+                  'day_of_month': 30, 'start_date': datetime.date(2025, 1, 31)}
+        values.update(kwargs)
+        return RecurringSchedule.objects.create(**values)
+
+    def test_next_run_date_kept_current_on_save(self):
+        schedule = self.make_schedule()
+        self.assertEqual(schedule.next_run_date, datetime.date(2025, 2, 28))
+        schedule.last_executed = datetime.date(2025, 2, 28)
+        schedule.save()
+        self.assertEqual(schedule.next_run_date, datetime.date(2025, 3, 30))
+        schedule.end_date = datetime.date(2025, 3, 15)
+        schedule.save()
+        self.assertIsNone(schedule.next_run_date)
+
+    def test_execution_advances_next_run_date(self):
+        schedule = self.make_schedule()
+        self.make_schedule(start_date=datetime.date(2025, 3, 1))  # hali muddati kelmagan
+        with CaptureQueriesContext(connection) as ctx:
+            report = RecurringEngine(today=datetime.date(2025, 2, 28)).run()
+        self.assertEqual(report.created, 1)
+        self.assertIn('next_run_date', ctx.captured_queries[0]['sql'])
+        schedule.refresh_from_db()
+        self.assertEqual(schedule.next_run_date, datetime.date(2025, 3, 30))
+        self.assertEqual(nearest_run_date(), datetime.date(2025, 3, 30))
+
+    def test_scheduler_tick(self):
+        # serve() bazaga alohida oqimdan murojaat qiladi (test tranzaksiyasini ko'rmaydi),
+        # shuning uchun bitta qadam to'g'ridan-to'g'ri tekshiriladi; close_old_connections
+        # test tranzaksiyasi ichidagi ulanishni yopib qo'ymasligi kerak
+        self.make_schedule(start_date=datetime.date(2024, 11, 1), day_of_month=5)
+        out = io.StringIO()
+        with mock.patch('myapp.management.commands.run_scheduler.close_old_connections'):
+            delay = SchedulerCommand(stdout=out).tick({'chunk_size': 100, 'max_sleep': 300})
+        self.assertIn('ta yaratildi', out.getvalue())
+        self.assertTrue(1 <= delay <= 300)
+        self.assertFalse(RecurringSchedule.objects.filter(next_run_date__lte=timezone.localdate()).exists())
+
+
+class CashFlowProjectionTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = CustomUser.objects.create_user(
+            username='dilshod', password='parol12345', first_name='Dilshod', last_name='Rahimov'
+        )
+        salary = Category.objects.create(user=cls.user, name='Maosh', type='INCOME')
+        rent = Category.objects.create(user=cls.user, name='Ijara', type='EXPENSE')
+        Transaction.objects.create(user=cls.user, amount=Decimal('1000'), category=salary, date=datetime.date(2025, 3, 5))
+        Transaction.objects.create(user=cls.user, amount=Decimal('200'), category=rent, date=datetime.date(2025, 2, 1))
+        RecurringSchedule.objects.create(user=cls.user, category=salary, amount=Decimal('500'),
+                                         day_of_month=15, start_date=datetime.date(2025, 1, 1))
+        RecurringSchedule.objects.create(user=cls.user, category=rent, amount=Decimal('100'), day_of_month=30,
+                                         start_date=datetime.date(2025, 1, 1), end_date=datetime.date(2025, 4, 30))
+        cls.today = datetime.date(2025, 3, 10)
+
+    def test_monthly_projection(self):
+        result = project_cash_flow(self.user, months=3, today=self.today)
+        self.assertEqual(result['opening_balance'], Decimal('-200'))
+        self.assertEqual(
+            [(row['period'], row['income'], row['expense'], row['balance']) for row in result['rows']],
+            [
+                (datetime.date(2025, 3, 1), Decimal('1500'), Decimal('100'), Decimal('1200')),
+                (datetime.date(2025, 4, 1), Decimal('500'), Decimal('100'), Decimal('1600')),
+                (datetime.date(2025, 5, 1), Decimal('500'), Decimal('0'), Decimal('2100')),
+            ],
+        )
+
+    def test_daily_projection_matches_monthly(self):
+        result = project_cash_flow(self.user, months=3, granularity='daily', today=self.today)
+        self.assertEqual(result['opening_balance'], Decimal('800'))
+        self.assertEqual(len(result['rows']), 83)
+        self.assertEqual(result['rows'][0]['period'], self.today)
+        self.assertEqual(result['rows'][5]['income'], Decimal('500'))  # 15-mart
+        self.assertEqual(result['rows'][-1]['balance'], Decimal('2100'))
+
+    def test_schedule_due_today_counts_until_posted(self):
+        gift = Category.objects.create(user=self.user, name='Sovg\'a', type='INCOME')
+        schedule = RecurringSchedule.objects.create(user=self.user, category=gift, amount=Decimal('70'),
+                                                    day_of_month=10, start_date=datetime.date(2025, 1, 1),
+                                                    end_date=self.today)
+        # process_recurring hali ishlamagan — bugungi 70 prognozda
+        monthly = project_cash_flow(self.user, months=1, today=self.today)
+        daily = project_cash_flow(self.user, months=1, granularity='daily', today=self.today)
+        self.assertEqual(monthly['rows'][0]['income'], Decimal('1570'))
+        self.assertEqual((daily['rows'][0]['period'], daily['rows'][0]['income']), (self.today, Decimal('70')))
+
+        # Yozilgandan keyin — haqiqiy summalarda, ikki marta hisoblanmaydi
+        RecurringEngine(today=self.today).run()
+        schedule.refresh_from_db()
+        self.assertEqual(schedule.last_executed, self.today)
+        monthly = project_cash_flow(self.user, months=1, today=self.today)
+        daily = project_cash_flow(self.user, months=1, granularity='daily', today=self.today)
+        self.assertEqual(monthly['rows'][0]['income'], Decimal('1570'))
+        self.assertEqual(daily['rows'][0]['income'], Decimal('0'))
+        self.assertEqual(daily['opening_balance'], Decimal('870'))
+
+    def test_projection_endpoint(self):
+        self.client.force_login(self.user)
+        response = self.client.get(reverse('cash_flow_projection'), {'months': 2})
+        self.assertEqual(len(response.json()['rows']), 2)
+        self.assertEqual(self.client.get(reverse('cash_flow_projection'), {'months': 0}).status_code, 400)
+        self.assertEqual(self.client.get(reverse('cash_flow_projection'), {'granularity': 'x'}).status_code, 400)
+
+    def test_benchmark_suite_agrees_with_naive_expansion(self):
+        result = BENCHMARKS['projection'](schedules=200, months=6)
+        self.assertGreater(result['occurrences'], 0)
+
+
+class BudgetSpendingTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = CustomUser.objects.create_user(
+            username='kamola', password='parol12345', first_name='Kamola', last_name='Saidova'
+        )
+        cls.month = datetime.date(2025, 6, 1)
+        food = Category.objects.create(user=cls.user, name='Oziq-ovqat', type='EXPENSE')
+        cafe = Category.objects.create(user=cls.user, name='Kafe', type='EXPENSE', parent=food)
+        transport = Category.objects.create(user=cls.user, name='Transport', type='EXPENSE')
+        for amount, category in ((300, food), (500, cafe), (50, transport)):
+            Transaction.objects.create(user=cls.user, amount=Decimal(amount), category=category,
+                                       date=datetime.date(2025, 6, 3))
+        Transaction.objects.create(user=cls.user, amount=Decimal('999'), category=food, date=datetime.date(2025, 5, 3))
+        cls.food_budget = Budget.objects.create(user=cls.user, category=food, amount=Decimal('1000'), month=cls.month)
+        Budget.objects.create(user=cls.user, category=cafe, amount=Decimal('400'), month=cls.month)
+        Budget.objects.create(user=cls.user, category=transport, amount=Decimal('100'), month=cls.month)
+
+    def test_with_spending_includes_subcategories_in_one_query(self):
+        with self.assertNumQueries(1):
+            budgets = {b.category.name: b for b in Budget.objects.with_spending().select_related('category')}
+            self.assertEqual(budgets['Oziq-ovqat'].spent, Decimal('800'))
+            self.assertEqual(budgets['Kafe'].spent, Decimal('500'))
+            self.assertEqual(budgets['Kafe'].spent_percentage(), Decimal('125.00'))
+            self.assertEqual(budgets['Transport'].spent_amount(), Decimal('50'))
+        self.assertEqual(Budget.objects.get(pk=self.food_budget.pk).spent_amount(), Decimal('800'))
+
+    def test_admin_changelist_query_count_is_constant(self):
+        admin_user = CustomUser.objects.create_superuser(
+            username='admin', password='parol12345', first_name='Admin', last_name='Admin'
+        )
+        self.client.force_login(admin_user)
+        url = reverse('admin:myapp_budget_changelist')
+        with CaptureQueriesContext(connection) as small:
+            self.assertEqual(self.client.get(url).status_code, 200)
+        for month in range(1, 6):
+            Budget.objects.create(user=self.user, category=self.food_budget.category,
+                                  amount=Decimal('10'), month=datetime.date(2024, month, 1))
+        with CaptureQueriesContext(connection) as large:
+            self.assertContains(self.client.get(url), '80.00%')
+        self.assertEqual(len(small), len(large))
+        summary = dict(self.client.get(url, {'month__gte': '2025-06-01'}).context['summary'])
+        self.assertEqual(summary['Jami'][0]['values'], [Decimal('1500'), Decimal('1350')])
+        self.assertEqual(len(summary["Kategoriya bo'yicha"]), 3)
+
+    def test_overview_page(self):
+        self.client.force_login(self.user)
+        with self.assertNumQueries(4):  # sessiya, foydalanuvchi, budjetlar, o'qilmagan ogohlantirishlar
+            response = self.client.get(reverse('budgets_month', args=(2025, 6)))
+        self.assertContains(response, 'Oziq-ovqat &gt; Kafe')
+        self.assertEqual(len(response.context['budgets']), 3)
+
+
+class TransactionAdminTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = CustomUser.objects.create_superuser(
+            username='admin', password='parol12345', first_name='Admin', last_name='Admin'
+        )
+        cls.user = CustomUser.objects.create_user(
+            username='sardor', password='parol12345', first_name='Sardor', last_name='Aliyev'
+        )
+        cls.category = Category.objects.create(user=cls.user, name='Oziq-ovqat', type='EXPENSE')
+        cls.url = reverse('admin:myapp_transaction_changelist')
+
+    def setUp(self):
+        cache.clear()
+        self.client.force_login(self.admin)
+
+    def add(self, count, date=datetime.date(2025, 3, 10), user=None):
+        Transaction.objects.bulk_create(
+            Transaction(user=user or self.user, amount=Decimal(index + 1), category=self.category, date=date)
+            for index in range(count)
+        )
+
+    def test_paginator_returns_only_page_rows(self):
+        self.add(120)
+        paginator = EstimatedCountPaginator(Transaction.objects.order_by('-amount', '-pk'), 50)
+        self.assertEqual((paginator.count, paginator.num_pages), (120, 3))
+        page = paginator.page(3)
+        self.assertEqual([t.amount for t in page], [Decimal(n) for n in range(20, 0, -1)])
+        with self.assertNumQueries(0):
+            EstimatedCountPaginator(Transaction.objects.order_by('-amount', '-pk'), 50).count  # keshdan
+
+    def test_filters(self):
+        other = CustomUser.objects.create_user(
+            username='nodira', password='parol12345', first_name='Nodira', last_name='Qodirova'
+        )
+        self.add(3)
+        self.add(2, date=datetime.date(2025, 1, 5), user=other)
+        response = self.client.get(self.url)
+        self.assertContains(response, '2025-03')
+        self.assertContains(response, '2025-01')
+        self.assertContains(response, 'list="user-options"')
+        self.assertEqual(self.client.get(self.url, {'month': '2025-01'}).context['cl'].result_count, 2)
+        self.assertEqual(self.client.get(self.url, {'user': 'nodira'}).context['cl'].result_count, 2)
+        self.assertEqual(self.client.get(self.url, {'user': str(self.user.pk)}).context['cl'].result_count, 3)
+
+    def test_changelist_query_count_independent_of_rows(self):
+        self.add(150)  # bir sahifadan ko'p — sahifalash yo'li ishlaydi
+        with CaptureQueriesContext(connection) as small:
+            self.assertEqual(self.client.get(self.url).status_code, 200)
+        self.add(1000, date=datetime.date(2024, 11, 1))
+        cache.clear()
+        with CaptureQueriesContext(connection) as large:
+            self.assertEqual(self.client.get(self.url).status_code, 200)
+        self.assertEqual(len(small), len(large), [q['sql'] for q in large.captured_queries])
+
+    def test_summary_is_one_grouped_query_over_filtered_rows(self):
+        income = Category.objects.create(user=self.user, name='Maosh', type='INCOME')
+        self.add(150)
+        self.add(3, date=datetime.date(2025, 2, 1))
+        Transaction.objects.create(user=self.user, amount=Decimal('5000'), category=income,
+                                   date=datetime.date(2025, 3, 1))
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(self.url, {'month': '2025-03'})
+        grouped = [q['sql'] for q in queries.captured_queries if 'GROUP BY' in q['sql']]
+        self.assertEqual(len(grouped), 1)
+        summary = dict(response.context['summary'])
+        types = {row['label']: (row['count'], row['values']) for row in summary["Tur bo'yicha"]}
+        self.assertEqual(types['Xarajat'], (150, [Decimal(150 * 151 // 2)]))
+        self.assertEqual(types['Daromad'], (1, [Decimal('5000')]))
+        self.assertEqual([row['label'] for row in summary["Oy bo'yicha"]], ['2025-03'])
+        self.assertEqual(summary['Jami'][0]['count'], 151)
+        self.assertContains(response, 'changelist-summary')
+
+
+class FakeDataTests(TestCase):
+    def test_generated_data_is_consistent(self):
+        today = datetime.date(2025, 6, 15)
+        report = generate_fake_data(users=2, years=1, density=0.5, seed=3, today=today)
+        self.assertEqual(report.users, 2)
+        self.assertEqual(Transaction.objects.count(), report.transactions)
+        self.assertFalse(Transaction.objects.filter(date__gt=today).exists())
+
+        coffee = Category.objects.select_related('parent__parent').filter(name='Qahva').first()
+        self.assertEqual(coffee.full_path, 'Oziq-ovqat > Kafe > Qahva')
+        self.assertEqual(coffee.path, f"/{coffee.parent.parent_id}/{coffee.parent_id}/{coffee.pk}/")
+        self.assertFalse(RecurringSchedule.objects.filter(next_run_date__isnull=True).exists())
+
+        rollups = sorted(MonthlyCategoryTotal.objects.values_list('user_id', 'month', 'category_id', 'total', 'count'))
+        rebuild_rollups()
+        self.assertEqual(rollups, sorted(
+            MonthlyCategoryTotal.objects.values_list('user_id', 'month', 'category_id', 'total', 'count')
+        ))
+        budget = Budget.objects.with_spending().filter(month=datetime.date(2025, 6, 1)).first()
+        self.assertEqual(budget.spent_total, budget.spent)
+
+    def test_run_benchmarks_writes_json_and_rolls_back(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'results.json')
+            call_command('run_benchmarks', '--sizes', '1,2', '--years', '1', '--density', '0.2',
+                         '--repeat', '1', '--output', path, stdout=io.StringIO())
+            with open(path, encoding='utf-8') as fh:
+                results = json.load(fh)
+        self.assertEqual([row['users'] for row in results['sizes']], [1, 2])
+        tiers = results['sizes'][0]['tiers']
+        self.assertEqual(list(tiers), ['light', 'medium', 'heavy'])
+        self.assertLess(tiers['light']['user_transactions'], tiers['heavy']['user_transactions'])
+        views = tiers['heavy']['views']
+        self.assertEqual(set(views), {'dashboard_view', 'get_transactions_list_partial', 'add_transaction_view'})
+        self.assertEqual(views['dashboard_view']['status'], 200)
+        self.assertGreater(results['sizes'][0]['process_recurring']['schedules'], 0)
+        self.assertFalse(CustomUser.objects.exists())
+
+    def test_view_timing_leaves_other_cache_entries(self):
+        user = CustomUser.objects.create_user(
+            username='olchov', password='parol12345', first_name='Test', last_name='Olchov'
+        )
+        cache.set('daromad:boshqa-foydalanuvchi', 'saqlanadi')
+        client = Client()
+        client.force_login(user)
+        timing = time_view(client, user.pk, reverse('dashboard'), {}, repeat=1)
+        self.assertEqual(timing['status'], 200)
+        self.assertEqual(cache.get('daromad:boshqa-foydalanuvchi'), 'saqlanadi')
+
+
+class BudgetAlertTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = CustomUser.objects.create_user(
+            username='aziza', password='parol12345', first_name='Aziza', last_name='Tursunova'
+        )
+        cls.day = datetime.date(2025, 7, 4)
+        cls.food = Category.objects.create(user=cls.user, name='Oziq-ovqat', type='EXPENSE')
+        cls.cafe = Category.objects.create(user=cls.user, name='Kafe', type='EXPENSE', parent=cls.food)
+        cls.budget = Budget.objects.create(
+            user=cls.user, category=cls.food, amount=Decimal('1000'), month=datetime.date(2025, 7, 1),
+            warning_threshold=80,
+        )
+
+    def spend(self, amount, category=None):
+        return Transaction.objects.create(user=self.user, amount=Decimal(amount),
+                                          category=category or self.cafe, date=self.day)
+
+    def test_counter_and_alerts_on_threshold_crossings(self):
+        self.spend(500)
+        self.budget.refresh_from_db()
+        self.assertEqual((self.budget.spent_total, self.budget.alert_level), (Decimal('500'), 0))
+        self.assertFalse(BudgetAlert.objects.exists())
+
+        self.spend(350)  # 85% — ogohlantirish
+        self.spend(10)   # hali ham 86% — yangi ogohlantirish yo'q
+        tx = self.spend(200)  # 106% — oshdi
+        self.assertEqual(list(BudgetAlert.objects.order_by('created_at', 'pk').values_list('level', 'percent')), [
+            (1, Decimal('85.00')), (2, Decimal('106.00')),
+        ])
+
+        tx.delete()  # 86% ga tushdi — daraja jimgina pasayadi
+        self.budget.refresh_from_db()
+        self.assertEqual((self.budget.spent_total, self.budget.alert_level), (Decimal('860'), 1))
+        self.assertEqual(BudgetAlert.objects.count(), 2)
+        self.assertEqual(self.budget.spent_total, Budget.objects.with_spending().get(pk=self.budget.pk).spent)
+
+    def test_write_cost_is_constant(self):
+        self.spend(1, self.food)  # oy uchun rollup qatori yaratiladi
+        with CaptureQueriesContext(connection) as before:
+            self.spend(1, self.food)
+        for offset in range(5):
+            Budget.objects.create(user=self.user, category=self.cafe, amount=Decimal('1'),
+                                  month=datetime.date(2025, 8 + offset, 1))
+            self.spend(10)
+        with CaptureQueriesContext(connection) as after:
+            self.spend(1, self.food)
+        self.assertEqual(len(before), len(after))
+        # Oy qayta yig'ilmaydi — faqat F() yangilanishlar
+        self.assertFalse([q for q in after.captured_queries if 'SUM(' in q['sql'].upper()])
+
+    def test_moving_category_refreshes_counters(self):
+        self.spend(300)
+        self.cafe.parent = None
+        self.cafe.save()
+        self.budget.refresh_from_db()
+        self.assertEqual(self.budget.spent_total, Decimal('0'))
+
+    def test_global_category_move_refreshes_only_its_ancestor_budgets(self):
+        other = CustomUser.objects.create_user(username='bobur', password='parol12345')
+        month = datetime.date(2025, 7, 1)
+        shared = Category.objects.create(user=None, name='Kommunal', type='EXPENSE')
+        power = Category.objects.create(user=None, name='Elektr', type='EXPENSE', parent=shared)
+        related = Budget.objects.create(user=other, category=shared, amount=Decimal('100'), month=month)
+        Budget.objects.create(user=other, category=Category.objects.create(user=other, name='Ijara', type='EXPENSE'),
+                              amount=Decimal('100'), month=month)
+
+        with mock.patch('myapp.signals.refresh_budget_counters') as refresh:
+            power.parent = None
+            power.save()
+        self.assertEqual(list(refresh.call_args.args[0].values_list('pk', flat=True)), [related.pk])
+
+    def test_huge_overspend_does_not_break_transaction_write(self):
+        tiny = Budget.objects.create(user=self.user, category=self.cafe, amount=Decimal('1'),
+                                     month=datetime.date(2025, 7, 1))
+        self.spend(100_000_000)
+        alert = BudgetAlert.objects.get(budget=tiny)
+        self.assertEqual(alert.percent, BUDGET_ALERT_MAX_PERCENT)
+        self.assertEqual(Budget.objects.with_spending().get(pk=tiny.pk).spent_percent, Decimal('10000000000'))
+
+    def test_save_ignores_stale_spending_annotation(self):
+        self.spend(900)
+        rent = Category.objects.create(user=self.user, name='Ijara', type='EXPENSE')
+        budget = Budget.objects.with_spending().get(pk=self.budget.pk)
+        self.assertEqual(budget.spent, Decimal('900'))
+
+        budget.category = rent
+        budget.save()
+        budget.refresh_from_db()
+        self.assertEqual((budget.spent_total, budget.alert_level), (Decimal('0'), 0))
+
+        budget = Budget.objects.with_spending().get(pk=self.budget.pk)
+        budget.category, budget.month = self.food, datetime.date(2025, 8, 1)
+        budget.save()
+        budget.refresh_from_db()
+        self.assertEqual((budget.spent_total, budget.alert_level), (Decimal('0'), 0))
+
+    def test_alerts_page(self):
+        self.spend(900)
+        self.client.force_login(self.user)
+        response = self.client.get(reverse('budget_alerts'))
+        self.assertContains(response, 'Ogohlantirish')
+        self.client.post(reverse('budget_alerts'))
+        self.assertFalse(BudgetAlert.objects.filter(is_read=False).exists())
+
+
+class BudgetOverviewTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = CustomUser.objects.create_user(
+            username='otabek', password='parol12345', first_name='Otabek', last_name='Nazarov'
+        )
+        cls.month = datetime.date(2025, 9, 1)
+        cls.food = Category.objects.create(user=cls.user, name='Oziq-ovqat', type='EXPENSE')
+        Transaction.objects.create(user=cls.user, amount=Decimal('600'), category=cls.food,
+                                   date=datetime.date(2025, 9, 5))
+        Budget.objects.create(user=cls.user, category=cls.food, amount=Decimal('1500'), month=cls.month)
+
+    def test_burn_rate_projection(self):
+        overview = get_budget_overview(self.user, self.month, datetime.date(2025, 9, 10))
+        budget = overview['budgets'][0]
+        self.assertEqual((overview['days_elapsed'], overview['days_left']), (10, 20))
+        self.assertEqual(budget.remaining, Decimal('900'))
+        self.assertEqual(budget.daily_burn, Decimal('60'))
+        self.assertEqual(budget.projected, Decimal('1800'))
+        self.assertTrue(budget.will_exceed)
+        self.assertEqual(budget.daily_allowance, Decimal('45'))
+        self.assertEqual(overview['totals']['percent'], Decimal('40'))
+
+        past = get_budget_overview(self.user, self.month, datetime.date(2025, 12, 1))['budgets'][0]
+        self.assertEqual((past.projected, past.will_exceed), (Decimal('600'), False))
+
+    def test_totals_do_not_double_count_nested_budgets(self):
+        cafe = Category.objects.create(user=self.user, name='Kafe', type='EXPENSE', parent=self.food)
+        coffee = Category.objects.create(user=self.user, name='Qahva', type='EXPENSE', parent=cafe)
+        rent = Category.objects.create(user=self.user, name='Ijara', type='EXPENSE')
+        Transaction.objects.create(user=self.user, amount=Decimal('150'), category=coffee, date=datetime.date(2025, 9, 6))
+        Transaction.objects.create(user=self.user, amount=Decimal('250'), category=rent, date=datetime.date(2025, 9, 6))
+        Budget.objects.create(user=self.user, category=coffee, amount=Decimal('300'), month=self.month)
+        Budget.objects.create(user=self.user, category=rent, amount=Decimal('500'), month=self.month)
+
+        overview = get_budget_overview(self.user, self.month, datetime.date(2025, 9, 30))
+        by_name = {budget.category.name: budget for budget in overview['budgets']}
+        self.assertEqual(by_name['Oziq-ovqat'].spent, Decimal('750'))  # o'zi + Qahva
+        self.assertEqual(by_name['Qahva'].spent, Decimal('150'))
+        self.assertEqual({name: budget.is_nested for name, budget in by_name.items()},
+                         {'Ijara': False, 'Oziq-ovqat': False, 'Qahva': True})
+        self.assertEqual(overview['totals']['amount'], Decimal('2000'))  # 1500 + 500
+        self.assertEqual(overview['totals']['spent'], Decimal('1000'))   # 750 + 250
+
+    def test_page_query_count_independent_of_budget_count(self):
+        self.client.force_login(self.user)
+        url = reverse('budgets_month', args=(2025, 9))
+        with CaptureQueriesContext(connection) as one:
+            self.assertContains(self.client.get(url), 'Oy oxiriga prognoz')
+        for index in range(15):
+            category = Category.objects.create(user=self.user, name=f'Xarajat {index}', type='EXPENSE',
+                                               parent=self.food if index % 2 else None)
+            Transaction.objects.create(user=self.user, amount=Decimal('10'), category=category,
+                                       date=datetime.date(2025, 9, 2))
+            Budget.objects.create(user=self.user, category=category, amount=Decimal('100'), month=self.month)
+        with CaptureQueriesContext(connection) as many:
+            response = self.client.get(url)
+        self.assertEqual(len(response.context['budgets']), 16)
+        self.assertEqual(len(one), len(many), [q['sql'] for q in many.captured_queries])
+
+
+class QueryBudgetTests(TestCase):
+    """
+    Har bir sahifa va admin changelist uchun SQL so'rovlar soniga yuqori chegara.
+    Chegara ma'lumot hajmiga bog'liq emas: sintetik to'plamning kichik (o'nlab qator)
+    va katta (10 000+ qator) holatida ham bir xil bo'lishi kerak. Buzilsa — test
+    yig'ilgan SQL ro'yxati bilan yiqiladi (N+1 qayerdaligi darhol ko'rinadi).
+    """
+    LARGE_ROWS = 10_000
+    # (url nomi, url argumentlari, GET parametrlari, admin sifatida, chegara).
+    # Chegaraga sessiya va foydalanuvchi so'rovlari ham kiradi.
+    PAGES = (
+        ('dashboard', (), {}, False, 5),
+        ('transactions_list_partial', (), {'year': '{year}', 'month': '{month}'}, False, 4),
+        ('add_transaction', (), {}, False, 2),
+        ('recurring_list', (), {}, False, 4),
+        ('budgets', (), {}, False, 4),
+        ('budget_alerts', (), {}, False, 3),
+        ('category_catalogue', (), {}, False, 3),
+        ('cash_flow_projection', (), {}, False, 4),
+        ('profile', (), {}, False, 2),
+        ('admin:myapp_transaction_changelist', (), {}, True, 7),
+        ('admin:myapp_budget_changelist', (), {}, True, 9),
+        ('admin:myapp_category_changelist', (), {}, True, 6),
+        ('admin:myapp_recurringschedule_changelist', (), {}, True, 10),
+        ('admin:myapp_budgetalert_changelist', (), {}, True, 5),
+    )
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.today = timezone.localdate()
+        generate_fake_data(users=1, years=1, density=0.02, seed=7, today=cls.today)
+        cls.user = CustomUser.objects.get()
+        cls.admin = CustomUser.objects.create_superuser(
+            username='admin', password='parol12345', first_name='Admin', last_name='Admin'
+        )
+
+    def grow(self):
+        """ Xuddi shu foydalanuvchiga 10 000 tranzaksiya, kategoriyalar, budjet, jadval va ogohlantirishlar. """
+        parents = list(Category.objects.filter(user=self.user, depth=0))
+        for index in range(40):
+            parent = parents[index % len(parents)]
+            Category.objects.create(user=self.user, name=f"Qo'shimcha {index}", type=parent.type, parent=parent)
+        categories = list(Category.objects.filter(user=self.user))
+        month_start = self.today.replace(day=1)
+        Transaction.objects.bulk_create(
+            Transaction(
+                user=self.user, category=categories[index % len(categories)], amount=Decimal(index % 997 + 1),
+                date=month_start - datetime.timedelta(days=index % 365) if index % 4 else month_start,
+            )
+            for index in range(self.LARGE_ROWS)
+        )
+        expense = [category for category in categories if category.type == 'EXPENSE']
+        existing = set(Budget.objects.values_list('category_id', 'month'))
+        budgets = Budget.objects.bulk_create(
+            Budget(user=self.user, category=category, month=month, amount=Decimal('500000'))
+            for category in expense
+            for month in (month_start - relativedelta(months=offset) for offset in range(12))
+            if (category.pk, month) not in existing
+        )
+        RecurringSchedule.objects.bulk_create(
+            RecurringSchedule(user=self.user, category=categories[index % len(categories)], amount=Decimal('1000'),
+                              day_of_month=index % 28 + 1, start_date=month_start, next_run_date=month_start)
+            for index in range(200)
+        )
+        BudgetAlert.objects.bulk_create(
+            BudgetAlert(user=self.user, budget=budget, level=1, spent=Decimal('1'), percent=Decimal('80'))
+            for budget in budgets[:300]
+        )
+        rebuild_rollups(user=self.user)
+
+    def measure(self, url_name, args, params, as_admin):
+        cache.clear()
+        self.client.force_login(self.admin if as_admin else self.user)
+        params = {key: value.format(year=self.today.year, month=self.today.month) for key, value in params.items()}
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(reverse(url_name, args=args), params)
+        self.assertEqual(response.status_code, 200, url_name)
+        return [query['sql'] for query in queries.captured_queries]
+
+    def assertWithinBudget(self, url_name, queries, budget, label):
+        if len(queries) > budget:
+            listing = '\n'.join(f"{index}. {sql}" for index, sql in enumerate(queries, 1))
+            self.fail(f"{url_name} ({label}): {len(queries)} ta so'rov, chegara {budget}:\n{listing}")
+
+    def test_query_budgets_hold_for_small_and_large_data(self):
+        for url_name, args, params, as_admin, budget in self.PAGES:
+            small = self.measure(url_name, args, params, as_admin)
+            with self.subTest(url_name, size='small'):
+                self.assertWithinBudget(url_name, small, budget, 'kichik')
+
+        self.grow()
+        self.assertGreaterEqual(Transaction.objects.count(), self.LARGE_ROWS)
+        for url_name, args, params, as_admin, budget in self.PAGES:
+            large = self.measure(url_name, args, params, as_admin)
+            with self.subTest(url_name, size='large'):
+                # Xuddi shu chegara — qatorlar soni 1000 marta oshganda ham
+                self.assertWithinBudget(url_name, large, budget, 'katta')
@@ -12,6 +12,9 @@ urlpatterns = [
     path('', dashboard_view, name='dashboard'), 
     path('<int:year>/<int:month>/', dashboard_view, name='dashboard_select_month'),
     path('transactions/list-partial/', get_transactions_list_partial, name='transactions_list_partial'), 
+    path('transactions/more/', get_transactions_more, name='transactions_more'),
+    path('transactions/export/', export_transactions_view, name='export_transactions'),
+    path('transactions/import/', import_transactions_view, name='import_transactions'),
    
 
     path('profile/about/', about_view, name='about'),
@@ -20,12 +23,18 @@ urlpatterns = [
     path('transaction/add/', add_transaction_view, name='add_transaction'),
     path('category/add/', add_category_view, name='add_category'),
     path('category/delete/<int:category_id>/', delete_category_view, name='category_delete'),
+    path('category/merge/<int:category_id>/', merge_category_view, name='category_merge'),
+    path('category/catalogue.json', category_catalogue_view, name='category_catalogue'),
     
     # Takrorlanuvchi Jadval (Wallet tugmasi)
     path('recurring/', recurring_list_view, name='recurring_list'),
     path('recurring/add/', add_recurring_view, name='add_recurring'),
     path('recurring/delete/<int:pk>/', delete_recurring_view, name='delete_recurring'),
+    path('recurring/projection.json', cash_flow_projection_view, name='cash_flow_projection'),
      
     # Budjet
     path('profile/budget_about/', budget_about, name='budget_about'),
+    path('budgets/', budget_overview_view, name='budgets'),
+    path('budgets/<int:year>/<int:month>/', budget_overview_view, name='budgets_month'),
+    path('budgets/alerts/', budget_alerts_view, name='budget_alerts'),
 ]
\ No newline at end of file
@@ -12,7 +12,7 @@ import json
 from django.db.models import Q
 from django.db import models
 from django.contrib import messages
-from django.http import JsonResponse, HttpResponse, HttpResponseForbidden
+from django.http import JsonResponse, HttpResponse, HttpResponseForbidden, HttpResponseBadRequest, StreamingHttpResponse
 from django.urls import reverse 
 from django.views.decorators.http import require_POST, require_http_methods
 from django.template.loader import render_to_string
@@ -22,7 +22,23 @@ from django.contrib.auth import authenticate, login, logout
 from .forms import CustomLoginForm, CustomRegisterForm
 from django.utils import timezone
 from .forms import UserUpdateForm
+from .caching import get_cached_dashboard_totals
+from .pagination import keyset_page, decode_cursor, get_page_size
+from .caching import get_month_marker, fragment_cache_key, category_catalogue_etag, get_cached_category_catalogue
+from django.conf import settings
+from django.core.cache import cache
+from django.utils.cache import patch_cache_control
+from django.views.decorators.http import condition
+import hashlib
+from .exports import EXPORT_FORMATS, export_queryset
+from .importers import StatementImporter, ColumnMapping
+from .merging import merge_categories
+from .projections import project_cash_flow
+from .services import get_budget_overview
+import io
+from urllib.parse import urlencode
 from django.db import IntegrityError
+from django.core.exceptions import ValidationError
 from django.db.models import Sum, Max, Min, Q, F, Case, When, IntegerField
 
 # === 1. LOGIN ===
@@ -131,13 +147,15 @@ def dashboard_view(request, year=None, month=None):
         # Oyning oxirgi kuni
         end_date = start_of_month + relativedelta(months=1) - relativedelta(days=1)
 
-    # --- 2. Chegaralar, Tranzaksiyalar (O'zgarmadi) ---
-    date_bounds = Transaction.objects.filter(user=request.user).aggregate(
-        min_date=Min('date'), 
-        max_date=Max('date')
-    )
-    min_available_date = date_bounds['min_date']
-    max_available_date = date_bounds['max_date']
+    # --- 2. Moliyaviy Hisob-kitoblar (keshdan; o'tgan oylar — rollup jadvalidan) ---
+    summary = get_cached_dashboard_totals(request.user, start_of_month, end_date)
+    total_income = summary['income']
+    total_expense = summary['expense']
+    total_net_balance = summary['net_balance']
+    balance_change = summary['balance_change']
+    min_available_date = summary['min_date']
+    max_available_date = summary['max_date']
+    main_category_totals = summary['main_category_totals']
 
     current_period_transactions = Transaction.objects.filter(
         user=request.user,
@@ -145,76 +163,11 @@ def dashboard_view(request, year=None, month=None):
         date__lte=end_date
     ).select_related('category', 'category__parent')
 
-    # --- 3. Moliyaviy Hisob-kitoblar (O'zgarmadi) ---
-    total_income = current_period_transactions.filter(category__type='INCOME').aggregate(total=Sum('amount'))['total'] or 0
-    total_expense = current_period_transactions.filter(category__type='EXPENSE').aggregate(total=Sum('amount'))['total'] or 0
-    total_net_balance = total_income - total_expense
-
-    # --- 4. O‘tgan oy bilan solishtirish (O'zgarmadi) ---
-    prev_month_start = start_of_month - relativedelta(months=1)
-    prev_month_end = start_of_month - relativedelta(days=1)
-
-    prev_income = Transaction.objects.filter(
-        user=request.user,
-        date__gte=prev_month_start, date__lte=prev_month_end,
-        category__type='INCOME'
-    ).aggregate(total=Sum('amount'))['total'] or 0
-
-    prev_expense = Transaction.objects.filter(
-        user=request.user,
-        date__gte=prev_month_start, date__lte=prev_month_end,
-        category__type='EXPENSE'
-    ).aggregate(total=Sum('amount'))['total'] or 0
-
-    prev_net_balance = prev_income - prev_expense
-    balance_change = total_net_balance - prev_net_balance
-
-    
-    # --- 5. Asosiy Kategoriyalar Bo‘yicha Umumiy Tahlil (YANGI MANTIQ) ---
-    
-    # 5.1. Barcha tranzaksiyalarni Ota-kategoriya (yoki o'ziga) bo'yicha guruhlaymiz.
-    # Har bir tranzaksiyaning asosiy kategoriyasini aniqlash uchun Case/When ishlatiladi.
-    
-    main_category_totals_query = current_period_transactions.annotate(
-        # 'main_cat_id' - bu tranzaksiya tegishli bo'lgan eng asosiy (ota) kategoriyaning ID'si.
-        main_cat_id=Case(
-            # Agar kategoriya o'zi ota (parent=None) bo'lsa, o'zining ID'sini ol
-            When(category__parent__isnull=True, then=F('category_id')),
-            # Agar subkategoriya bo'lsa, ota kategoriyaning ID'sini ol
-            default=F('category__parent_id'),
-            output_field=IntegerField()
-        )
-    ).values('main_cat_id').annotate(
-        # Bu ID bo'yicha jami summani hisoblash
-        total=Sum('amount')
-    ).order_by('-total')
-
-    # 5.2. Natijalarni tozalash va kontekstga moslash
-    main_category_totals = []
-    
-    if main_category_totals_query:
-        # Guruhlashdan keyin biz faqat ID va Total summasini olamiz.
-        # Endi biz nom, tur va foydalanuvchini olish uchun Category modelini ishlatishimiz kerak.
-        main_category_ids = [item['main_cat_id'] for item in main_category_totals_query]
-        # Barcha kerakli ota kategoriyalarni bir so'rovda olamiz.
-        main_cats = Category.objects.filter(id__in=main_category_ids).in_bulk(main_category_ids)
-        
-        for item in main_category_totals_query:
-            if item['main_cat_id'] in main_cats:
-                main_cat_obj = main_cats[item['main_cat_id']]
-                
-                main_category_totals.append({
-                    'category__name': main_cat_obj.name,
-                    'category__type': main_cat_obj.type,
-                    'total': item['total'],
-                })
-
-    
-  
     top_expense_categories = Category.objects.none() 
     recent_transactions = current_period_transactions.order_by('-date', '-created_at')[:5]
 
-    all_transactions_list = current_period_transactions.order_by('-date', '-created_at')
+    # Ro'yxat keyset bo'yicha sahifalanadi — qolganlari "Yana yuklash" orqali
+    all_transactions_list, next_cursor = keyset_page(current_period_transactions)
 
     # --- 7. Kontekst ---
     context = {
@@ -227,6 +180,7 @@ def dashboard_view(request, year=None, month=None):
         'recent_transactions': recent_transactions,  # Agar hali ham zarur bo'lsa
 
         'all_transactions': all_transactions_list,
+        'more_url': _more_transactions_url(report_date.year, report_date.month, 'ALL', next_cursor),
 
         # Davr ma'lumotlari
         'report_date_start': start_of_month,
@@ -249,10 +203,11 @@ def dashboard_view(request, year=None, month=None):
     return render(request, 'dashboard.html', context)
 
 
-@login_required
-def get_transactions_list_partial(request):
-    """AJAX so'rovlari uchun filtrlangan tranzaksiya ro'yxati qismini qaytaradi."""
-    
+def _month_transactions(request):
+    """
+    GET parametrlari (year, month, type) bo'yicha oy tranzaksiyalari QuerySet'ini
+    qaytaradi. Xato bo'lsa — (None, HttpResponse).
+    """
     # 1. Parametrlarni olish
     filter_type = request.GET.get('type', 'ALL')
     year_str = request.GET.get('year')
@@ -263,13 +218,13 @@ def get_transactions_list_partial(request):
         year = int(year_str)
         month = int(month_str)
     except (TypeError, ValueError):
-        return HttpResponse("<p class='p-4 text-center text-red-500'>Noto‘g‘ri sana.</p>")
+        return None, HttpResponse("<p class='p-4 text-center text-red-500'>Noto‘g‘ri sana.</p>")
 
     # 3. Davrni aniqlash
     try:
         report_date = date(year, month, 1)
     except ValueError:
-        return HttpResponse("<p class='p-4 text-center text-red-500'>Noto‘g‘ri oy.</p>")
+        return None, HttpResponse("<p class='p-4 text-center text-red-500'>Noto‘g‘ri oy.</p>")
 
     start_of_month = report_date.replace(day=1)
     end_of_month = start_of_month + relativedelta(months=1) - relativedelta(days=1)
@@ -286,58 +241,204 @@ def get_transactions_list_partial(request):
         transactions_qs = transactions_qs.filter(category__type=filter_type)
 
     # 6. Optimallashtirish
-    transactions_qs = transactions_qs.select_related(
-        'category', 'category__parent'
-    ).order_by('-date', '-created_at')
-
-    # 7. HTML qaytarish
-    html = render_to_string(
-        'partials/transaction_list.html',
-        {'all_transactions': transactions_qs},
-        request=request
-    )
-    return HttpResponse(html)
+    transactions_qs = transactions_qs.select_related('category', 'category__parent')
+    return transactions_qs, None
+
 
+def _more_transactions_url(year, month, filter_type, cursor):
+    """ "Yana yuklash" tugmasi uchun URL (keyingi sahifa bo'lmasa — None). """
+    if not cursor:
+        return None
+    query = urlencode({'year': year, 'month': month, 'type': filter_type, 'cursor': cursor})
+    return f"{reverse('transactions_more')}?{query}"
 
-def get_categories_for_js(user):
+
+def _transactions_marker(request):
     """
-    Kategoriyalarni eng xavfsiz JSON formatida tayyorlaydi.
+    Ro'yxat fragmenti uchun (ETag, Last-Modified) — so'rov davomida bir marta
+    hisoblanadi. Parametrlar noto'g'ri bo'lsa (None, None).
     """
-    categories_queryset = Category.objects.filter(
-        models.Q(user=user) | models.Q(user__isnull=True),
-        is_active=True
-    ).order_by('type', 'parent__id', 'name')
-
-    # ... ICON_MAP bu yerda bo'ladi ...
-    ICON_MAP = {
-        'Oziq-ovqat': 'fas fa-shopping-basket', 'Uy-joy / Ijara': 'fas fa-home',
-        'Transport': 'fas fa-car', 'Ko\'ngilochar': 'fas fa-film', 
-        'Kommunal to\'lovlar': 'fas fa-lightbulb', 'Ta\'lim': 'fas fa-graduation-cap',
-        'Restoran / Kafe': 'fas fa-utensils', 'Sog\'liqni Saqlash': 'fas fa-hospital',
-        'Maosh / Oylik': 'fas fa-briefcase', 'Freelance': 'fas fa-laptop-code',
-        'Ijara Daromadi': 'fas fa-house-user', 'Dividenda / Foiz': 'fas fa-chart-line',
-        'Sovg\'a / Mukofot': 'fas fa-gift',
-        'default_expense': 'fas fa-minus-circle',
-        'default_income': 'fas fa-plus-circle',
-    }
-    # ...
+    if not hasattr(request, '_transactions_marker'):
+        marker = (None, None)
+        try:
+            month = date(int(request.GET.get('year')), int(request.GET.get('month')), 1)
+        except (TypeError, ValueError):
+            month = None
+        if month and request.user.is_authenticated:
+            last_modified, count, category_version = get_month_marker(request.user.pk, month)
+            raw = '|'.join(str(part) for part in (
+                request.user.pk, request.path, month, request.GET.get('type', 'ALL'),
+                request.GET.get('cursor', ''), last_modified, count, category_version,
+                get_page_size(),
+            ))
+            marker = (hashlib.md5(raw.encode()).hexdigest(), last_modified)
+        request._transactions_marker = marker
+    return request._transactions_marker
+
+
+def _transactions_etag(request, *args, **kwargs):
+    return _transactions_marker(request)[0]
+
+
+def _transactions_last_modified(request, *args, **kwargs):
+    return _transactions_marker(request)[1]
+
+
+def _cached_fragment(request, render):
+    """
+    Tayyor HTML fragmentni ETag kaliti bilan serverda keshlaydi.
+    Ma'lumot o'zgarmagan bo'lsa, tranzaksiyalar so'rovi ham, shablon ham ishlamaydi.
+    """
+    etag = _transactions_etag(request)
+    key = fragment_cache_key(etag) if etag else None
+    html = cache.get(key) if key else None
+    if html is None:
+        html = render()
+        if key and isinstance(html, str):
+            cache.set(key, html, getattr(settings, 'FRAGMENT_CACHE_TIMEOUT', 60 * 60))
+    if not isinstance(html, str):
+        # Xato javobi (HttpResponse) — keshlanmaydi
+        return html
+    response = HttpResponse(html)
+    # Brauzer har safar qayta tekshirsin (If-None-Match), lekin javobni saqlasin
+    patch_cache_control(response, private=True, no_cache=True)
+    return response
+
+
+@login_required
+@condition(etag_func=_transactions_etag, last_modified_func=_transactions_last_modified)
+def get_transactions_list_partial(request):
+    """AJAX so'rovlari uchun filtrlangan tranzaksiya ro'yxati qismini qaytaradi (birinchi sahifa)."""
+    def render():
+        transactions_qs, error = _month_transactions(request)
+        if error:
+            return error
+
+        page, next_cursor = keyset_page(transactions_qs)
+
+        # 7. HTML qaytarish
+        return render_to_string(
+            'partials/transaction_list.html',
+            {
+                'all_transactions': page,
+                'more_url': _more_transactions_url(
+                    request.GET['year'], request.GET['month'], request.GET.get('type', 'ALL'), next_cursor
+                ),
+            },
+            request=request
+        )
+
+    return _cached_fragment(request, render)
+
+
+@login_required
+@condition(etag_func=_transactions_etag, last_modified_func=_transactions_last_modified)
+def get_transactions_more(request):
+    """ "Yana yuklash": kursordan keyingi sahifa qatorlarini qaytaradi. """
+    cursor = decode_cursor(request.GET.get('cursor'))
+    if cursor is None:
+        return HttpResponse("<p class='p-4 text-center text-red-500'>Noto‘g‘ri kursor.</p>", status=400)
+
+    def render():
+        transactions_qs, error = _month_transactions(request)
+        if error:
+            return error
+
+        page, next_cursor = keyset_page(transactions_qs, cursor)
+        return render_to_string(
+            'partials/transaction_rows.html',
+            {
+                'transactions': page,
+                'more_url': _more_transactions_url(
+                    request.GET['year'], request.GET['month'], request.GET.get('type', 'ALL'), next_cursor
+                ),
+            },
+            request=request
+        )
+
+    return _cached_fragment(request, render)
+
+
+@login_required
+def export_transactions_view(request):
+    """
+    Tranzaksiyalarni CSV/XLSX ko'rinishida oqim bilan yuklab beradi.
+    GET: format=csv|xlsx, start=YYYY-MM-DD, end=YYYY-MM-DD, type=INCOME|EXPENSE
+    """
+    export_format = request.GET.get('format', 'csv')
+    if export_format not in EXPORT_FORMATS:
+        return HttpResponseBadRequest("Noto‘g‘ri format.")
+
+    try:
+        start = date.fromisoformat(request.GET['start']) if request.GET.get('start') else None
+        end = date.fromisoformat(request.GET['end']) if request.GET.get('end') else None
+    except ValueError:
+        return HttpResponseBadRequest("Noto‘g‘ri sana.")
+
+    streamer, content_type = EXPORT_FORMATS[export_format]
+    queryset = export_queryset(request.user, start, end, request.GET.get('type'))
+
+    response = StreamingHttpResponse(streamer(queryset), content_type=content_type)
+    filename = f"tranzaksiyalar_{start or 'boshidan'}_{end or 'hozirgacha'}.{export_format}"
+    response['Content-Disposition'] = f'attachment; filename="{filename}"'
+    return response
 
-    categories_list = []
-    for cat in categories_queryset:
-        icon_name = ICON_MAP.get(cat.name, ICON_MAP.get('default_expense' if cat.type == 'EXPENSE' else 'default_income'))
-        
-        categories_list.append({
-            'id': cat.id,
-            # Nomni qochirish: Apostroflarni JSON ichida qochirishimiz kerak bo'lishi mumkin
-            'name': cat.name, 
-            'type': cat.type,
-            'icon': icon_name, 
-            'parent_id': cat.parent.id if cat.parent else None,
-        })
-    
-    # JSON stringga aylantirish. ensure_ascii=False o'zbekcha harflarni to'g'ri kodlaydi.
-    # Bu qismni o'zgarishsiz qoldiramiz, chunki muammo keyingi qadamda
-    return json.dumps(categories_list, cls=DjangoJSONEncoder, ensure_ascii=False)
+
+@login_required
+def import_transactions_view(request):
+    """ Bank ko'chirmasini (CSV) yuklab, tranzaksiyalarni ommaviy qo'shadi. """
+    report = None
+    if request.method == 'POST':
+        form = StatementImportForm(request.POST, request.FILES, user=request.user)
+        if form.is_valid():
+            data = form.cleaned_data
+            importer = StatementImporter(
+                request.user,
+                mapping=ColumnMapping(
+                    date=data['date_column'],
+                    amount=data['amount_column'],
+                    description=data['description_column'],
+                    category=data['category_column'],
+                    date_format=data['date_format'],
+                ),
+                income_category=data['income_category'],
+                expense_category=data['expense_category'],
+                delimiter=data['delimiter'],
+            )
+            # Fayl butunlay xotiraga o'qilmaydi — qatorma-qator oqim
+            stream = io.TextIOWrapper(data['file'].file, encoding='utf-8-sig', errors='replace')
+            report = importer.import_file(stream)
+            messages.success(
+                request,
+                f"{report.created} ta tranzaksiya qo‘shildi, {report.duplicates} ta dublikat o‘tkazib yuborildi."
+            )
+            if report.errors:
+                messages.error(request, f"{len(report.errors)} ta qatorda xatolik bor.")
+    else:
+        form = StatementImportForm(user=request.user)
+
+    return render(request, 'import_transactions.html', {'form': form, 'report': report})
+
+
+def category_catalogue_url(user):
+    """ Katalog URL'i versiya bilan — versiya o'zgarmaguncha brauzer uni qayta so'ramaydi. """
+    return f"{reverse('category_catalogue')}?v={category_catalogue_etag(user.pk)}"
+
+
+@login_required
+@condition(etag_func=lambda request, *args, **kwargs: category_catalogue_etag(request.user.pk))
+def category_catalogue_view(request):
+    """
+    Kategoriyalar katalogi (JSON). Tranzaksiya va kategoriya formalari uni
+    fetch() bilan oladi; ETag o'zgarmasa 304 qaytadi.
+    """
+    response = HttpResponse(get_cached_category_catalogue(request.user), content_type='application/json')
+    if request.GET.get('v') == category_catalogue_etag(request.user.pk):
+        # Versiyalangan URL — mazmuni hech qachon o'zgarmaydi
+        patch_cache_control(response, private=True, max_age=60 * 60 * 24 * 365, immutable=True)
+    else:
+        patch_cache_control(response, private=True, no_cache=True)
+    return response
 
 @login_required
 def add_transaction_view(request):
@@ -359,63 +460,14 @@ def add_transaction_view(request):
         form = TransactionForm(user=request.user, transaction_type=transaction_type)
         
     
-    # 1. Kategoriyalarni JSON formatida olish
-    categories_json_raw = get_categories_for_js(request.user)
-
-    # 2. ENG ISHONCHLI QOCHIRISH (FINAL FIX):
-    # 'Unterminated string' xatosi JSON ma'lumoti HTML atributiga joylashganda yuzaga keladi.
-    # Biz data-categories='{{ ... | safe }}' ishlatganimiz uchun, JSON ichidagi barcha
-    # maxsus belgilar HTML atributi uchun xavfsiz holatga keltirilishi kerak:
-    
-    # A) JSON ichidagi qo'shtirnoqlarni ("xato") HTML atributi uchun (&quot;) ga almashtiramiz.
-    categories_json_safe = categories_json_raw.replace('"', '&quot;')
-    
-    # B) Yagona apostroflarni (masalan, o'zbekcha nomlardagi ' ) HTML atributi uchun xavfsizlashtiramiz (&#39;).
-    # json.dumps bitta apostroflarni qochirmasligi mumkin, chunki u qo'shtirnoq ichida.
-    categories_json_safe = categories_json_safe.replace("'", "&#39;")
-
-
     context = {
         'form': form,
-        # categories_json: Endi bu &quot; va &#39; bilan tozalangan JSON matn.
-        'categories_json': categories_json_safe, 
+        # Kategoriyalar sahifaga joylanmaydi — keshlanadigan JSON katalogdan olinadi
+        'categories_url': category_catalogue_url(request.user),
         'initial_type': transaction_type, 
     }
     return render(request, 'transaction_form.html', context)
 
-def get_all_categories_for_js(user):
-    """
-    Foydalanuvchiga tegishli barcha kategoriyalarni, ularning turini, 
-    otasini va o'chirish URL'ini o'z ichiga olgan JSON string yaratadi.
-    """
-    # Foydalanuvchi yoki global kategoriyalarni olish
-    categories_queryset = Category.objects.filter(
-        models.Q(user=user) | models.Q(user__isnull=True),
-    ).select_related('parent').order_by('type', 'parent__id', 'name')
-    
-    categories_list = []
-    
-    # O'chirish url'ini to'g'ri yaratish uchun 'category_delete' URL nomi mavjud bo'lishi kerak.
-    # Agar siz AJAX DELETE so'rovini ishlatmoqchi bo'lsangiz, bu yerda URL shart emas.
-
-    for cat in categories_queryset:
-        
-        # Bu mantiq yordamchi usul orqali Category modelida bo'lishi kerak.
-        # Bu yerda Category.objects.filter ga mos kelishi uchun:
-        parent_full_name = cat.parent.name if cat.parent else None 
-        
-        categories_list.append({
-            'id': cat.id,
-            'name': cat.name,
-            'type': cat.type,
-            'parent_id': cat.parent.id if cat.parent else None,
-            'parent_name': parent_full_name,
-            'user_owned': cat.user == user, # Faqat foydalanuvchiga tegishli bo'lsa o'chirish mumkin
-        })
-    
-    # JSON stringga aylantirish.
-    return json.dumps(categories_list, cls=DjangoJSONEncoder, ensure_ascii=False)
-
 @login_required
 @require_http_methods(["DELETE"])
 def delete_category_view(request, category_id):
@@ -439,8 +491,9 @@ def delete_category_view(request, category_id):
          # Buni yumshoq o'chirish (soft delete) yoki foydalanuvchiga ta'sir haqida xabar berish kerak
          return JsonResponse({
              "success": False, 
-             "error": f"«{category.name}» kategoriyasi bog'langan tranzaksiyalarga ega. Uni o'chirish uchun avval tranzaksiyalarni o'zgartiring.",
-             "name": category.name
+             "error": f"«{category.name}» kategoriyasi bog'langan tranzaksiyalarga ega. Uni o'chirish uchun boshqa kategoriyaga birlashtiring.",
+             "name": category.name,
+             "merge_url": reverse('category_merge', args=[category.pk]),
         }, status=409) # Conflict status
         
     try:
@@ -451,6 +504,34 @@ def delete_category_view(request, category_id):
     except Exception as e:
         return JsonResponse({"success": False, "error": f"O'chirishda xato yuz berdi: {str(e)}"}, status=500)
 
+@login_required
+@require_POST
+def merge_category_view(request, category_id):
+    """
+    Kategoriyani boshqasiga birlashtirish: tranzaksiyalar, jadvallar va budjetlar
+    `target` kategoriyaga ko'chadi. `keep_source=1` bo'lsa manba o'chirilmaydi
+    (faqat qayta kategoriyalash).
+    """
+    source = get_object_or_404(Category, pk=category_id, user=request.user)
+    try:
+        target = Category.objects.get(Q(user=request.user) | Q(user__isnull=True), pk=int(request.POST.get('target', '')))
+    except (ValueError, Category.DoesNotExist):
+        return JsonResponse({"success": False, "error": "Nishon kategoriya topilmadi."}, status=404)
+
+    try:
+        report = merge_categories(source, target, delete_source=request.POST.get('keep_source') != '1')
+    except ValidationError as e:
+        return JsonResponse({"success": False, "error": " ".join(e.messages)}, status=400)
+
+    return JsonResponse({
+        "success": True,
+        "message": f"«{report.source}» → «{report.target}»: {report.transactions} ta tranzaksiya ko'chirildi.",
+        "transactions": report.transactions,
+        "schedules": report.schedules,
+        "budgets": report.budgets,
+        "deleted": report.deleted,
+    })
+
 @login_required
 def add_category_view(request):
     user = request.user
@@ -522,18 +603,10 @@ def add_category_view(request):
                  return redirect('add_category') # URL nomini 'add_category' deb taxmin qilamiz
 
 
-    # Barcha kategoriyalarni JSON formatida olish (Ro'yxat uchun)
-    all_categories_json_raw = get_all_categories_for_js(request.user)
-    
-    # Xavfsiz qochirish (oldingi muammolarni eslab)
-    all_categories_json_safe = all_categories_json_raw.replace('"', '&quot;')
-    all_categories_json_safe = all_categories_json_safe.replace("'", "&#39;")
-
-
     context = {
         'parent_categories': parent_categories_for_form,
         'type_choices': TYPE_CHOICES,
-        'all_categories_json': all_categories_json_safe, # Ro'yxatni JS orqali render qilish uchun
+        'categories_url': category_catalogue_url(request.user), # Ro'yxatni JS orqali render qilish uchun
     }
     return render(request, 'category_form.html', context)
 
@@ -585,6 +658,50 @@ def delete_recurring_view(request, pk):
         item.delete()
     return redirect('recurring_list')
 
+@login_required
+def cash_flow_projection_view(request):
+    """
+    Takrorlanuvchi jadvallar asosidagi balans prognozi (JSON).
+    ?months=12&granularity=monthly|daily
+    """
+    try:
+        months = int(request.GET.get('months', 12))
+        projection = project_cash_flow(
+            request.user, months=months, granularity=request.GET.get('granularity', 'monthly')
+        )
+    except ValueError as exc:
+        return HttpResponseBadRequest(str(exc))
+    return JsonResponse(projection, encoder=DjangoJSONEncoder)
+
+@login_required
+def budget_overview_view(request, year=None, month=None):
+    """ Oy budjetlari holati — budjetlar soniga bog'liq bo'lmagan o'zgarmas sondagi so'rovlar. """
+    today = timezone.localdate()
+    try:
+        month_start = date(int(year), int(month), 1) if year and month else today.replace(day=1)
+    except ValueError:
+        month_start = today.replace(day=1)
+
+    context = get_budget_overview(request.user, month_start, today)
+    context.update({
+        'unread_alerts': BudgetAlert.objects.filter(user=request.user, is_read=False).count(),
+        'month_start': month_start,
+        'prev_month': month_start - relativedelta(months=1),
+        'next_month': month_start + relativedelta(months=1),
+    })
+    return render(request, 'budgets.html', context)
+
+@login_required
+def budget_alerts_view(request):
+    """ Budjet ogohlantirishlari ro'yxati. POST — hammasini o'qilgan deb belgilaydi. """
+    alerts = BudgetAlert.objects.filter(user=request.user)
+    if request.method == 'POST':
+        alerts.filter(is_read=False).update(is_read=True)
+        return redirect('budget_alerts')
+    return render(request, 'budget_alerts.html', {
+        'alerts': alerts.select_related('budget__category')[:50],
+    })
+
 def about_view(request):
     return render(request, 'about.html')
 
@@ -1,13 +1,15 @@
 let allCategories = [];
 let currentType = 'EXPENSE';
 
-document.addEventListener('DOMContentLoaded', function () {
-    // 1. Kategoriyalarni yuklash
-    const raw = document.getElementById('category-data')?.dataset.categories || '';
+document.addEventListener('DOMContentLoaded', async function () {
+    // 1. Kategoriyalarni yuklash (JSON katalog — ETag bilan brauzer keshidan)
+    const url = document.getElementById('category-data')?.dataset.url;
     try {
-        allCategories = raw ? JSON.parse(raw) : [];
+        const res = await fetch(url, { credentials: 'same-origin' });
+        if (!res.ok) throw new Error('Server xatosi: ' + res.status);
+        allCategories = await res.json();
     } catch (e) {
-        console.error("JSON parse xatosi:", e);
+        console.error("Kategoriyalarni yuklashda xato:", e);
         showEmptyState("Kategoriyalarni yuklashda xato yuz berdi.");
         return;
     }
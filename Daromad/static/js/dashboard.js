@@ -96,6 +96,36 @@ document.addEventListener('DOMContentLoaded', function () {
             });
     }
 
+    /* ---------------- "YANA YUKLASH" (KURSOR BO'YICHA SAHIFALASH) ---------------- */
+
+    // Tugma AJAX orqali qayta chiziladi, shuning uchun hodisani konteynerga bog'laymiz
+    if (transactionListContainer) {
+        transactionListContainer.addEventListener('click', (event) => {
+            const button = event.target.closest('.load-more-btn');
+            if (!button) return;
+
+            button.disabled = true;
+            const wrapper = button.closest('.load-more-wrapper');
+
+            fetch(button.dataset.url)
+                .then(response => {
+                    if (!response.ok) {
+                        throw new Error('Keyingi sahifani yuklashda xato: Server xatosi.');
+                    }
+                    return response.text();
+                })
+                .then(html => {
+                    // Tugma o'rniga yangi qatorlar (va kerak bo'lsa yangi tugma) qo'yiladi
+                    wrapper.insertAdjacentHTML('beforebegin', html);
+                    wrapper.remove();
+                })
+                .catch(error => {
+                    console.error("AJAX Xato:", error);
+                    button.disabled = false;
+                });
+        });
+    }
+
     /* ---------------- SANANI YANGILASH VA NAVIGATSIYA ---------------- */
 
     /**